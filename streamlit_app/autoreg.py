@@ -0,0 +1,70 @@
+# Import numpy
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+# Function to view a batch of equal-length series as lagged design rows without copying them
+def lag_windows(values, lags):
+    # Each row holds lags 1..lags of one target, newest first, and the target itself
+    windows = sliding_window_view(np.asarray(values, dtype=float), lags + 1, axis=-1)
+    return windows[..., :lags][..., ::-1], windows[..., lags]
+
+
+# Function to fit AR(lags) models with a constant to a batch of equal-length series by least squares
+def fit_batch(values, lags):
+    # Check there are more equations than unknowns
+    values = np.atleast_2d(np.asarray(values, dtype=float))
+    if values.shape[1] - lags <= lags + 1:
+        raise ValueError(f"AutoReg with {lags} lags needs more than {2 * lags + 1} observations, got {values.shape[1]}")
+    X, y = lag_windows(values, lags)
+
+    # Centering absorbs the constant, so the lagged view is only copied once, into the centred design
+    x_mean = X.mean(axis=1, keepdims=True)
+    y_mean = y.mean(axis=1, keepdims=True)
+    Q, R = np.linalg.qr(X - x_mean)
+    coefs = np.linalg.solve(R, np.matmul(Q.swapaxes(1, 2), (y - y_mean)[..., np.newaxis]))[..., 0]
+    const = y_mean[:, 0] - np.einsum("bl,bl->b", x_mean[:, 0, :], coefs)
+
+    # Return the constant and lag coefficients of every series
+    return const, coefs
+
+
+# Function to forecast a batch of series from position start on, feeding each prediction back in as a lag
+def predict_dynamic(values, const, coefs, start, steps):
+    # Actual values before start, then room for the predictions
+    values = np.atleast_2d(np.asarray(values, dtype=float))
+    lags = coefs.shape[1]
+    path = np.empty((values.shape[0], lags + steps))
+    path[:, :lags] = values[:, start - lags : start]
+
+    # Each step reads the lags newest first from the path written so far
+    for step in range(steps):
+        path[:, lags + step] = const + np.einsum("bl,bl->b", path[:, step : lags + step][:, ::-1], coefs)
+
+    # Return the predictions only
+    return path[:, lags:]
+
+
+# Function to fit many training series and forecast each from its last observation on, as AutoReg does with dynamic=True
+def fit_predict_many(trains, lags, steps, chunk_size=64):
+    # Group the series by length, as each batch needs one design shape
+    groups = {}
+    for name, values in trains.items():
+        groups.setdefault(len(values), []).append(name)
+
+    # Solve each group in chunks so the centred designs stay bounded in memory
+    forecasts = {}
+    for length, names in groups.items():
+        for first in range(0, len(names), chunk_size):
+            chunk = names[first : first + chunk_size]
+            train = np.stack([np.asarray(trains[name], dtype=float) for name in chunk])
+            const, coefs = fit_batch(train, lags)
+
+            # The last observation is predicted from the ones before it, and everything after from predictions
+            step_counts = [steps[name] if isinstance(steps, dict) else steps for name in chunk]
+            predicted = predict_dynamic(train, const, coefs, length - 1, max(step_counts))
+            for name, row, count in zip(chunk, predicted, step_counts):
+                forecasts[name] = row[:count]
+
+    # Return the forecasts by name
+    return forecasts
@@ -0,0 +1,152 @@
+# Imports
+import warnings
+
+# Import numpy and pandas
+import numpy as np
+import pandas as pd
+
+# Import the required libraries
+from statsmodels.tsa.statespace.sarimax import SARIMAX
+
+# Import the shared worker pool
+import worker_pool
+
+
+# Function to fit the model on the training values of one origin
+def _fit(values, order, seasonal_order):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return SARIMAX(values, order=order, seasonal_order=seasonal_order).fit(disp=False)
+
+
+# Function to score one forecast against what actually happened
+def _score(origin, last_value, forecast, actual):
+    errors = actual - forecast
+    nonzero = actual != 0
+    return {
+        "Origin": origin,
+        "MAPE": float(np.mean(np.abs(errors[nonzero] / actual[nonzero])) * 100) if nonzero.any() else np.nan,
+        "RMSE": float(np.sqrt(np.mean(errors**2))),
+        "Hit Rate": float(np.mean(np.sign(forecast - last_value) == np.sign(actual - last_value))),
+    }
+
+
+# Function to run a contiguous run of origins, advancing the state-space filter between refits.
+# Positions are the indices of the origins among all origins, and anchor is the origin whose window the parameters in
+# force at the first of them were estimated on, so every run refits in the same places however the origins were split.
+def _run_origins(values, origins, positions, anchor, order, seasonal_order, horizon, window, window_size, refit_every):
+    rows = []
+    results = None
+    fitted_at = None
+    for position, origin in zip(positions, origins):
+        train = values[_window_start(origin, window, window_size) : origin]
+
+        # Estimate the parameters on the first origin and every refit_every origins after that, a run starting
+        # between refits estimating them on the anchor's window and catching up from there
+        due = bool(refit_every) and position % refit_every == 0
+        if results is None or due:
+            fit_origin = origin if due else anchor
+            results = _fit(values[_window_start(fit_origin, window, window_size) : fit_origin], order, seasonal_order)
+            fitted_at = fit_origin
+
+        # Expanding windows only filter the bars added since the previous origin
+        if fitted_at != origin and window == "expanding":
+            results = results.extend(values[fitted_at:origin])
+
+        # Sliding windows refilter the new window with the same parameters
+        elif fitted_at != origin:
+            results = results.apply(train, refit=False)
+        fitted_at = origin
+
+        # Forecast past the origin and score it
+        forecast = np.asarray(results.forecast(horizon))
+        actual = values[origin : origin + horizon]
+        rows.append(_score(origin, values[origin - 1], forecast, actual))
+
+    # Return one row per origin
+    return rows
+
+
+# Function to find where the training window of an origin starts
+def _window_start(origin, window, window_size):
+    return origin - window_size if window == "sliding" else 0
+
+
+# Function to size the smallest training window, half the series by default
+def _min_train(length, min_train=None, window_size=None, season=0):
+    return min_train or window_size or max(length // 2, 2 * season)
+
+
+# Function to place the forecast origins evenly between the smallest training window and the last full horizon
+def plan_origins(length, horizon=30, origins=10, min_train=None, window_size=None, season=0):
+    min_train = _min_train(length, min_train, window_size, season)
+    last_origin = length - horizon
+    if last_origin < min_train:
+        raise ValueError("Not enough bars for the training window and the forecast horizon")
+    if np.isscalar(origins):
+        origins = np.unique(np.linspace(min_train, last_origin, int(origins)).astype(int))
+    return [int(origin) for origin in origins]
+
+
+# Function to backtest a seasonal ARIMA model over many forecast origins
+def walk_forward(
+    values,
+    order,
+    seasonal_order,
+    horizon=30,
+    origins=10,
+    min_train=None,
+    window="expanding",
+    window_size=None,
+    refit_every=None,
+    max_workers=None,
+):
+    # Arrange the series and its dates
+    series = pd.Series(values)
+    values = series.to_numpy(dtype=float)
+    if window not in ("expanding", "sliding"):
+        raise ValueError(f"window must be 'expanding' or 'sliding', got {window!r}")
+
+    # Place the origins, the sliding window spanning the smallest training window unless told otherwise
+    origins = plan_origins(len(values), horizon, origins, min_train, window_size, seasonal_order[3])
+    window_size = window_size or _min_train(len(values), min_train, window_size, seasonal_order[3])
+
+    # Give each worker a contiguous run of origins so it can advance its filter between them
+    pool = worker_pool.get_pool(max_workers)
+    workers = min(worker_pool.pool_size(), len(origins))
+    chunks = [chunk.tolist() for chunk in np.array_split(np.arange(len(origins)), workers)]
+    futures = [
+        pool.submit(
+            _run_origins,
+            values,
+            [origins[position] for position in chunk],
+            chunk,
+            origins[chunk[0] - chunk[0] % refit_every if refit_every else 0],
+            order,
+            seasonal_order,
+            horizon,
+            window,
+            window_size,
+            refit_every,
+        )
+        for chunk in chunks
+        if chunk
+    ]
+    per_origin = pd.DataFrame([row for future in futures for row in future.result()])
+
+    # Label the origins with their dates when the series has them
+    if isinstance(series.index, pd.DatetimeIndex):
+        per_origin["Origin"] = series.index[per_origin["Origin"]]
+
+    # Aggregate the errors over every origin
+    aggregate = pd.Series(
+        {
+            "Origins": len(per_origin),
+            "MAPE": per_origin["MAPE"].mean(),
+            "RMSE": float(np.sqrt((per_origin["RMSE"] ** 2).mean())),
+            "Hit Rate": per_origin["Hit Rate"].mean(),
+        }
+    )
+
+    # Return the per-origin and aggregate metrics
+    return per_origin, aggregate
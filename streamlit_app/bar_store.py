@@ -0,0 +1,256 @@
+# Imports
+import datetime as dt
+import os
+import threading
+from pathlib import Path
+
+# Import numpy and pandas
+import numpy as np
+import pandas as pd
+
+# Import yfinance
+import yfinance as yf
+
+# Location of the local bar store, one parquet file per ticker and interval
+STORE_DIR = Path.cwd() / "data" / "bars"
+
+# Longest history Yahoo serves for each intraday interval
+INTRADAY_LIMITS = {
+    "1m": "7d",
+    "2m": "60d",
+    "5m": "60d",
+    "15m": "60d",
+    "30m": "60d",
+    "60m": "730d",
+    "90m": "60d",
+}
+
+# Columns kept for every bar
+BAR_COLUMNS = ["Open", "High", "Low", "Close", "Volume", "Dividends", "Stock Splits"]
+
+
+# Provider that downloads bars from Yahoo Finance
+class YahooBarProvider:
+    # Fetch the bars for a ticker, either the full history or everything from start
+    def fetch(self, ticker, interval, start=None):
+        # Pull the data for the security
+        stock_data = yf.Ticker(ticker)
+
+        # Full download when nothing is stored yet
+        if start is None:
+            period = INTRADAY_LIMITS.get(interval, "max")
+            return stock_data.history(period=period, interval=interval)
+
+        # Otherwise only the missing tail
+        return stock_data.history(start=start, interval=interval)
+
+
+# Provider that replays bars recorded to local CSV files
+class FixtureBarProvider:
+    def __init__(self, fixture_dir, tz="America/New_York"):
+        self.fixture_dir = Path(fixture_dir)
+        self.tz = tz
+
+    # Fetch the recorded bars, trimmed to start when given
+    def fetch(self, ticker, interval, start=None):
+        # Load the recording
+        path = self.fixture_dir / f"{ticker}_{interval}.csv"
+        if not path.exists():
+            return pd.DataFrame(columns=BAR_COLUMNS)
+        bars = pd.read_csv(path, index_col=0)
+        bars.index = pd.to_datetime(bars.index, utc=True).tz_convert(self.tz)
+        bars.index.name = "Date"
+
+        # Trim to the requested start
+        if start is not None:
+            bars = bars.loc[_localize(start, bars.index.tz) :]
+
+        # Return the bars
+        return bars
+
+
+# Function to record a provider's bars to a CSV fixture
+def record_fixture(ticker, fixture_dir, interval="1d", provider=None):
+    # Download the full history
+    provider = provider or YahooBarProvider()
+    bars = provider.fetch(ticker, interval)
+
+    # Save it next to the other recordings
+    fixture_dir = Path(fixture_dir)
+    fixture_dir.mkdir(parents=True, exist_ok=True)
+    path = fixture_dir / f"{ticker}_{interval}.csv"
+    bars.to_csv(path)
+
+    # Return the path of the recording
+    return path
+
+
+# Function to check whether the session of a daily bar had closed by now, in New York time
+def session_closed(date, now=None):
+    now = pd.Timestamp.now(tz="America/New_York") if now is None else pd.Timestamp(now)
+    return pd.Timestamp(date).date() < now.date() or now.hour >= 16
+
+
+# Function to localize a date to the timezone of the stored bars
+def _localize(value, tz):
+    # Convert to a timestamp
+    value = pd.Timestamp(value)
+
+    # Match the timezone of the index
+    if tz is None:
+        return value.tz_localize(None) if value.tz is not None else value
+    if value.tz is None:
+        return value.tz_localize(tz)
+    return value.tz_convert(tz)
+
+
+# Persistent local store that only fetches the missing tail of each history
+class BarStore:
+    def __init__(self, provider=None, root=STORE_DIR, max_age=dt.timedelta(minutes=15)):
+        self.provider = provider or YahooBarProvider()
+        self.root = Path(root)
+        self.max_age = max_age
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    # Path of the parquet file for a ticker and interval
+    def path(self, ticker, interval="1d"):
+        return self.root / interval / f"{ticker.upper()}.parquet"
+
+    # One lock per file so concurrent reruns do not write the same file twice
+    def _lock(self, path):
+        with self._locks_guard:
+            return self._locks.setdefault(path, threading.Lock())
+
+    # Read the stored bars, or None when nothing is stored
+    def read(self, ticker, interval="1d"):
+        path = self.path(ticker, interval)
+        if not path.exists():
+            return None
+        return pd.read_parquet(path)
+
+    # Check whether the stored bars were synced recently enough
+    def is_fresh(self, ticker, interval="1d"):
+        path = self.path(ticker, interval)
+        if not path.exists():
+            return False
+        synced_at = dt.datetime.fromtimestamp(path.stat().st_mtime)
+        return dt.datetime.now() - synced_at < self.max_age
+
+    # Bring the stored bars up to date and return them
+    def sync(self, ticker, interval="1d", force=False):
+        path = self.path(ticker, interval)
+        with self._lock(path):
+            # Skip the network when the file was synced recently
+            cached = self.read(ticker, interval)
+            if cached is not None and not force and self.is_fresh(ticker, interval):
+                return cached
+
+            # Fetch the full history when nothing is stored
+            if cached is None or cached.empty:
+                bars = self._clean(self.provider.fetch(ticker, interval))
+
+            # Otherwise fetch from the last stored bar, which may have been partial
+            else:
+                last = cached.index[-1]
+                tail = self._clean(self.provider.fetch(ticker, interval, start=last))
+                bars = self._merge(cached, tail)
+
+                # Adjusted prices shift on a new dividend or split, so refetch everything
+                if bars is None:
+                    bars = self._clean(self.provider.fetch(ticker, interval))
+
+            # Write atomically so readers never see a half-written file
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            bars.to_parquet(tmp_path)
+            os.replace(tmp_path, path)
+
+            # Return the stored bars
+            return bars
+
+    # Keep the known columns in chronological order
+    def _clean(self, bars):
+        bars = bars[[column for column in BAR_COLUMNS if column in bars.columns]]
+        bars = bars[~bars.index.duplicated(keep="last")]
+        return bars.sort_index()
+
+    # Append the fetched tail, or return None when history has to be refetched
+    def _merge(self, cached, tail):
+        # Nothing new arrived
+        if tail.empty:
+            return cached
+
+        # Completed bars that were fetched again must still agree with what is stored
+        last = cached.index[-1]
+        overlap = cached.index[:-1].intersection(tail.index)
+        if len(overlap) and not np.allclose(
+            cached.loc[overlap, "Close"], tail.loc[overlap, "Close"], rtol=1e-6
+        ):
+            return None
+
+        # A new dividend or split re-adjusts every earlier price
+        new_rows = tail.loc[tail.index >= last]
+        events = [column for column in ["Dividends", "Stock Splits"] if column in new_rows.columns]
+        known = cached[events].reindex(new_rows.index).fillna(0)
+        if (new_rows[events].fillna(0) != known).to_numpy().any():
+            return None
+
+        # Replace the last stored bar and append the rest
+        return pd.concat([cached.loc[cached.index < last], new_rows])
+
+    # Return the bars between start and end, both inclusive, syncing first if needed
+    def get_bars(self, ticker, start=None, end=None, interval="1d", sync=True):
+        # Load the bars
+        bars = self.sync(ticker, interval) if sync else self.read(ticker, interval)
+        if bars is None or bars.empty:
+            return pd.DataFrame(columns=BAR_COLUMNS)
+
+        # Slice the requested range locally
+        tz = bars.index.tz
+        start = _localize(start, tz) if start is not None else None
+        end = _localize(end, tz) if end is not None else None
+        return bars.loc[start:end].copy()
+
+    # Return the bars covering a yfinance style period such as "5d" or "1y"
+    def get_period(self, ticker, period, interval="1d", sync=True):
+        # Load the bars
+        bars = self.get_bars(ticker, interval=interval, sync=sync)
+        if bars.empty or period == "max":
+            return bars
+
+        # Day periods count trading sessions, like Yahoo does
+        if period.endswith("d"):
+            sessions = pd.Index(bars.index.date).unique()
+            first_session = sessions[-int(period[:-1]) :][0]
+            return bars.loc[bars.index.date >= first_session]
+
+        # Longer periods count calendar time back from the last bar
+        last = bars.index[-1]
+        if period == "ytd":
+            start = last.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
+        elif period.endswith("mo"):
+            start = last - pd.DateOffset(months=int(period[:-2]))
+        else:
+            start = last - pd.DateOffset(years=int(period[:-1]))
+        return bars.loc[start:]
+
+
+# Shared store used by the pages
+_default_store = None
+
+
+# Function to fetch the shared store
+def get_store():
+    # Create the store on first use
+    global _default_store
+    if _default_store is None:
+        _default_store = BarStore()
+
+    # Return the store
+    return _default_store
+
+
+# Function to fetch bars for a date range from the shared store
+def get_bars(ticker, start=None, end=None, interval="1d"):
+    return get_store().get_bars(ticker, start=start, end=end, interval=interval)
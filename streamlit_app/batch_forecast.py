@@ -0,0 +1,212 @@
+# Imports
+import argparse
+import datetime as dt
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+# Import pandas
+import pandas as pd
+
+# Import the local bar store, pipeline, HTTP client, issuer index and shared worker pool
+import bar_store
+import forecast_pipeline
+import http_client
+import issuer_index
+import worker_pool
+
+# Location of the batch output
+OUTPUT_DIR = Path.cwd() / "data" / "batch"
+
+# Forecast columns of the pipeline and their names in the output table
+FORECAST_COLUMNS = {"Cpred_future": "Close", "Mpred_future": "MACD", "Spred_future": "Signal", "Hpred_future": "Histogram"}
+
+
+# Records how long each pipeline stage took, in place of a job
+class StageTimer:
+    def __init__(self):
+        self.timings = {}
+        self._stage = None
+        self._started = None
+
+    # Close the previous stage when a new one is reported
+    def report(self, stage, progress=0.0):
+        if stage != self._stage:
+            self.close()
+            self._stage = stage
+            self._started = time.monotonic()
+
+    # Close the stage in progress
+    def close(self):
+        if self._stage is not None:
+            self.timings[self._stage] = self.timings.get(self._stage, 0.0) + time.monotonic() - self._started
+        self._stage = None
+
+
+# Function to read the ticker universe from the issuer file, with the exchange suffix Yahoo expects
+def issuer_tickers(path=issuer_index.ISSUERS_PATH, suffix=".BO"):
+    issuers = issuer_index.get_index(path).issuers
+    issuers = issuers[issuers["Status"] == "Active"]
+    return [f"{security_id.strip()}{suffix}" for security_id in issuers["Security Id"].dropna()]
+
+
+# Function to turn one pipeline result into rows of the output table
+def _rows(ticker, result):
+    forecast = result["forecast"].rename(columns=FORECAST_COLUMNS).reset_index()
+    forecast.insert(0, "Ticker", ticker)
+    forecast.insert(2, "Step", range(len(forecast)))
+    forecast["As Of"] = result["history"].index[-1].strftime("%Y-%m-%d")
+    for name, fit in result["fits"].items():
+        forecast[f"{name} Order"] = str(fit["order"])
+    return forecast
+
+
+# Function to fetch, forecast and time one ticker, returning its rows or its error
+def _run_ticker(ticker, start_date, params, limiter):
+    timer = StageTimer()
+    try:
+        # Only the missing bars are downloaded, under the fetch limit
+        timer.report("Fetching bars")
+        with limiter:
+            bar_store.get_store().sync(ticker)
+
+        # The same pipeline as the forecasting page
+        result = forecast_pipeline.run_forecast(ticker, start_date, job=timer, **params)
+        rows, error = _rows(ticker, result), None
+    except Exception as exc:
+        rows, error = None, f"{type(exc).__name__}: {exc}"
+    timer.close()
+    return ticker, rows, error, timer.timings
+
+
+# Function to run one shard of tickers and write it as a single parquet file
+def _run_shard(tickers, path, start_date, params, limiter, max_workers):
+    frames, errors, timings = [], [], {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_run_ticker, ticker, start_date, params, limiter) for ticker in tickers]
+        for future in as_completed(futures):
+            ticker, rows, error, ticker_timings = future.result()
+            if error:
+                errors.append({"Ticker": ticker, "Error": error})
+            else:
+                frames.append(rows)
+            for stage, seconds in ticker_timings.items():
+                timings[stage] = timings.get(stage, 0.0) + seconds
+
+    # Failed tickers are kept as rows with only an error, so a rerun of the shard is not needed to see them
+    table = pd.concat(frames + [pd.DataFrame(errors)], ignore_index=True) if frames or errors else pd.DataFrame()
+    if "Error" not in table.columns:
+        table["Error"] = None
+
+    # Write atomically, so a shard file only exists once the shard is complete
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    table.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    return len(errors), timings
+
+
+# Function to forecast a list of tickers in resumable shards and return the combined table
+def run_batch(
+    tickers,
+    output_dir=OUTPUT_DIR,
+    start_date=None,
+    params=None,
+    shard_size=50,
+    max_workers=None,
+    max_in_flight=4,
+    fetches_per_second=2.0,
+):
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = output_dir / "manifest.json"
+    stored = None
+    if manifest_path.exists():
+        with open(manifest_path) as file:
+            stored = json.load(file)
+
+    # Without a start date a resumed run keeps the one it started with, a new run starts a year ago
+    if start_date is None:
+        start_date = stored["start_date"] if stored else dt.date.today() - dt.timedelta(days=365)
+    start_date = pd.Timestamp(start_date).date()
+    params = {**{"seasonality": 22, "fast": 13, "slow": 39, "horizon": 30}, **(params or {})}
+
+    # A manifest pins the tickers and parameters, so a resumed run cannot mix shards of two different runs
+    manifest = {"tickers": list(tickers), "start_date": start_date.isoformat(), "params": params, "shard_size": shard_size}
+    if stored is not None:
+        if stored != manifest:
+            raise ValueError(f"{output_dir} holds a different batch, use another output directory")
+    else:
+        with open(manifest_path, "w") as file:
+            json.dump(manifest, file, indent=2)
+
+    # Skip the shards already written
+    shards = [tickers[i : i + shard_size] for i in range(0, len(tickers), shard_size)]
+    paths = [output_dir / f"shard-{number:05d}.parquet" for number in range(len(shards))]
+    pending = [(shard, path) for shard, path in zip(shards, paths) if not path.exists()]
+    print(f"{len(tickers)} tickers in {len(shards)} shards, {len(pending)} shards left")
+
+    # Tickers run side by side, their order searches and fits sharing the process pool
+    max_workers = max_workers or worker_pool.pool_size()
+    worker_pool.get_pool(max_workers)
+    limiter = http_client.HostLimiter(max_in_flight, fetches_per_second)
+    started = time.monotonic()
+    done = 0
+    timings = {}
+    for number, (shard, path) in enumerate(pending, 1):
+        failed, shard_timings = _run_shard(shard, path, start_date, params, limiter, max_workers)
+        for stage, seconds in shard_timings.items():
+            timings[stage] = timings.get(stage, 0.0) + seconds
+
+        # Throughput over the shards run in this process
+        done += len(shard)
+        rate = done / (time.monotonic() - started) * 60
+        print(f"[{number}/{len(pending)}] {path.name}: {len(shard) - failed} done, {failed} failed, {rate:.1f} tickers/min")
+
+    # Per-stage time per ticker, summed over the threads
+    if done:
+        print("Seconds per ticker by stage:")
+        for stage, seconds in timings.items():
+            print(f"  {stage:<26} {seconds / done:8.2f}")
+
+    # Combine the shards into one table
+    table = pd.concat([pd.read_parquet(path) for path in paths], ignore_index=True)
+    table.to_parquet(output_dir / "forecasts.parquet", index=False)
+    return table
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the forecasting page pipeline over many tickers")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--tickers", nargs="+", help="tickers to forecast")
+    source.add_argument("--tickers-file", help="file with one ticker per line")
+    source.add_argument("--issuers", nargs="?", const=str(issuer_index.ISSUERS_PATH), help="issuer CSV, every active Security Id")
+    parser.add_argument("--suffix", default=".BO", help="exchange suffix added to issuer Security Ids")
+    parser.add_argument("--output", default=str(OUTPUT_DIR), help="directory of the shard files and final table")
+    parser.add_argument("--start-date", help="first bar of each history, by default a year ago or the resumed run's")
+    parser.add_argument("--shard-size", type=int, default=50, help="tickers per shard file")
+    parser.add_argument("--workers", type=int, help="tickers forecast side by side")
+    parser.add_argument("--max-in-flight", type=int, default=4, help="bar downloads running at once")
+    parser.add_argument("--fetch-rate", type=float, default=2.0, help="bar downloads started per second")
+    args = parser.parse_args()
+
+    if args.tickers:
+        tickers = args.tickers
+    elif args.tickers_file:
+        tickers = [line.strip() for line in open(args.tickers_file) if line.strip()]
+    else:
+        tickers = issuer_tickers(args.issuers, args.suffix)
+
+    try:
+        run_batch(
+            tickers,
+            output_dir=args.output,
+            start_date=args.start_date,
+            shard_size=args.shard_size,
+            max_workers=args.workers,
+            max_in_flight=args.max_in_flight,
+            fetches_per_second=args.fetch_rate,
+        )
+    except KeyboardInterrupt:
+        print("Interrupted, rerun the same command to resume from the last finished shard")
@@ -0,0 +1,88 @@
+# Imports
+import datetime as dt
+import inspect
+import json
+import threading
+import time
+
+# Import numpy and pandas
+import numpy as np
+import pandas as pd
+
+# Arguments that are never part of what a run computes
+IGNORED_ARGUMENTS = ("job",)
+
+
+# Function to normalise one argument, so equal runs written differently get the same key
+def _canonical(name, value):
+    # Tickers are case-insensitive, and dates match whatever type they were passed as
+    if isinstance(value, str):
+        value = value.strip()
+        if name == "ticker":
+            return value.upper()
+        if name.endswith("date"):
+            return pd.Timestamp(value).isoformat()
+        return value
+    if isinstance(value, (dt.date, np.datetime64)):
+        return pd.Timestamp(value).isoformat()
+
+    # Plain numbers, with whole floats written as integers
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+
+    # Containers element by element
+    if isinstance(value, (list, tuple)):
+        return [_canonical(name, item) for item in value]
+    if isinstance(value, dict):
+        return {str(key): _canonical(str(key), item) for key, item in value.items()}
+    return value
+
+
+# Function to build the key of a run from its function and arguments, with the defaults filled in
+def canonical_key(fn, args=(), kwargs=None):
+    bound = inspect.signature(fn).bind_partial(*args, **(kwargs or {}))
+    bound.apply_defaults()
+    params = {
+        name: _canonical(name, value) for name, value in bound.arguments.items() if name not in IGNORED_ARGUMENTS
+    }
+    return json.dumps([fn.__module__, fn.__qualname__, params], sort_keys=True, default=str)
+
+
+# Table of in-flight and recently finished runs, so identical requests share one computation
+class SingleFlight:
+    def __init__(self, ttl=900):
+        # Finished results are handed out again for this many seconds
+        self.ttl = ttl
+        self.started = 0
+        self.joined = 0
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    # Check whether a flight can still be shared: running, or finished successfully within the time to live
+    def _reusable(self, flight):
+        if not flight.done:
+            return True
+        return flight.status == "done" and time.time() - flight.finished_at < self.ttl
+
+    # Return the flight for a key, calling start() to begin one when none can be shared
+    def join(self, key, start):
+        with self._lock:
+            # Attach to the flight in progress, or reuse its fresh result
+            flight = self._flights.get(key)
+            if flight is not None and self._reusable(flight):
+                self.joined += 1
+                return flight, True
+
+            # Otherwise start a new one, dropping flights that can no longer be shared
+            self._flights = {key: flight for key, flight in self._flights.items() if self._reusable(flight)}
+            flight = start()
+            self._flights[key] = flight
+            self.started += 1
+            return flight, False
+
+    # Forget a key, so the next request starts a fresh run
+    def forget(self, key):
+        with self._lock:
+            self._flights.pop(key, None)
@@ -0,0 +1,96 @@
+# Imports
+from concurrent.futures import ThreadPoolExecutor
+
+# Import numpy and pandas
+import numpy as np
+import pandas as pd
+
+# Import the options chain cache
+import options_chain
+
+
+# Function to score every call of many chains as a covered call, one row per ticker, expiry and strike
+def score_chains(snapshots, quantity=1, price_column="bid"):
+    # Stack the calls of every ticker
+    frames = []
+    for snapshot in snapshots:
+        chain = snapshot["chain"]
+        if chain.empty:
+            continue
+        calls = chain[chain["Type"] == "Calls"]
+        frames.append(calls.assign(Ticker=snapshot["ticker"], Spot=snapshot["spot"]))
+    if not frames:
+        return pd.DataFrame()
+    calls = pd.concat(frames, ignore_index=True)
+
+    # Same arithmetic as calculate_covered_call, over every row at once
+    shares = quantity * 100
+    spot = calls["Spot"].to_numpy(dtype=float)
+    strike = calls["strike"].to_numpy(dtype=float)
+    days = calls["days"].to_numpy(dtype=float)
+    premium = calls[price_column].to_numpy(dtype=float) * shares
+    max_risk = spot * shares - premium
+    max_return = (strike - spot) * shares + premium
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return_on_risk = max_return / max_risk * 100
+        annualized_return = return_on_risk / days * 365
+
+    # Return the scored table
+    return pd.DataFrame(
+        {
+            "Ticker": calls["Ticker"],
+            "Expiration": calls["expiration"],
+            "Days": calls["days"],
+            "Strike": strike,
+            "Spot": spot,
+            "Premium": premium,
+            "Breakeven": spot - premium / shares,
+            "Max Return": max_return,
+            "Return on Risk %": return_on_risk,
+            "Annualized Return %": annualized_return,
+            "Delta": calls["Delta"],
+            "IV": calls["iv"],
+        }
+    )
+
+
+# Function to scan a list of tickers and rank their covered calls
+def scan(
+    tickers,
+    quantity=1,
+    price_column="bid",
+    min_delta=None,
+    max_delta=None,
+    min_days=1,
+    max_days=None,
+    sort_by="Annualized Return %",
+    max_workers=8,
+):
+    # Fetch every chain concurrently through the cache
+    tickers = [ticker.strip().upper() for ticker in tickers if ticker.strip()]
+    snapshots, failed = [], []
+
+    def fetch(ticker):
+        try:
+            return options_chain.get_chain(ticker)
+        except Exception:
+            failed.append(ticker)
+            return None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        snapshots = [snapshot for snapshot in executor.map(fetch, tickers) if snapshot is not None]
+
+    # Score everything, then apply the filters as one mask
+    table = score_chains(snapshots, quantity=quantity, price_column=price_column)
+    if table.empty:
+        return table, failed
+    keep = (table["Premium"] > 0) & (table["Days"] >= min_days) & np.isfinite(table[sort_by])
+    if min_delta is not None:
+        keep &= table["Delta"] >= min_delta
+    if max_delta is not None:
+        keep &= table["Delta"] <= max_delta
+    if max_days is not None:
+        keep &= table["Days"] <= max_days
+
+    # Return the ranked table and the tickers that could not be fetched
+    return table[keep].sort_values(sort_by, ascending=False).reset_index(drop=True), failed
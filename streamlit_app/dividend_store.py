@@ -0,0 +1,229 @@
+# Imports
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Import numpy and pandas
+import numpy as np
+import pandas as pd
+
+# Import the local bar store
+import bar_store
+
+# Location of the dividend events, one parquet file per ticker
+STORE_DIR = Path.cwd() / "data" / "dividends"
+
+# Usual payments a year, which the spacing of recent ex-dates snaps to
+FREQUENCIES = np.array([1, 2, 4, 12])
+
+# Names of the usual schedules
+FREQUENCY_NAMES = {0: "None", 1: "Annual", 2: "Semi-Annual", 4: "Quarterly", 12: "Monthly"}
+
+
+# Persistent store of dividend events, kept up to date from the bar store's Dividends column
+class DividendStore:
+    def __init__(self, root=STORE_DIR):
+        self.root = Path(root)
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        self._memo = {}
+
+    # Path of the parquet file for a ticker
+    def path(self, ticker):
+        return self.root / f"{ticker.upper()}.parquet"
+
+    # One lock per file so concurrent reruns do not write the same file twice
+    def _lock(self, path):
+        with self._locks_guard:
+            return self._locks.setdefault(path, threading.Lock())
+
+    # Load a file through the in-process memo, which is reused until the file is rewritten
+    def _load(self, path, loader):
+        try:
+            stamp = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+        memo = self._memo.get(path)
+        if memo is None or memo[0] != stamp:
+            memo = (stamp, loader(path))
+            self._memo[path] = memo
+        return memo[1]
+
+    # Read the stored events as a Dividend series by ex-date, or None when nothing is stored
+    def read(self, ticker):
+        return self._load(self.path(ticker), lambda path: pd.read_parquet(path)["Dividend"])
+
+    # Read the last stored close of a ticker and its New York date, or None when no bars are stored
+    def last_close(self, ticker):
+        def load(path):
+            closes = pd.read_parquet(path, columns=["Close"])["Close"].dropna()
+            return (float(closes.iloc[-1]), closes.index[-1].strftime("%Y-%m-%d")) if len(closes) else None
+
+        return self._load(bar_store.get_store().path(ticker), load)
+
+    # Check whether the stored events were derived from the stored bars, which are rewritten on every bar sync
+    def is_fresh(self, ticker):
+        try:
+            return self.path(ticker).stat().st_mtime_ns >= bar_store.get_store().path(ticker).stat().st_mtime_ns
+        except FileNotFoundError:
+            return False
+
+    # Bring the bars and the stored events up to date and return the events
+    def sync(self, ticker, force=False):
+        path = self.path(ticker)
+        with self._lock(path):
+            # The bar store skips the network itself while its bars are recent, so prices never lag the events
+            bars = bar_store.get_store().sync(ticker)
+            if bars is None or bars.empty:
+                raise ValueError(f"No bars stored for {ticker}")
+
+            # Skip deriving the events again when the bars have not changed since they were
+            cached = self.read(ticker)
+            if cached is not None and not force and self.is_fresh(ticker):
+                return cached
+
+            # Events from the bars
+            dividends = bars["Dividends"].fillna(0) if "Dividends" in bars.columns else pd.Series(0.0, index=bars.index)
+            events = dividends[dividends > 0]
+            events.index = pd.to_datetime(events.index.strftime("%Y-%m-%d"))
+
+            # Re-adjusted amounts replace the stored ones, and events older than the bars are kept
+            events = events.rename("Dividend").rename_axis("Date")
+            if cached is not None:
+                events = events.combine_first(cached)
+
+            # Only rewrite the file when an event changed, otherwise just mark it fresh
+            path.parent.mkdir(parents=True, exist_ok=True)
+            if cached is not None and events.equals(cached):
+                os.utime(path)
+                return cached
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            events.to_frame().to_parquet(tmp_path)
+            os.replace(tmp_path, path)
+            return events
+
+    # Sync many tickers side by side, returning the reason each failed one could not be synced
+    def sync_many(self, tickers, max_workers=8, force=False):
+        # Failures are collected instead of raised, so one bad ticker does not stop the rest
+        def sync(ticker):
+            try:
+                self.sync(ticker, force=force)
+                return None
+            except Exception as exc:
+                return f"{type(exc).__name__}: {exc}"
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            errors = dict(zip(tickers, executor.map(sync, tickers)))
+        return {ticker: error for ticker, error in errors.items() if error}
+
+    # Yield, growth and frequency of many tickers from the stored events in one pass, and the tickers that failed to sync
+    def metrics(self, tickers, as_of=None, sync=True, max_workers=8):
+        tickers = list(dict.fromkeys(ticker.strip().upper() for ticker in tickers if ticker.strip()))
+        errors = self.sync_many(tickers, max_workers) if sync else {}
+
+        # Last close of every ticker, and all events laid end to end with the position of their ticker
+        prices = np.full(len(tickers), np.nan)
+        last_bar = np.full(len(tickers), np.datetime64("NaT"), dtype="datetime64[D]")
+        codes, dates, amounts = [], [], []
+        for code, ticker in enumerate(tickers):
+            close = self.last_close(ticker)
+            if close is not None:
+                prices[code], last_bar[code] = close[0], np.datetime64(close[1], "D")
+            events = self.read(ticker)
+            if events is not None and len(events):
+                codes.append(np.full(len(events), code))
+                dates.append(events.index.to_numpy(dtype="datetime64[D]"))
+                amounts.append(events.to_numpy(dtype=float))
+        codes = np.concatenate(codes) if codes else np.zeros(0, dtype=int)
+        dates = np.concatenate(dates) if dates else np.zeros(0, dtype="datetime64[D]")
+        amounts = np.concatenate(amounts) if amounts else np.zeros(0)
+
+        # Age of every event in days, counted back from the as-of date or each ticker's last bar
+        reference = np.full(len(tickers), np.datetime64(pd.Timestamp(as_of).date(), "D")) if as_of else last_bar
+        age = np.where(np.isnat(reference[codes]), np.nan, (reference[codes] - dates).astype(float))
+        paid = age >= 0
+        trailing = paid & (age < 365)
+        prior = (age >= 365) & (age < 730)
+
+        # Trailing and prior year sums and counts per ticker
+        size = len(tickers)
+        ttm = np.bincount(codes, amounts * trailing, size)
+        prior_ttm = np.bincount(codes, amounts * prior, size)
+        count = np.bincount(codes, trailing, size)
+
+        # Latest paid event per ticker, as the events of each ticker are in date order
+        latest = np.full(size, -1)
+        np.maximum.at(latest, codes[paid], np.flatnonzero(paid))
+        has_paid = latest >= 0
+        last_amount = np.where(has_paid, amounts[latest], 0.0) if len(amounts) else np.zeros(size)
+        last_date = np.where(has_paid, dates[latest], np.datetime64("NaT")) if len(dates) else last_bar.copy()
+        last_date[~has_paid] = np.datetime64("NaT")
+
+        # Median days between consecutive ex-dates of the last two years, per ticker
+        same = codes[1:] == codes[:-1]
+        recent = same & paid[1:] & (age[1:] < 730)
+        gaps = (dates[1:] - dates[:-1]).astype(float)[recent]
+        gap_codes = codes[1:][recent]
+        order = np.lexsort((gaps, gap_codes))
+        gaps, gap_codes = gaps[order], gap_codes[order]
+        gap_count = np.bincount(gap_codes, minlength=size)
+        first = np.cumsum(gap_count) - gap_count
+        middle = np.clip(np.stack([first + (gap_count - 1) // 2, first + gap_count // 2]), 0, max(len(gaps) - 1, 0))
+        median_gap = gaps[middle].mean(axis=0) if len(gaps) else np.zeros(size)
+
+        # Payments a year from that spacing, or from the trailing count for a ticker with a single payment, snap to
+        # the nearest usual schedule with ties going to the more frequent one. The forward rate repeats the latest payment.
+        rate = np.where(gap_count > 0, 365.25 / np.maximum(median_gap, 1.0), count)
+        schedules = FREQUENCIES[::-1]
+        nearest = schedules[np.abs(rate[:, np.newaxis] - schedules).argmin(axis=1)]
+        frequency = np.where(count > 0, nearest, 0)
+        forward = last_amount * frequency
+
+        # Spread of the log change between consecutive payments of the same ticker
+        changes = np.diff(np.log(amounts))[same] if len(amounts) else np.zeros(0)
+        pairs = codes[1:][same]
+        steps = np.bincount(pairs, minlength=size)
+        mean = np.bincount(pairs, changes, size) / np.maximum(steps, 1)
+        variance = np.bincount(pairs, changes**2, size) / np.maximum(steps, 1) - mean**2
+        volatility = np.where(steps > 1, np.sqrt(np.clip(variance, 0.0, None)), 0.0)
+
+        # Return one row per ticker
+        with np.errstate(divide="ignore", invalid="ignore"):
+            table = pd.DataFrame(
+                {
+                    "Price": prices,
+                    "TTM Dividend": ttm,
+                    "TTM Yield %": ttm / prices * 100,
+                    "Forward Dividend": forward,
+                    "Forward Yield %": forward / prices * 100,
+                    "Dividend Growth %": np.where(prior_ttm > 0, (ttm / prior_ttm - 1) * 100, np.nan),
+                    "Frequency": frequency,
+                    "Last Payment": last_amount,
+                    "Last Ex Date": pd.to_datetime(last_date),
+                    "Months Since Payment": np.where(has_paid, (reference - last_date).astype(float) / 30.44, np.nan),
+                    "Payment Volatility": volatility,
+                },
+                index=pd.Index(tickers, name="Ticker"),
+            )
+        return table, errors
+
+
+# Shared store used by the pages
+_default_store = None
+
+
+# Function to fetch the shared store
+def get_store():
+    # Create the store on first use
+    global _default_store
+    if _default_store is None:
+        _default_store = DividendStore()
+
+    # Return the store
+    return _default_store
+
+
+# Function to fetch the dividend metrics of many tickers from the shared store, with the tickers that failed to sync
+def metrics(tickers, as_of=None):
+    return get_store().metrics(tickers, as_of=as_of)
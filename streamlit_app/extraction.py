@@ -0,0 +1,265 @@
+# Imports
+import argparse
+import hashlib
+import time
+from pathlib import Path
+
+# Import the required libraries
+import pandas as pd
+from lxml import etree, html
+
+
+# One value to pull out of a page, declared as an ordered list of selectors tried until one matches.
+# Selectors are XPath unless prefixed with "css:".
+class Field:
+    def __init__(self, name, *selectors):
+        self.name = name
+        self.selectors = selectors
+        self._compiled = [_compile(selector) for selector in selectors]
+
+    # First non-empty match and the position of the selector that found it, or (None, None)
+    def extract(self, tree):
+        for position, compiled in enumerate(self._compiled):
+            for match in compiled(tree):
+                text = match.text_content() if isinstance(match, etree._Element) else str(match)
+                text = text.strip()
+                if text:
+                    return text, position
+        return None, None
+
+
+# Values pulled out of one page, with a diagnostic for every field that could not be found
+class Extraction:
+    def __init__(self, profile, fields, values, problems, fallbacks):
+        self.profile = profile
+        self.fields = fields
+        self.values = values
+        self.problems = problems
+        self.fallbacks = fallbacks
+
+    @property
+    def ok(self):
+        return not self.problems
+
+    # Values by field name, with the placeholder in place of every missing field
+    def row(self, placeholder="N/A"):
+        return {name: self.values.get(name, placeholder) for name in self.fields}
+
+    # One line naming what went wrong, or None when every field was found
+    def summary(self):
+        if not self.problems:
+            return None
+        reasons = {}
+        for field, reason in self.problems.items():
+            reasons.setdefault(reason, []).append(field)
+        return "; ".join(f"{reason}: {', '.join(fields)}" for reason, fields in reasons.items())
+
+
+# A page layout: its fields declared once with precompiled selectors, optionally read from one window of the page
+class Profile:
+    def __init__(self, name, fields, window=None):
+        self.name = name
+        self.fields = fields
+        # Optional (start marker, end marker) of the part of the page holding every field. Parsing starts at the tag
+        # containing the start marker and stops after the end marker, or at the end of the page without one.
+        self.window = window
+
+        # Records parsed with a different set of selectors must not be reused, so the key carries their digest
+        spec = repr([(field.name, field.selectors) for field in fields] + [window])
+        self.key = f"{name}:{hashlib.sha1(spec.encode()).hexdigest()[:10]}"
+
+    # Part of the page to parse, or the whole page when the start marker is missing
+    def _window(self, content):
+        if self.window is None:
+            return content
+        start_marker, end_marker = self.window
+        start = content.find(start_marker.encode())
+        if start == -1:
+            return content
+        start = content.rfind(b"<", 0, start)
+        end = content.find(end_marker.encode(), start) if end_marker else -1
+        return content[start:] if end == -1 else content[start : end + len(end_marker)]
+
+    # Extraction with the same reason recorded for every field
+    def _failed(self, reason):
+        return Extraction(self.name, [field.name for field in self.fields], {}, {field.name: reason for field in self.fields}, {})
+
+    # Parse a page once and extract every field, recording why each missing one is missing
+    def extract(self, content):
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        values, problems, fallbacks = {}, {}, {}
+
+        # Parse the page, or only the window of it holding the fields
+        try:
+            tree = html.fromstring(self._window(content))
+        except (etree.ParserError, ValueError) as exc:
+            return self._failed(f"page could not be parsed ({type(exc).__name__}: {exc})")
+
+        # Extract every field from the one tree
+        for field in self.fields:
+            value, position = field.extract(tree)
+            if value is None:
+                problems[field.name] = f"no selector matched, the {self.name} page layout may have changed"
+                continue
+            values[field.name] = value
+            if position:
+                fallbacks[field.name] = position
+
+        # Return the values and the diagnostics
+        return Extraction(self.name, [field.name for field in self.fields], values, problems, fallbacks)
+
+    # Extraction of a fetched page, with the request failure or unexpected status recorded for every field
+    def extract_response(self, response):
+        if response is None or response.status_code != 200:
+            return self._failed("request failed" if response is None else f"HTTP {response.status_code}")
+        return self.extract(response.content)
+
+
+# Function to compile a selector into a callable returning its matches
+def _compile(selector):
+    if selector.startswith("css:"):
+        from lxml.cssselect import CSSSelector
+
+        return CSSSelector(selector[len("css:") :])
+    return etree.XPath(selector)
+
+
+# Summary figures on a stockanalysis.com dividend page, found by position under the main element or by their label
+DIVIDEND_PROFILE = Profile(
+    "stockanalysis dividend",
+    [
+        Field("Price", '//*[@id="main"]/div[1]/div[2]/div/div[1]/text()', "css:#main div.text-4xl"),
+        *(
+            Field(
+                name,
+                f'//*[@id="main"]/div[2]/div/div[2]/div[{position}]/div/text()',
+                f'//*[@id="main"]//div[normalize-space(text())="{label}"]/following-sibling::div[1]/text()',
+            )
+            for name, position, label in [
+                ("Yield %", 1, "Dividend Yield"),
+                ("Annual Dividend", 2, "Annual Dividend"),
+                ("Ex Dividend Date", 3, "Ex-Dividend Date"),
+                ("Frequency", 4, "Payout Frequency"),
+                ("Dividend Growth %", 6, "Dividend Growth"),
+            ]
+        ),
+    ],
+    window=('id="main"', "</main>"),
+)
+
+# Performance buttons on a TradingView symbol page, found by position or by the period they are labelled with
+PERFORMANCE_PROFILE = Profile(
+    "tradingview performance",
+    [
+        Field(
+            name,
+            f'//*[@id="js-category-content"]/div[2]/div/section/div[1]/div[2]/div/div[2]/div/div[2]/button[{position}]/span/span[2]/text()',
+            f'//button[span/span[text()="{label}"]]/span/span[@class="change-tEo1hPMj"]/text()',
+        )
+        for position, (name, label) in enumerate(
+            [
+                ("1 Day", "1 day"),
+                ("5 Days", "5 days"),
+                ("1 Month", "1 month"),
+                ("6 Month", "6 months"),
+                ("YTD", "Year to date"),
+                ("1 Year", "1 year"),
+                ("5 Year", "5 years"),
+                ("All Time", "All time"),
+            ],
+            start=1,
+        )
+    ],
+    window=('id="js-category-content"', None),
+)
+
+# Profiles by the prefix of their recorded fixtures
+PROFILES = {"dividend": DIVIDEND_PROFILE, "performance": PERFORMANCE_PROFILE}
+
+
+# Function to save a fetched page as a fixture named <profile>_<TICKER>.html
+def record_fixture(url, fixture_dir, profile, ticker, client=None):
+    import http_client
+
+    # Download the page
+    client = client or http_client.get_client()
+    response = client.get(url)
+    response.raise_for_status()
+
+    # Save it next to the other recordings
+    fixture_dir = Path(fixture_dir)
+    fixture_dir.mkdir(parents=True, exist_ok=True)
+    path = fixture_dir / f"{profile}_{ticker}.html"
+    path.write_bytes(response.content)
+
+    # Return the path of the recording
+    return path
+
+
+# Function to extract a page the way the pages used to: a full parse and every selector string evaluated afresh
+def _extract_per_call(profile, content):
+    tree = html.fromstring(content)
+    values = {}
+    for field in profile.fields:
+        for selector in field.selectors:
+            matches = tree.cssselect(selector[len("css:") :]) if selector.startswith("css:") else tree.xpath(selector)
+            if matches:
+                match = matches[0]
+                values[field.name] = (match.text_content() if isinstance(match, etree._Element) else str(match)).strip()
+                break
+    return values
+
+
+# Function to time full parses with per-call selectors against compiled profiles on recorded pages
+def benchmark(fixture_dir, repeats=20):
+    rows = []
+    for path in sorted(Path(fixture_dir).glob("*.html")):
+        profile = PROFILES.get(path.stem.split("_", 1)[0])
+        if profile is None:
+            continue
+        content = path.read_bytes()
+
+        # Time the old way
+        started = time.perf_counter()
+        for _ in range(repeats):
+            legacy = _extract_per_call(profile, content)
+        legacy_seconds = (time.perf_counter() - started) / repeats
+
+        # Time the compiled profile
+        started = time.perf_counter()
+        for _ in range(repeats):
+            extraction = profile.extract(content)
+        profile_seconds = (time.perf_counter() - started) / repeats
+
+        rows.append(
+            {
+                "Fixture": path.name,
+                "KB": len(content) / 1024,
+                "Per-call ms": legacy_seconds * 1000,
+                "Profile ms": profile_seconds * 1000,
+                "Speed-up": legacy_seconds / profile_seconds,
+                "Fields": len(extraction.values),
+                "Same values": legacy == extraction.values,
+                "Problems": extraction.summary() or "",
+            }
+        )
+
+    # Return the comparison
+    return pd.DataFrame(rows)
+
+
+# Run the benchmark over pages recorded with record_fixture
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark compiled extraction profiles against per-call XPath evaluation")
+    parser.add_argument("fixture_dir", help="directory of recorded <profile>_<TICKER>.html files")
+    parser.add_argument("--repeats", type=int, default=20, help="extractions timed per page")
+    parser.add_argument("--record", nargs="*", default=[], metavar="TICKER", help="record the pages of these tickers first")
+    args = parser.parse_args()
+
+    # Record fresh pages when asked
+    for ticker in args.record:
+        record_fixture(f"https://stockanalysis.com/stocks/{ticker}/dividend/", args.fixture_dir, "dividend", ticker)
+        record_fixture(f"https://www.tradingview.com/symbols/{ticker}/", args.fixture_dir, "performance", ticker)
+
+    print(benchmark(args.fixture_dir, repeats=args.repeats).to_string(index=False))
@@ -0,0 +1,100 @@
+# Imports
+from concurrent.futures import as_completed
+
+# Import numpy
+import numpy as np
+
+# Import the required libraries
+from statsmodels.tsa.statespace.sarimax import SARIMAX
+
+# Import the forecast intervals, fitted model cache, order search and shared worker pool
+import intervals
+import model_cache
+import order_registry
+import order_search
+import worker_pool
+
+
+# Function to predict the test area and the days past the last observation, with the joint distribution of the latter
+def _predict(model, length, horizon, split):
+    start = int(length * split)
+    end = length - 1
+    return {
+        "order": tuple(model.model.order),
+        "seasonal_order": tuple(model.model.seasonal_order),
+        "predictions": model.predict(start=start, end=end),
+        "forecast": model.predict(start=end, end=end + horizon),
+        "distribution": intervals.forecast_distribution(model, horizon),
+    }
+
+
+# Function to fit the seasonal model for one series with a known ARIMA order
+def fit_series(values, order, seasonality, horizon, split=0.8, ticker=None, name=None, partial=False):
+    # Fit the seasonal model
+    values = np.asarray(values, dtype=float)
+    seasonal_order = (*order, seasonality)
+    model = SARIMAX(values, order=order, seasonal_order=seasonal_order).fit(disp=False)
+
+    # Cache the fit so the next run can extend it instead of refitting
+    if ticker and name:
+        model_cache.get_cache().put(ticker, name, values, model, partial=partial)
+
+    # Return the fitted orders and predictions
+    return _predict(model, len(values), horizon, split)
+
+
+# Function to fit many named series at once on the process pool, caching the fits when a ticker is given.
+# partial says the last value of every series comes from a session that has not closed yet.
+def fit_many(series, seasonality, horizon, split=0.8, max_workers=None, ticker=None, progress=None, partial=False):
+    series = {name: np.asarray(values, dtype=float) for name, values in series.items()}
+    fits = {}
+
+    # Report progress as (stage, series done, series total) when asked to
+    def report(stage):
+        if progress is not None:
+            progress(stage, len(fits), len(series))
+
+    # Reuse cached fits, extended with any new bars, which skips the order search altogether
+    if ticker:
+        for name, values in series.items():
+            model = model_cache.get_cache().find(ticker, name, values, seasonality, partial=partial)
+            if model is not None:
+                full_seconds = order_registry.get_registry().full_search_seconds(ticker, name)
+                fits[name] = _predict(model, len(values), horizon, split)
+                fits[name]["order_search"] = {
+                    "full_search": False,
+                    "search_seconds": 0.0,
+                    "batch_seconds": 0.0,
+                    "saved_seconds": full_seconds or 0.0,
+                }
+
+    # Select the orders of the rest together, warm-started from past selections when a ticker is given
+    misses = {name: values for name, values in series.items() if name not in fits}
+    report("Selecting ARIMA orders")
+    if ticker:
+        orders = order_registry.get_registry().select_orders(misses, ticker, max_workers=max_workers)
+    else:
+        orders = order_search.select_orders(misses, max_workers=max_workers)
+
+    # Fit the seasonal models side by side
+    report("Fitting seasonal models")
+    pool = worker_pool.get_pool(max_workers)
+    futures = {
+        pool.submit(fit_series, values, orders[name][0], seasonality, horizon, split, ticker, name, partial): name
+        for name, values in misses.items()
+    }
+    try:
+        for future in as_completed(futures):
+            name = futures[future]
+            fits[name] = future.result()
+            fits[name]["order_search"] = orders[name][1]
+            report("Fitting seasonal models")
+
+    # Drop the fits that have not started when the caller gives up, such as a cancelled job
+    except BaseException:
+        for future in futures:
+            future.cancel()
+        raise
+
+    # Return the results in the order they were given
+    return {name: fits[name] for name in series}
@@ -0,0 +1,248 @@
+# Imports
+import datetime as dt
+
+# Import numpy and pandas
+import numpy as np
+import pandas as pd
+
+# Import the required libraries
+from pandas.tseries.holiday import USFederalHolidayCalendar
+from pandas.tseries.offsets import BDay, CustomBusinessDay
+from statsmodels.tsa.statespace.sarimax import SARIMAX
+
+# Import the local stores, indicators, engines, preview, forecast intervals and shared worker pool
+import backtest
+import bar_store
+import coalesce
+import forecast_engine
+import forecast_store
+import indicators
+import intervals
+import order_registry
+import preview
+import worker_pool
+
+# Stages of each run, with the share of the progress bar they span
+FORECAST_STAGES = {
+    "Loading bars": (0.0, 0.05),
+    "Computing MACD": (0.05, 0.1),
+    "Selecting ARIMA orders": (0.1, 0.4),
+    "Fitting seasonal models": (0.4, 0.9),
+    "Building forecast table": (0.9, 0.95),
+    "Simulating intervals": (0.95, 1.0),
+}
+HOLDOUT_STAGES = {
+    "Loading bars": (0.0, 0.1),
+    "Selecting ARIMA order": (0.1, 0.5),
+    "Fitting seasonal model": (0.5, 0.95),
+    "Simulating intervals": (0.95, 1.0),
+}
+WALK_FORWARD_STAGES = {
+    "Loading bars": (0.0, 0.1),
+    "Selecting ARIMA order": (0.1, 0.4),
+    "Backtesting origins": (0.4, 1.0),
+}
+
+
+# Function to report a stage to the job running the pipeline, which also stops the run once it is cancelled
+def _report(job, stages, stage, done=0, total=1):
+    if job is None:
+        return
+    start, end = stages[stage]
+    job.report(stage, start + (end - start) * done / max(total, 1))
+
+
+# Function to load the closing prices of a ticker as New York dates
+def _load_close(ticker, start_date, end_date=None):
+    start = pd.to_datetime(start_date).tz_localize("America/New_York")
+    end = pd.to_datetime(end_date).tz_localize("America/New_York") if end_date is not None else None
+    df = bar_store.get_bars(ticker, start=start, end=end)
+    if df.empty:
+        raise ValueError(f"No bars stored for {ticker} in the requested range")
+    df.index = pd.to_datetime(df.index.strftime("%Y-%m-%d")).tz_localize("America/New_York")
+    return df[["Close"]].sort_index()
+
+
+# Function to lay the forecasts out by market day after the second to last bar, one per forecast step
+def _forecast_table(df, fits):
+    dates = pd.bdate_range(df.index[-2] + BDay(1), periods=len(fits["C"]["forecast"]), name="Date")
+    return pd.DataFrame({f"{name}pred_future": fits[name]["forecast"] for name in ("C", "M", "S", "H")}, index=dates)
+
+
+# Function to arrange H, C, M and S as the page fits them
+def _series(df):
+    return {
+        "H": df["Histogram"].dropna().tolist(),
+        "C": df["Close"].dropna().tolist(),
+        "M": df["MACD"].dropna().tolist(),
+        "S": df["Signal"].dropna().tolist(),
+    }
+
+
+# Function to run the forecasting page: MACD on the closes, then H, C, M and S fitted and forecast
+def run_forecast(ticker, start_date, seasonality=22, fast=13, slow=39, horizon=30, job=None):
+    # Bars from the local store
+    _report(job, FORECAST_STAGES, "Loading bars")
+    df = _load_close(ticker, start_date)
+
+    # MACD, the 9 span Signal line and the Histogram
+    _report(job, FORECAST_STAGES, "Computing MACD")
+    df[["MACD", "Signal", "Histogram"]] = indicators.macd_frame(df["Close"], fast, slow, 9)
+
+    # Fit H, C, M and S side by side, each with its own ARIMA order
+    fits = forecast_engine.fit_many(
+        _series(df),
+        seasonality=seasonality,
+        horizon=horizon,
+        split=0.80,
+        ticker=ticker,
+        progress=lambda stage, done, total: _report(job, FORECAST_STAGES, stage, done, total),
+        partial=not bar_store.session_closed(df.index[-1]),
+    )
+
+    # Market days after the second to last bar, one per forecast step
+    _report(job, FORECAST_STAGES, "Building forecast table")
+    forecast = _forecast_table(df, fits)
+
+    # Quantile fans of Close and MACD from paths simulated out of the fitted models
+    _report(job, FORECAST_STAGES, "Simulating intervals")
+    fans = intervals.fan(
+        {name: fits[name]["distribution"] for name in ("C", "M")},
+        forecast.index,
+        start={name: fits[name]["forecast"][0] for name in ("C", "M")},
+    )
+
+    # Return everything the page draws
+    return {
+        "ticker": ticker,
+        "start_date": pd.to_datetime(start_date).tz_localize("America/New_York"),
+        "horizon": horizon,
+        "history": df,
+        "forecast": forecast,
+        "intervals": fans,
+        "fits": fits,
+        "saved_seconds": sum(fit["order_search"]["saved_seconds"] for fit in fits.values()),
+        "preview": False,
+    }
+
+
+# Function to forecast the same series with exponential smoothing, for the page to show while the full run is queued
+def run_preview(ticker, start_date, seasonality=22, fast=13, slow=39, horizon=30):
+    df = _load_close(ticker, start_date)
+    df[["MACD", "Signal", "Histogram"]] = indicators.macd_frame(df["Close"], fast, slow, 9)
+    fits = preview.preview_many(_series(df), horizon)
+    return {
+        "ticker": ticker,
+        "start_date": pd.to_datetime(start_date).tz_localize("America/New_York"),
+        "horizon": horizon,
+        "history": df,
+        "forecast": _forecast_table(df, fits),
+        "fits": fits,
+        "saved_seconds": 0.0,
+        "preview": True,
+    }
+
+
+# Function to date the default start of a forecasting page run from the last completed session of the stored bars,
+# so the page and the nightly run ask for the same run on any day until the next session closes
+def default_start_date(ticker, lookback_days=365):
+    bars = bar_store.get_store().read(ticker)
+    if bars is None or bars.empty:
+        return dt.date.today() - dt.timedelta(days=lookback_days)
+    last = bars.index[-1] if len(bars) < 2 or bar_store.session_closed(bars.index[-1]) else bars.index[-2]
+    return last.date() - dt.timedelta(days=lookback_days)
+
+
+# Function to key a forecasting page run the way the job queue does
+def forecast_key(ticker, start_date, seasonality=22, fast=13, slow=39, horizon=30):
+    params = {"seasonality": seasonality, "fast": fast, "slow": slow, "horizon": horizon}
+    return coalesce.canonical_key(run_forecast, (ticker, start_date), params)
+
+
+# Function to fetch a precomputed forecasting page run computed on the latest bars, syncing the bars first.
+# While today's session is still open its partial bar is newer than the nightly run, so the run on the last
+# completed session is served instead. Returns the result, or None, and whether it is from that earlier session.
+def stored_forecast(ticker, start_date, seasonality=22, fast=13, slow=39, horizon=30):
+    key = forecast_key(ticker, start_date, seasonality, fast, slow, horizon)
+    bars = bar_store.get_store().sync(ticker)
+    if bars is None or not len(bars):
+        return None, False
+
+    # Run on every stored bar
+    store = forecast_store.get_store()
+    result = store.get(key, bars.index[-1].strftime("%Y-%m-%d"))
+    if result is not None or len(bars) < 2 or bar_store.session_closed(bars.index[-1]):
+        return result, False
+
+    # Run on the bars up to the last completed session
+    result = store.get(key, bars.index[-2].strftime("%Y-%m-%d"))
+    return result, result is not None
+
+
+# Function to fit one seasonal model and forecast past the last observation, run on the worker pool
+def _fit_and_forecast(values, order, seasonal_order, steps):
+    model = SARIMAX(values, order=order, seasonal_order=seasonal_order).fit(disp=False)
+    predictions = np.asarray(model.predict(start=len(values), end=len(values) + steps - 1, dynamic=True))
+    return predictions, intervals.forecast_distribution(model, steps)
+
+
+# Function to run the Backtest page: fit the closes up to the end date and forecast the next market days
+def run_holdout(ticker, start_date, end_date, seasonality=22, horizon=30, job=None):
+    # Bars from the local store
+    _report(job, HOLDOUT_STAGES, "Loading bars")
+    close = _load_close(ticker, start_date, end_date)["Close"].dropna()
+
+    # ARIMA order from the registry
+    _report(job, HOLDOUT_STAGES, "Selecting ARIMA order")
+    order, order_search = order_registry.get_registry().select_order(close.values, ticker, "Close")
+    seasonal_order = (*order, seasonality)
+
+    # Market days after the end date, skipping federal holidays
+    cal = USFederalHolidayCalendar()
+    holidays = cal.holidays(start=close.index.max(), end=close.index.max() + pd.DateOffset(days=90))
+    future_dates = pd.bdate_range(start=close.index.max(), periods=horizon + len(holidays), freq="B")
+    future_dates = future_dates[~future_dates.isin(holidays)][:horizon]
+
+    # Fit and forecast on the worker pool
+    _report(job, HOLDOUT_STAGES, "Fitting seasonal model")
+    future = worker_pool.get_pool().submit(_fit_and_forecast, close.values, order, seasonal_order, len(future_dates))
+    predictions, distribution = future.result()
+    custom_business_day = CustomBusinessDay(calendar=USFederalHolidayCalendar())
+    index = pd.date_range(start=future_dates[0], periods=len(predictions), freq=custom_business_day)
+
+    # Quantile fan of the closes from paths simulated out of the fitted model
+    _report(job, HOLDOUT_STAGES, "Simulating intervals")
+    fans = intervals.fan({"C": distribution}, index)
+
+    # Return the closes and the forecast
+    return {
+        "ticker": ticker,
+        "close": close,
+        "predictions": pd.Series(predictions, index=index, name="Forecasted Price"),
+        "intervals": fans["C"],
+        "order": order,
+        "order_search": order_search,
+    }
+
+
+# Function to run the walk-forward backtest of the Backtest page
+def run_walk_forward(
+    ticker, start_date, end_date, seasonality=22, horizon=30, origins=10, window="expanding", refit_every=None, job=None
+):
+    # Bars from the local store
+    _report(job, WALK_FORWARD_STAGES, "Loading bars")
+    close = _load_close(ticker, start_date, end_date)["Close"].dropna()
+
+    # ARIMA order from the registry, searched only on the bars before the first origin so no origin sees its future
+    _report(job, WALK_FORWARD_STAGES, "Selecting ARIMA order")
+    planned = backtest.plan_origins(len(close), horizon, origins, season=seasonality)
+    order, _ = order_registry.get_registry().select_order(close.values[: planned[0]], ticker, "Close")
+
+    # Score every origin
+    _report(job, WALK_FORWARD_STAGES, "Backtesting origins")
+    per_origin, aggregate = backtest.walk_forward(
+        close, order, (*order, seasonality), horizon=horizon, origins=planned, window=window, refit_every=refit_every
+    )
+
+    # Return the per-origin and aggregate metrics
+    return {"ticker": ticker, "per_origin": per_origin, "aggregate": aggregate}
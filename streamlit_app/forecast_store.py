@@ -0,0 +1,74 @@
+# Imports
+import hashlib
+import os
+import pickle
+import time
+from pathlib import Path
+
+# Location of the precomputed forecast results
+STORE_DIR = Path.cwd() / "data" / "forecasts"
+
+
+# Disk store of finished forecast runs, each valid for the bars it was computed on
+class ForecastStore:
+    def __init__(self, root=STORE_DIR, keep_days=7):
+        self.root = Path(root)
+        self.keep_days = keep_days
+
+    # Path of the file holding the result of one run key
+    def path(self, key):
+        return self.root / f"{hashlib.sha1(key.encode()).hexdigest()[:20]}.pkl"
+
+    # Return the stored result for a run key when it was computed on bars up to as_of, otherwise None
+    def get(self, key, as_of):
+        path = self.path(key)
+        if not path.exists():
+            return None
+        try:
+            with open(path, "rb") as file:
+                entry = pickle.load(file)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        if entry["key"] != key or entry["as_of"] != as_of:
+            return None
+        return entry["result"]
+
+    # Store the result of a run key computed on bars up to as_of
+    def put(self, key, as_of, result):
+        # Describe the entry
+        entry = {"key": key, "as_of": as_of, "created": time.time(), "result": result}
+
+        # Write atomically so readers never see a half-written file
+        path = self.path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as file:
+            pickle.dump(entry, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    # Remove results older than keep_days
+    def prune(self):
+        if not self.root.exists():
+            return 0
+        cutoff = time.time() - self.keep_days * 86400
+        removed = 0
+        for path in self.root.glob("*.pkl"):
+            if path.stat().st_mtime < cutoff:
+                path.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+
+# Shared store used by the pages and the nightly run
+_default_store = None
+
+
+# Function to fetch the shared store
+def get_store():
+    # Create the store on first use
+    global _default_store
+    if _default_store is None:
+        _default_store = ForecastStore()
+
+    # Return the store
+    return _default_store
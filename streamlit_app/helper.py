@@ -1,7 +1,5 @@
 # Imports
-import datetime as dt
-import os
-from pathlib import Path
+import logging
 
 # Import pandas
 import pandas as pd
@@ -9,23 +7,19 @@ import pandas as pd
 # Import yfinance
 import yfinance as yf
 
-# Import the required libraries
-from statsmodels.tsa.ar_model import AutoReg
+# Import the batched AR engine, local bar store and issuer index
+import autoreg
+import bar_store
+import issuer_index
+
+# Log of the predictions that could not be made, as generate_stock_prediction only returns Nones for them
+logger = logging.getLogger(__name__)
 
 
 # Create function to fetch stock name and id
 def fetch_stocks():
-    # Load the data
-    df = pd.read_csv(Path.cwd() / "data" / "equity_issuers.csv")
-
-    # Filter the data
-    df = df[["Security Code", "Issuer Name"]]
-
-    # Create a dictionary
-    stock_dict = dict(zip(df["Security Code"], df["Issuer Name"]))
-
-    # Return the dictionary
-    return stock_dict
+    # Return the Issuer Name to Security Id dictionary of the issuer index, which is built once per process
+    return issuer_index.get_index().stock_names()
 
 
 # Create function to fetch periods and intervals
@@ -141,11 +135,8 @@ def fetch_stock_info(stock_ticker):
 
 # Function to fetch the stock history
 def fetch_stock_history(stock_ticker, period, interval):
-    # Pull the data for the first security
-    stock_data = yf.Ticker(stock_ticker)
-
-    # Extract full of the stock
-    stock_data_history = stock_data.history(period=period, interval=interval)[
+    # Read the bars from the local store, which only downloads the missing tail
+    stock_data_history = bar_store.get_store().get_period(stock_ticker, period, interval)[
         ["Open", "High", "Low", "Close"]
     ]
 
@@ -153,48 +144,58 @@ def fetch_stock_history(stock_ticker, period, interval):
     return stock_data_history
 
 
-# Function to generate the stock prediction
-def generate_stock_prediction(stock_ticker):
-    # Try to generate the predictions
-    try:
-        # Pull the data for the first security
-        stock_data = yf.Ticker(stock_ticker)
+# Function to prepare the daily closes, training and testing areas of one ticker
+def _prediction_frames(stock_ticker):
+    # Read the last 2y of daily bars from the local store
+    stock_data_hist = bar_store.get_store().get_period(stock_ticker, "2y", "1d")
+    if stock_data_hist.empty:
+        raise ValueError(f"No bars stored for {stock_ticker}")
 
-        # Extract the data for last 1yr with 1d interval
-        stock_data_hist = stock_data.history(period="2y", interval="1d")
+    # Clean the data for to keep only the required columns
+    stock_data_close = stock_data_hist[["Close"]]
 
-        # Clean the data for to keep only the required columns
-        stock_data_close = stock_data_hist[["Close"]]
+    # Change frequency to day and fill missing values
+    stock_data_close = stock_data_close.asfreq("D").ffill()
 
-        # Change frequency to day
-        stock_data_close = stock_data_close.asfreq("D", method="ffill")
+    # Define training and testing area
+    train_df = stock_data_close.iloc[: int(len(stock_data_close) * 0.9) + 1]  # 90%
+    test_df = stock_data_close.iloc[int(len(stock_data_close) * 0.9) :]  # 10%
+    return train_df, test_df
 
-        # Fill missing values
-        stock_data_close = stock_data_close.fillna(method="ffill")
 
-        # Define training and testing area
-        train_df = stock_data_close.iloc[: int(len(stock_data_close) * 0.9) + 1]  # 90%
-        test_df = stock_data_close.iloc[int(len(stock_data_close) * 0.9) :]  # 10%
+# Function to generate the stock predictions of many tickers with one batched AR(250) fit
+def generate_stock_predictions(stock_tickers, lags=250, horizon_days=90):
+    # Prepare every ticker, keeping the reason a ticker could not be used
+    frames, errors = {}, {}
+    for stock_ticker in stock_tickers:
+        try:
+            frames[stock_ticker] = _prediction_frames(stock_ticker)
+        except (KeyError, ValueError, OSError) as exc:
+            errors[stock_ticker] = f"{type(exc).__name__}: {exc}"
+    usable = {ticker: frame for ticker, frame in frames.items() if len(frame[0]) - lags > lags + 1}
+    for ticker in frames.keys() - usable.keys():
+        errors[ticker] = f"ValueError: not enough history for {lags} lags"
 
-        # Define training model
-        model = AutoReg(train_df["Close"], 250).fit(cov_type="HC0")
+    # Fit and forecast all tickers together, from the start of the testing area to 90 days past its end
+    trains = {ticker: train_df["Close"].to_numpy() for ticker, (train_df, _) in usable.items()}
+    steps = {ticker: len(test_df) + horizon_days for ticker, (_, test_df) in usable.items()}
+    forecasts = autoreg.fit_predict_many(trains, lags, steps)
 
-        # Predict data for test data
-        predictions = model.predict(
-            start=test_df.index[0], end=test_df.index[-1], dynamic=True
-        )
+    # Same train, test, forecast and predictions tuple per ticker as before
+    results = {}
+    for ticker, (train_df, test_df) in usable.items():
+        index = pd.date_range(test_df.index[0], periods=steps[ticker], freq="D")
+        forecast = pd.Series(forecasts[ticker], index=index)
+        results[ticker] = train_df, test_df, forecast, forecast.iloc[: len(test_df)]
 
-        # Predict 90 days into the future
-        forecast = model.predict(
-            start=test_df.index[0],
-            end=test_df.index[-1] + dt.timedelta(days=90),
-            dynamic=True,
-        )
+    # Return the results and the tickers that failed
+    return results, errors
 
-        # Return the required data
-        return train_df, test_df, forecast, predictions
 
-    # If error occurs
-    except:
-        # Return None
-        return None, None, None, None
+# Function to generate the stock prediction
+def generate_stock_prediction(stock_ticker):
+    # Run the batched engine for one ticker, logging why it could not be predicted and returning Nones
+    results, errors = generate_stock_predictions([stock_ticker])
+    if stock_ticker in errors:
+        logger.warning("Could not predict %s: %s", stock_ticker, errors[stock_ticker])
+    return results.get(stock_ticker, (None, None, None, None))
@@ -0,0 +1,215 @@
+# Imports
+import argparse
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+# Import the required libraries
+import requests
+from requests.adapters import HTTPAdapter
+
+# Browser-like headers, as the scraped sites turn away the default python-requests agent
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+# Requests in flight and started per second for each host, the default covering any host not listed.
+# The scraped hosts allow a 50 ticker page to go out in about a second.
+HOST_LIMITS = {
+    "default": (8, 20.0),
+    "stockanalysis.com": (16, 50.0),
+    "www.tradingview.com": (16, 50.0),
+    "query2.finance.yahoo.com": (8, 10.0),
+}
+
+# Status codes worth another attempt
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+# Caps how many requests to one host run at once and how often a new one may start
+class HostLimiter:
+    def __init__(self, max_in_flight=8, per_second=20.0):
+        self.interval = 1.0 / per_second if per_second else 0.0
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    # Wait for a free slot and for the next start time, then hold the slot until the block ends
+    def __enter__(self):
+        self._slots.acquire()
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_start - now
+            self._next_start = max(now, self._next_start) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+        return self
+
+    def __exit__(self, *exc_info):
+        self._slots.release()
+
+
+# Shared HTTP fetch layer: pooled connections, per-host limits, retries with backoff and one request per URL in flight
+class HttpClient:
+    def __init__(self, max_workers=32, host_limits=None, retries=3, backoff=0.5, timeout=30):
+        self.host_limits = {**HOST_LIMITS, **(host_limits or {})}
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.stats = {"requests": 0, "retries": 0, "deduplicated": 0, "failed": 0}
+
+        # One session keeps a pool of open connections per host, sized to the host's limit
+        self.session = requests.Session()
+        self.session.headers.update(HEADERS)
+        pool_size = max(limit for limit, _ in self.host_limits.values())
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="http")
+        self._limiters = {}
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    # Limiter of the host a URL points at
+    def _limiter(self, url):
+        host = urlsplit(url).hostname or ""
+        with self._lock:
+            if host not in self._limiters:
+                self._limiters[host] = HostLimiter(*self.host_limits.get(host, self.host_limits["default"]))
+            return self._limiters[host]
+
+    # Count a statistic under the lock, as several threads update them
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    # Seconds to wait before another attempt, honouring a Retry-After header in seconds up to the longest backoff,
+    # so a server asking for minutes cannot hold a page and its worker thread that long
+    def _delay(self, attempt, response=None):
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.backoff * 2**self.retries)
+        return self.backoff * 2**attempt * (0.5 + random.random())
+
+    # Fetch a URL, retrying connection errors and retryable statuses, and return the last response
+    def _fetch(self, url, headers=None):
+        limiter = self._limiter(url)
+        for attempt in range(self.retries + 1):
+            response = None
+            try:
+                with limiter:
+                    self._count("requests")
+                    response = self.session.get(url, headers=headers, timeout=self.timeout)
+                if response.status_code not in RETRY_STATUSES or attempt == self.retries:
+                    return response
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.retries:
+                    self._count("failed")
+                    raise
+            self._count("retries")
+            time.sleep(self._delay(attempt, response))
+
+    # Start fetching a URL and return a future of its response, sharing the request already in flight for it
+    def submit(self, url, headers=None):
+        key = (url, tuple(sorted((headers or {}).items())))
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.stats["deduplicated"] += 1
+                return future
+            future = self._executor.submit(self._fetch, url, headers)
+            self._in_flight[key] = future
+
+        # Forget the request once it lands, so the next call fetches afresh
+        def forget(_):
+            with self._lock:
+                if self._in_flight.get(key) is future:
+                    del self._in_flight[key]
+
+        future.add_done_callback(forget)
+        return future
+
+    # Fetch one URL and wait for its response
+    def get(self, url, headers=None):
+        return self.submit(url, headers).result()
+
+    # Fetch many URLs at once and return the response, or the exception raised, of each
+    def get_many(self, urls):
+        futures = {url: self.submit(url) for url in dict.fromkeys(urls)}
+        results = {}
+        for url, future in futures.items():
+            try:
+                results[url] = future.result()
+            except requests.RequestException as exc:
+                results[url] = exc
+        return results
+
+
+# Shared client used by the pages
+_default_client = None
+_default_client_guard = threading.Lock()
+
+
+# Function to fetch the shared client
+def get_client():
+    # Create the client on first use
+    global _default_client
+    with _default_client_guard:
+        if _default_client is None:
+            _default_client = HttpClient()
+
+    # Return the client
+    return _default_client
+
+
+if __name__ == "__main__":
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    parser = argparse.ArgumentParser(description="Time the client against a local stand-in server")
+    parser.add_argument("--requests", type=int, default=150, help="distinct URLs requested at once")
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds the stand-in takes per response")
+    parser.add_argument("--flaky", type=float, default=0.1, help="share of first attempts answered with 503")
+    args = parser.parse_args()
+
+    # Stand-in that answers slowly and fails some first attempts
+    seen = set()
+    seen_guard = threading.Lock()
+
+    class StandIn(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(args.latency)
+            with seen_guard:
+                first = self.path not in seen
+                seen.add(self.path)
+            status = 503 if first and random.random() < args.flaky else 200
+            body = f"<html><body>{self.path}</body></html>".encode()
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    # Serial plain requests against the pooled client, with every URL asked for twice to show deduplication
+    urls = [f"{base}/quote/{number}" for number in range(args.requests)]
+    started = time.perf_counter()
+    for url in urls[:10]:
+        requests.get(url, timeout=30)
+    serial = (time.perf_counter() - started) / 10 * len(urls)
+    client = HttpClient(host_limits={"127.0.0.1": (32, None)}, backoff=0.05)
+    started = time.perf_counter()
+    futures = [client.submit(url) for url in urls + urls]
+    statuses = [future.result().status_code for future in futures]
+    pooled = time.perf_counter() - started
+    print(f"{len(urls)} URLs: about {serial:.1f}s one after another, {pooled:.1f}s through the client")
+    print(f"{statuses.count(200)} of {len(statuses)} calls answered 200, stats {client.stats}")
+    server.shutdown()
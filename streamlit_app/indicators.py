@@ -0,0 +1,99 @@
+# Import numpy and pandas
+import numpy as np
+import pandas as pd
+
+# Import the required libraries
+from scipy.signal import lfilter
+
+# Import the local bar store
+import bar_store
+
+
+# Function to build a dates x tickers matrix of closing prices from the bar store
+def price_matrix(tickers, start=None, end=None):
+    closes = {ticker: bar_store.get_bars(ticker, start=start, end=end)["Close"] for ticker in tickers}
+    return pd.DataFrame(closes).sort_index()
+
+
+# Function to fill gaps so the filters run over every column at once
+def _fill(values):
+    # Forward fill interior gaps
+    values = pd.DataFrame(values).ffill().to_numpy(dtype=float, copy=True)
+
+    # Start every column on its first price, so leading gaps do not move the average
+    leading = np.isnan(values)
+    first = np.where(leading.all(axis=0), 0.0, values[np.argmax(~leading, axis=0), np.arange(values.shape[1])])
+    values[leading] = np.broadcast_to(first, values.shape)[leading]
+    return values, leading
+
+
+# Function to compute exponential moving averages for many spans along the first axis
+def ema(values, spans):
+    # Same recursion as pandas ewm(span=..., adjust=False): y[0] = x[0], y[t] = (1 - a) y[t-1] + a x[t]
+    values = np.asarray(values, dtype=float)
+    averages = np.empty((len(spans),) + values.shape)
+    for i, span in enumerate(spans):
+        if span < 1:
+            raise ValueError(f"EMA span must be at least 1, got {span}")
+        alpha = 2.0 / (span + 1.0)
+        initial = (1 - alpha) * values[:1]
+        averages[i] = lfilter([alpha], [1.0, alpha - 1.0], values, axis=0, zi=initial)[0]
+    return averages
+
+
+# Function to compute MACD, Signal and Histogram for every ticker and (fast, slow, signal) set
+def macd(prices, params):
+    # Arrange the prices as dates x tickers
+    values, leading = _fill(prices)
+
+    # Each distinct span is filtered once, over every ticker together
+    spans = sorted({span for fast, slow, _ in params for span in (fast, slow)})
+    averages = ema(values, spans)
+    position = {span: i for i, span in enumerate(spans)}
+    fast = np.array([position[fast] for fast, _, _ in params])
+    slow = np.array([position[slow] for _, slow, _ in params])
+    macd_values = averages[fast] - averages[slow]
+
+    # The signal line is the EMA of the MACD, filtered once per distinct signal span
+    signal_values = np.empty_like(macd_values)
+    signal_spans = np.array([signal for _, _, signal in params])
+    for span in np.unique(signal_spans):
+        selected = signal_spans == span
+        signal_values[selected] = ema(macd_values[selected].swapaxes(0, 1), [span])[0].swapaxes(0, 1)
+
+    # Leave the dates before each ticker's first price empty
+    histogram_values = macd_values - signal_values
+    for tensor in (macd_values, signal_values, histogram_values):
+        tensor[:, leading] = np.nan
+
+    # Return params x dates x tickers tensors
+    return {"MACD": macd_values, "Signal": signal_values, "Histogram": histogram_values}
+
+
+# Function to compute the MACD columns for one price series, as the forecasting page uses them
+def macd_frame(close, fast, slow, signal=9):
+    tensors = macd(close.to_frame(), [(fast, slow, signal)])
+    return pd.DataFrame({name: tensor[0, :, 0] for name, tensor in tensors.items()}, index=close.index)
+
+
+# Function to screen the latest MACD readings across tickers and parameter sets
+def screen(prices, params):
+    # Compute every combination in one pass
+    prices = pd.DataFrame(prices)
+    tensors = macd(prices, params)
+    histogram = tensors["Histogram"]
+
+    # A crossover is a change in the sign of the histogram on the last bar
+    crossover = np.sign(histogram[:, -1]) != np.sign(histogram[:, -2]) if len(prices) > 1 else False
+
+    # Return one row per parameter set and ticker
+    index = pd.MultiIndex.from_product([params, prices.columns], names=["Params", "Ticker"])
+    return pd.DataFrame(
+        {
+            "MACD": tensors["MACD"][:, -1].ravel(),
+            "Signal": tensors["Signal"][:, -1].ravel(),
+            "Histogram": histogram[:, -1].ravel(),
+            "Crossover": np.broadcast_to(crossover, histogram[:, -1].shape).ravel(),
+        },
+        index=index,
+    )
@@ -0,0 +1,131 @@
+# Imports
+import argparse
+import time
+
+# Import numpy and pandas
+import numpy as np
+import pandas as pd
+
+# Quantiles drawn as the fan, outermost band first
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+
+# Function to compute the joint distribution of the next steps observations of a fitted state-space model
+def forecast_distribution(results, steps):
+    # Time-invariant system matrices of the fit, without any exogenous regressors
+    ssm = results.filter_results
+    Z = ssm.design[0, :, 0]
+    T = ssm.transition[:, :, 0]
+    c = ssm.state_intercept[:, 0]
+    d = ssm.obs_intercept[0, 0]
+    H = ssm.obs_cov[0, 0, 0]
+    RQR = ssm.selection[:, :, 0] @ ssm.state_cov[:, :, 0] @ ssm.selection[:, :, 0].T
+
+    # State after the last observation, as the filter predicts it
+    state = np.asarray(results.predicted_state[:, -1], dtype=float)
+    state_cov = np.asarray(results.predicted_state_cov[:, :, -1], dtype=float)
+
+    # Z T^s for every lag s, and the state mean and covariance at every step
+    loadings = np.empty((steps, len(state)))
+    loadings[0] = Z
+    for lag in range(1, steps):
+        loadings[lag] = loadings[lag - 1] @ T
+    mean = np.empty(steps)
+    cov = np.empty((steps, steps))
+    for step in range(steps):
+        # Step j depends on step i <= j only through Z T^(j - i) times the state covariance at i
+        mean[step] = Z @ state + d
+        cov[step:, step] = loadings[: steps - step] @ (state_cov @ Z)
+        cov[step, step:] = cov[step:, step]
+        cov[step, step] += H
+        state = T @ state + c
+        state_cov = T @ state_cov @ T.T + RQR
+
+    # Return the mean and covariance of the future observations
+    return {"mean": mean, "cov": cov}
+
+
+# Function to factor covariances as L L', tolerating the singular ones of a deterministic step
+def _factor(covs):
+    values, vectors = np.linalg.eigh(covs)
+    return vectors * np.sqrt(np.clip(values, 0.0, None))[..., np.newaxis, :]
+
+
+# Function to simulate paths from several joint Gaussians and return their quantiles at every step
+def simulate_quantiles(means, covs, quantiles=QUANTILES, paths=10000, chunk_size=2000, bins=1024, seed=None):
+    # Series x steps means, and series x steps x steps covariances
+    means = np.atleast_2d(np.asarray(means, dtype=float))
+    covs = np.asarray(covs, dtype=float).reshape(means.shape + means.shape[-1:])
+    factors = _factor(covs)
+    series, steps = means.shape
+    rng = np.random.default_rng(seed)
+
+    # Fixed bins per series and step, wide enough that the clipped tails never reach the quantiles drawn
+    spread = np.sqrt(np.clip(np.diagonal(covs, axis1=1, axis2=2), 0.0, None))
+    width = np.maximum(16 * spread / bins, 1e-12 * np.maximum(np.abs(means), 1.0))
+    low = means - width * bins / 2
+    offsets = (np.arange(series * steps) * bins).reshape(series, steps)
+
+    # Only the histogram counts are kept, so memory does not grow with the number of paths
+    counts = np.zeros(series * steps * bins, dtype=np.int64)
+    for first in range(0, paths, chunk_size):
+        draws = rng.standard_normal((series, min(chunk_size, paths - first), steps))
+        values = means[:, np.newaxis, :] + np.einsum("snk,sjk->snj", draws, factors)
+        positions = np.clip(((values - low[:, np.newaxis, :]) / width[:, np.newaxis, :]).astype(np.int64), 0, bins - 1)
+        counts += np.bincount((positions + offsets[:, np.newaxis, :]).ravel(), minlength=counts.size)
+
+    # Interpolate each quantile inside the bin where the cumulative count passes it
+    counts = counts.reshape(series, steps, bins)
+    cumulative = np.cumsum(counts, axis=-1)
+    result = np.empty((series, len(quantiles), steps))
+    for number, quantile in enumerate(quantiles):
+        target = quantile * paths
+        position = np.minimum((cumulative < target).sum(axis=-1), bins - 1)
+        before = np.take_along_axis(cumulative, position[..., np.newaxis], axis=-1)[..., 0]
+        inside = np.take_along_axis(counts, position[..., np.newaxis], axis=-1)[..., 0]
+        fraction = (target - (before - inside)) / np.maximum(inside, 1)
+        result[:, number] = low + width * (position + fraction)
+
+    # Return series x quantiles x steps
+    return result
+
+
+# Function to turn the distributions of named fits into quantile tables over the given dates
+def fan(distributions, index, quantiles=QUANTILES, paths=10000, seed=None, start=None):
+    # Simulate every series in one batch
+    names = list(distributions)
+    means = np.stack([distributions[name]["mean"] for name in names])
+    covs = np.stack([distributions[name]["cov"] for name in names])
+    bands = simulate_quantiles(means, covs, quantiles, paths=paths, seed=seed)
+
+    # A known first value, such as the in-sample fit of the last bar, anchors the fan at zero width
+    tables = {}
+    for name, band in zip(names, bands):
+        if start is not None:
+            band = np.concatenate([np.full((len(quantiles), 1), start[name]), band], axis=1)
+        tables[name] = pd.DataFrame(band.T, index=index, columns=[f"{quantile:.0%}" for quantile in quantiles])
+    return tables
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the simulated forecast quantiles on random covariances")
+    parser.add_argument("--paths", type=int, default=10000, help="paths per series")
+    parser.add_argument("--steps", type=int, default=30, help="forecast steps")
+    parser.add_argument("--series", type=int, default=4, help="series simulated together")
+    args = parser.parse_args()
+
+    # Random walk covariances, min(i, j), scaled differently per series
+    steps = np.arange(1, args.steps + 1)
+    covs = np.stack([np.minimum.outer(steps, steps) * (series + 1.0) for series in range(args.series)])
+    means = np.zeros((args.series, args.steps))
+    started = time.perf_counter()
+    bands = simulate_quantiles(means, covs, paths=args.paths, seed=0)
+    seconds = time.perf_counter() - started
+
+    # Compare with the exact Gaussian quantiles at the last step
+    from scipy.stats import norm
+
+    exact = norm.ppf(QUANTILES)[:, np.newaxis] * np.sqrt(np.diagonal(covs, axis1=1, axis2=2)[:, -1])
+    print(f"{args.series} series x {args.paths} paths x {args.steps} steps in {seconds * 1000:.0f}ms")
+    print("Last step quantiles, simulated and exact:")
+    print(pd.DataFrame({"Simulated": bands[:, :, -1].T.ravel(), "Exact": exact.ravel()}).round(3).to_string(index=False))
@@ -0,0 +1,217 @@
+# Imports
+import argparse
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from pathlib import Path
+
+# Import numpy and pandas
+import numpy as np
+import pandas as pd
+
+# Issuer file the index is built from
+ISSUERS_PATH = Path.cwd() / "data" / "equity_issuers.csv"
+
+# Facets that can filter a search, by argument name
+FACETS = {
+    "sector": "Sector Name",
+    "industry": "Industry New Name",
+    "group": "Igroup Name",
+    "subgroup": "ISubgroup Name",
+}
+
+
+# Function to lower-case text and collapse punctuation, so "Aegis Logistics Ltd." matches "aegis logistics ltd"
+def _normalize(text):
+    return re.sub(r"[^a-z0-9]+", " ", str(text).lower()).strip()
+
+
+# Function to split normalised text into the trigrams of its space-padded form
+def _trigrams(text):
+    padded = f"  {text} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+# In-memory index of the issuer file for type-ahead, fuzzy and facet lookups
+class IssuerIndex:
+    def __init__(self, issuers):
+        self.issuers = issuers.reset_index(drop=True)
+        self.records = self.issuers.to_dict("records")
+
+        # Constant time lookups by ISIN and by security code
+        self._by_isin = {str(isin).upper(): record for isin, record in zip(self.issuers["ISIN No"], self.records)}
+        self._by_code = dict(zip(self.issuers["Security Code"], self.records))
+
+        # Every issuer name and security id is a key pointing back at its row
+        keys = [
+            (_normalize(text), row)
+            for row, (name, security_id) in enumerate(zip(self.issuers["Issuer Name"], self.issuers["Security Id"]))
+            for text in (name, security_id)
+        ]
+        self._key_rows = np.array([row for _, row in keys], dtype=np.int32)
+
+        # Sorted keys answer prefix queries with a binary search
+        ordered = sorted(range(len(keys)), key=lambda key: keys[key][0])
+        self._sorted_keys = [keys[key][0] for key in ordered]
+        self._sorted_rows = [keys[key][1] for key in ordered]
+
+        # Trigram postings answer fuzzy queries by counting the trigrams each key shares with the query
+        postings = defaultdict(list)
+        sizes = []
+        for key, (text, _) in enumerate(keys):
+            grams = _trigrams(text)
+            sizes.append(len(grams))
+            for gram in grams:
+                postings[gram].append(key)
+        self._postings = {gram: np.array(found, dtype=np.int32) for gram, found in postings.items()}
+        self._key_sizes = np.array(sizes, dtype=np.int32)
+        self.common_posting = max(64, len(keys) // 50)
+
+        # Facet values as integer codes per row
+        self._facet_codes = {}
+        self._facet_values = {}
+        for name, column in FACETS.items():
+            codes, values = pd.factorize(self.issuers[column])
+            self._facet_codes[name] = codes
+            self._facet_values[name] = {value: code for code, value in enumerate(values)}
+
+    # Build the index from the issuer CSV, whose rows end in a trailing comma
+    @classmethod
+    def from_csv(cls, path=ISSUERS_PATH):
+        issuers = pd.read_csv(path, index_col=False, dtype={"Security Id": str, "ISIN No": str})
+        text_columns = issuers.select_dtypes(include=["object", "string"]).columns
+        issuers[text_columns] = issuers[text_columns].apply(lambda column: column.str.strip())
+        return cls(issuers)
+
+    # Mask of the rows matching every facet given, or None when no facet is given
+    def _facet_mask(self, facets):
+        mask = None
+        for name, value in facets.items():
+            if name not in FACETS:
+                raise ValueError(f"Unknown facet {name!r}, expected one of {sorted(FACETS)}")
+            if value is None:
+                continue
+            code = self._facet_values[name].get(value, -2)
+            matches = self._facet_codes[name] == code
+            mask = matches if mask is None else mask & matches
+        return mask
+
+    # Issuers whose name or security id starts with the text, in alphabetical order of the matching key
+    def prefix(self, text, limit=10, **facets):
+        query = _normalize(text)
+        mask = self._facet_mask(facets)
+        rows = []
+        position = bisect_left(self._sorted_keys, query)
+        while position < len(self._sorted_keys) and len(rows) < limit:
+            if not self._sorted_keys[position].startswith(query):
+                break
+            row = self._sorted_rows[position]
+            if row not in rows and (mask is None or mask[row]):
+                rows.append(row)
+            position += 1
+        return [self.records[row] for row in rows]
+
+    # Issuers ranked by prefix match first, then by trigram similarity of their name or security id
+    def search(self, text, limit=10, **facets):
+        query = _normalize(text)
+        if not query:
+            return []
+        results = self.prefix(query, limit, **facets)
+        if len(results) >= limit:
+            return results
+
+        # Count the query trigrams each key shares
+        grams = _trigrams(query)
+        found = [self._postings[gram] for gram in grams if gram in self._postings]
+        if not found:
+            return results
+
+        # Candidates come from the rarer trigrams when there are enough, as common ones cost the most to merge
+        rare = [posting for posting in found if len(posting) <= self.common_posting]
+        common = [posting for posting in found if len(posting) > self.common_posting]
+        if len(rare) < min(3, len(found)):
+            rare, common = found, []
+        keys, shared = np.unique(np.concatenate(rare), return_counts=True)
+
+        # The common trigrams are then counted for the candidates only, by binary search in their sorted postings
+        for posting in common:
+            position = np.minimum(np.searchsorted(posting, keys), len(posting) - 1)
+            shared += posting[position] == keys
+
+        # Jaccard similarity of the trigram sets, keeping the best key of each row
+        scores = shared / (len(grams) + self._key_sizes[keys] - shared)
+        rows = self._key_rows[keys]
+        mask = self._facet_mask(facets)
+        if mask is not None:
+            keep = mask[rows]
+            rows, scores = rows[keep], scores[keep]
+        # Each row has two keys, so the best 2 * limit keys always hold the best limit rows
+        best = np.arange(len(scores))
+        if len(scores) > 2 * limit:
+            best = np.argpartition(-scores, 2 * limit)[: 2 * limit]
+        best = best[np.lexsort((best, -scores[best]))]
+        taken = {record["Security Code"] for record in results}
+        for row in rows[best]:
+            record = self.records[row]
+            if record["Security Code"] not in taken:
+                taken.add(record["Security Code"])
+                results.append(record)
+                if len(results) == limit:
+                    break
+        return results
+
+    # Issuer with an ISIN, or None
+    def by_isin(self, isin):
+        return self._by_isin.get(str(isin).strip().upper())
+
+    # Issuer with a security code, or None
+    def by_code(self, code):
+        return self._by_code.get(code)
+
+    # Number of issuers under each value of a facet
+    def facet_counts(self, name):
+        return self.issuers[FACETS[name]].value_counts().to_dict()
+
+    # All issuers matching the facets given
+    def filter(self, **facets):
+        mask = self._facet_mask(facets)
+        return self.issuers if mask is None else self.issuers[mask]
+
+    # Issuer name to security id, as helper.fetch_stocks has always returned it
+    def stock_names(self):
+        return dict(zip(self.issuers["Issuer Name"], self.issuers["Security Id"]))
+
+
+# Indexes already built in this process, by file
+_indexes = {}
+_indexes_guard = threading.Lock()
+
+
+# Function to fetch the index of an issuer file, building it once per process
+def get_index(path=ISSUERS_PATH):
+    path = Path(path).resolve()
+    with _indexes_guard:
+        if path not in _indexes:
+            _indexes[path] = IssuerIndex.from_csv(path)
+        return _indexes[path]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time issuer lookups against the issuer file")
+    parser.add_argument("queries", nargs="+", help="text to search for")
+    parser.add_argument("--path", default=str(ISSUERS_PATH), help="issuer CSV")
+    parser.add_argument("--repeat", type=int, default=1000, help="searches per query when timing")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    index = get_index(args.path)
+    print(f"Built the index of {len(index.records)} issuers in {(time.perf_counter() - started) * 1000:.0f}ms")
+    for query in args.queries:
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            results = index.search(query)
+        per_query = (time.perf_counter() - started) / args.repeat * 1e6
+        names = ", ".join(f"{record['Security Id']} ({record['Issuer Name']})" for record in results[:5])
+        print(f"{query!r}: {per_query:.0f}us per search -> {names}")
@@ -0,0 +1,92 @@
+# Imports
+import uuid
+
+# Import streamlit
+import streamlit as st
+
+# Import the shared job manager
+import jobs
+
+
+# Function to identify the browser session that owns the jobs it submits
+def session_owner():
+    if "job_owner" not in st.session_state:
+        st.session_state.job_owner = uuid.uuid4().hex
+    return st.session_state.job_owner
+
+
+# Function to submit a run for this session, replacing the one stored under the same key
+def submit(key, fn, *args, **kwargs):
+    # Submit the run, which joins an identical one already in flight
+    manager = jobs.get_manager()
+    job_id = manager.submit(session_owner(), fn, *args, **kwargs)
+
+    # Cancel the run being replaced, unless it is the same run
+    previous = st.session_state.get(key)
+    if previous and previous != job_id:
+        manager.cancel(previous, session_owner())
+
+    # Keep the id in the session and the address bar, so a reload finds the run again
+    st.session_state[key] = job_id
+    st.query_params[key] = job_id
+    return job_id
+
+
+# Function to forget the run stored under key, cancelling it unless other sessions still wait on it
+def clear(key):
+    job_id = st.session_state.pop(key, None)
+    if job_id:
+        jobs.get_manager().cancel(job_id, session_owner())
+    if key in st.query_params:
+        del st.query_params[key]
+
+
+# Function to poll a running job once a second without rerunning the rest of the page
+@st.fragment(run_every=1)
+def _poll(key, job_id):
+    manager = jobs.get_manager()
+    job = manager.get(job_id)
+
+    # Rerun the page once the job has finished so it can draw the result
+    if job is None or job.done:
+        st.rerun()
+
+    # Stage and progress, with the queue position while waiting
+    ahead = manager.queued_ahead(job_id)
+    text = f"Queued behind {ahead} other runs" if job.status == "queued" and ahead else job.stage
+    if len(job.owners) > 1:
+        text = f"{text} (shared with {len(job.owners) - 1} other sessions running the same forecast)"
+    st.progress(job.progress, text=text)
+    if st.button("Cancel", key=f"cancel_{key}"):
+        manager.cancel(job_id, session_owner())
+        st.rerun()
+
+
+# Function to show the progress of the job stored under key and return it once it has finished
+def track(key):
+    # Pick up a job id from the address bar after a reload
+    job_id = st.session_state.get(key) or st.query_params.get(key)
+    if not job_id:
+        return None
+    st.session_state[key] = job_id
+
+    # Finished jobs are kept for a while, then forgotten
+    job = jobs.get_manager().get(job_id)
+    if job is None:
+        st.warning(f"Run {job_id} has expired, please run it again.")
+        del st.session_state[key]
+        if key in st.query_params:
+            del st.query_params[key]
+        return None
+
+    # Keep polling until the job has finished
+    if not job.done:
+        _poll(key, job_id)
+        return None
+    if job.status == "failed":
+        st.error(f"Run failed: {job.error}")
+    elif job.status == "cancelled":
+        st.info("Run cancelled.")
+
+    # Return the finished job
+    return job
@@ -0,0 +1,234 @@
+# Imports
+import threading
+import time
+import traceback
+import uuid
+from collections import deque
+
+# Import the single-flight table
+import coalesce
+
+
+# Raised inside a job when it has been cancelled
+class JobCancelled(Exception):
+    pass
+
+
+# One submitted run, with the stage it is in and its result once finished
+class Job:
+    def __init__(self, owner, fn, args, kwargs):
+        self.id = uuid.uuid4().hex[:12]
+        self.owner = owner
+        # Every session waiting on this job, including those that joined an identical run
+        self.owners = {owner}
+        self.key = None
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.status = "queued"
+        self.stage = "Queued"
+        self.progress = 0.0
+        self.result = None
+        self.error = None
+        # Seconds spent in each finished stage, in the order they ran
+        self.timings = {}
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._stage_started = None
+        self._cancel = threading.Event()
+        self._finished = threading.Event()
+
+    # Check whether the job has finished, failed or been cancelled
+    @property
+    def done(self):
+        return self.status in ("done", "failed", "cancelled")
+
+    # Raise inside the job once it has been cancelled
+    def check(self):
+        if self._cancel.is_set():
+            raise JobCancelled(self.id)
+
+    # Report the stage the job is in and its overall progress between 0 and 1
+    def report(self, stage, progress):
+        self.check()
+        now = time.monotonic()
+        if stage != self.stage:
+            self._close_stage(now)
+            self.stage = stage
+            self._stage_started = now
+        self.progress = min(max(float(progress), self.progress), 1.0)
+
+    # Record how long the current stage took
+    def _close_stage(self, now):
+        if self._stage_started is not None:
+            self.timings[self.stage] = self.timings.get(self.stage, 0.0) + now - self._stage_started
+        self._stage_started = None
+
+    # Wait for the job to finish and return its result
+    def wait(self, timeout=None):
+        if not self._finished.wait(timeout):
+            raise TimeoutError(f"Job {self.id} is still {self.status}")
+        if self.status == "failed":
+            raise RuntimeError(f"Job {self.id} failed: {self.error}")
+        if self.status == "cancelled":
+            raise JobCancelled(self.id)
+        return self.result
+
+
+# Bounded set of worker threads shared by every session, serving the owners round robin
+class JobManager:
+    def __init__(self, max_workers=2, keep_seconds=3600, result_ttl=900):
+        self.max_workers = max_workers
+        # Finished jobs stay retrievable by id for this long
+        self.keep_seconds = keep_seconds
+        # Identical runs join the one in flight, or reuse its result for result_ttl seconds
+        self.flights = coalesce.SingleFlight(result_ttl)
+        self._jobs = {}
+        self._queues = {}
+        self._owners = deque()
+        self._workers = []
+        self._condition = threading.Condition()
+
+    # Queue fn(*args, job=job, **kwargs) for an owner and return the job id, sharing identical runs
+    def submit(self, owner, fn, *args, **kwargs):
+        key = coalesce.canonical_key(fn, args, kwargs)
+        job, joined = self.flights.join(key, lambda: self._enqueue(owner, fn, args, kwargs, key))
+        if joined:
+            with self._condition:
+                job.owners.add(owner)
+        return job.id
+
+    # Queue a new job for an owner
+    def _enqueue(self, owner, fn, args, kwargs, key=None):
+        job = Job(owner, fn, args, kwargs)
+        job.key = key
+        with self._condition:
+            self._purge()
+            self._jobs[job.id] = job
+            if owner not in self._queues:
+                self._queues[owner] = deque()
+                self._owners.append(owner)
+            self._queues[owner].append(job)
+
+            # Start another worker while under the limit
+            if len(self._workers) < self.max_workers:
+                worker = threading.Thread(target=self._work, name=f"job-worker-{len(self._workers)}", daemon=True)
+                self._workers.append(worker)
+                worker.start()
+            self._condition.notify()
+        return job
+
+    # Fetch a job by id, or None once it has expired
+    def get(self, job_id):
+        with self._condition:
+            return self._jobs.get(job_id)
+
+    # List the jobs of one owner, oldest first
+    def jobs(self, owner):
+        with self._condition:
+            return [job for job in self._jobs.values() if owner in job.owners]
+
+    # Count the queued jobs that will start before this one
+    def queued_ahead(self, job_id):
+        with self._condition:
+            job = self._jobs.get(job_id)
+            if job is None or job.status != "queued":
+                return 0
+
+            # Round robin serves every owner once per turn, so count each owner's jobs up to this one's place
+            place = self._queues[job.owner].index(job)
+            return sum(min(len(queue), place + 1) for queue in self._queues.values()) - 1
+
+    # Cancel a job for an owner, or for everyone when no owner is given
+    def cancel(self, job_id, owner=None):
+        with self._condition:
+            job = self._jobs.get(job_id)
+            if job is None or job.done:
+                return False
+
+            # Keep running while other sessions still wait on it
+            job.owners.discard(owner)
+            if owner is not None and job.owners:
+                return False
+
+            # Drop it from the queue, or stop it at its next stage
+            job._cancel.set()
+            if job.status == "queued":
+                self._queues[job.owner].remove(job)
+                if not self._queues[job.owner]:
+                    del self._queues[job.owner]
+                    self._owners.remove(job.owner)
+                self._finish(job, "cancelled")
+
+        # Identical requests from now on start afresh instead of joining the cancelled run
+        self.flights.forget(job.key)
+        return True
+
+    # Take the next job, one owner at a time
+    def _next(self):
+        owner = self._owners.popleft()
+        queue = self._queues[owner]
+        job = queue.popleft()
+        if queue:
+            self._owners.append(owner)
+        else:
+            del self._queues[owner]
+        return job
+
+    # Mark a job finished and wake anyone waiting on it
+    def _finish(self, job, status, result=None, error=None):
+        job._close_stage(time.monotonic())
+        job.status = status
+        job.stage = status.capitalize()
+        job.result = result
+        job.error = error
+        job.finished_at = time.time()
+        if status == "done":
+            job.progress = 1.0
+        job._finished.set()
+
+    # Forget finished jobs older than keep_seconds
+    def _purge(self):
+        cutoff = time.time() - self.keep_seconds
+        expired = [job_id for job_id, job in self._jobs.items() if job.done and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    # Worker loop running one job at a time
+    def _work(self):
+        while True:
+            with self._condition:
+                while not self._owners:
+                    self._condition.wait()
+                job = self._next()
+                job.status = "running"
+                job.started_at = time.time()
+
+            # Run the job outside the lock
+            try:
+                result = job.fn(*job.args, job=job, **job.kwargs)
+            except JobCancelled:
+                self._finish(job, "cancelled")
+            except Exception as exc:
+                traceback.print_exc()
+                self._finish(job, "failed", error=f"{type(exc).__name__}: {exc}")
+            else:
+                self._finish(job, "done", result=result)
+
+
+# Shared manager used by every session
+_default_manager = None
+_default_manager_guard = threading.Lock()
+
+
+# Function to fetch the shared job manager
+def get_manager():
+    # Create the manager on first use
+    global _default_manager
+    with _default_manager_guard:
+        if _default_manager is None:
+            _default_manager = JobManager()
+
+    # Return the manager
+    return _default_manager
@@ -0,0 +1,139 @@
+# Imports
+import hashlib
+import json
+import os
+from pathlib import Path
+
+# Import numpy
+import numpy as np
+
+# Import the required libraries
+from statsmodels.tsa.statespace.sarimax import SARIMAX
+
+# Location of the fitted model cache
+CACHE_DIR = Path.cwd() / "data" / "models"
+
+
+# Function to hash the values a model was fitted on
+def hash_values(values):
+    return hashlib.sha1(np.ascontiguousarray(values, dtype=float).tobytes()).hexdigest()
+
+
+# Disk cache of fitted state-space parameters that extends old fits with new bars
+class ModelCache:
+    def __init__(self, root=CACHE_DIR, max_bytes=16 * 1024**2, max_extension=0.25):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        # Refit once the appended bars exceed this share of the bars the parameters were estimated on
+        self.max_extension = max_extension
+
+    # Stem of the file holding one fitted model
+    def _stem(self, ticker, series, order, seasonal_order, data_hash):
+        key = json.dumps([ticker, series, list(order), list(seasonal_order), data_hash])
+        return f"{ticker.upper()}_{series}_{hashlib.sha1(key.encode()).hexdigest()[:16]}"
+
+    # Store the parameters of a fitted model together with a hash of the values it was fitted on.
+    # When the last value comes from a session still trading it is left out of the hash, as the final close replaces it.
+    def put(self, ticker, series, values, results, estimated_nobs=None, partial=False):
+        # Describe the entry
+        values = np.asarray(values, dtype=float)
+        order = tuple(results.model.order)
+        seasonal_order = tuple(results.model.seasonal_order)
+        closed_nobs = len(values) - 1 if partial else len(values)
+        data_hash = hash_values(values[:closed_nobs])
+        entry = {
+            "ticker": ticker.upper(),
+            "series": series,
+            "order": order,
+            "seasonal_order": seasonal_order,
+            "params": np.asarray(results.params, dtype=float).tolist(),
+            "nobs": len(values),
+            "closed_nobs": closed_nobs,
+            "estimated_nobs": estimated_nobs or len(values),
+            "data_hash": data_hash,
+        }
+
+        # Write it atomically
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.root / f"{self._stem(ticker, series, order, seasonal_order, data_hash)}.json"
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(entry))
+        os.replace(tmp_path, path)
+
+        # Keep the cache inside its size budget
+        self.evict()
+
+    # Return a fitted model for the values, extended with any bars that arrived since it was fitted
+    def find(self, ticker, series, values, seasonality, partial=False):
+        # Look for the longest cached fit whose closed values are a prefix of these
+        values = np.asarray(values, dtype=float)
+        best = None
+        for path in self.root.glob(f"{ticker.upper()}_{series}_*.json"):
+            try:
+                entry = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+            entry.setdefault("closed_nobs", entry["nobs"])
+            if entry["seasonal_order"][3] != seasonality or entry["nobs"] > len(values):
+                continue
+            if best is not None and entry["closed_nobs"] <= best[1]["closed_nobs"]:
+                continue
+            if hash_values(values[: entry["closed_nobs"]]) == entry["data_hash"]:
+                best = (path, entry)
+
+        # Nothing usable is cached
+        if best is None:
+            return None
+        path, entry = best
+
+        # Parameters estimated on too few of the bars are stale, so let the caller refit
+        if len(values) > entry["estimated_nobs"] * (1 + self.max_extension):
+            return None
+
+        # Mark the entry as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        # Run the state-space filter over all bars, new ones included, with the cached parameters
+        model = SARIMAX(values, order=tuple(entry["order"]), seasonal_order=tuple(entry["seasonal_order"]))
+        results = model.filter(np.asarray(entry["params"]))
+        if len(values) > entry["closed_nobs"]:
+            self.put(ticker, series, values, results, estimated_nobs=entry["estimated_nobs"], partial=partial)
+        return results
+
+    # Delete the least recently used entries until the cache fits its budget
+    def evict(self):
+        # List the entries from oldest to newest use
+        entries = []
+        for path in self.root.glob("*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        # Remove the oldest until the total size is under budget
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+
+# Shared cache used by the forecast engine
+_default_cache = None
+
+
+# Function to fetch the shared cache
+def get_cache():
+    # Create the cache on first use
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ModelCache()
+
+    # Return the cache
+    return _default_cache
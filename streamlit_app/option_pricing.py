@@ -0,0 +1,154 @@
+# Import numpy and pandas
+import numpy as np
+import pandas as pd
+
+# Import the required libraries
+from scipy.stats import norm
+
+# Function to compute d1 and d2 over broadcast arrays, with T = 0 left for the callers to handle
+def _d1_d2(S, K, T, r, sigma):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sqrt_T = np.sqrt(T)
+        d1 = (np.log(S / K) + (r + 0.5 * sigma**2) * T) / (sigma * sqrt_T)
+    return d1, d1 - sigma * sqrt_T, sqrt_T
+
+
+# Function to price calls or puts with Black-Scholes over broadcast arrays
+def black_scholes(S, K, T, r, sigma, option_type="call"):
+    S, K, T, sigma = np.broadcast_arrays(*(np.asarray(value, dtype=float) for value in (S, K, T, sigma)))
+    d1, d2, _ = _d1_d2(S, K, T, r, sigma)
+
+    # Price before expiry
+    discount = K * np.exp(-r * T)
+    if option_type == "call":
+        price = S * norm.cdf(d1) - discount * norm.cdf(d2)
+        intrinsic = np.maximum(S - K, 0)
+    else:
+        price = discount * norm.cdf(-d2) - S * norm.cdf(-d1)
+        intrinsic = np.maximum(K - S, 0)
+
+    # Intrinsic value at expiry
+    return np.where(T > 0, price, intrinsic)
+
+
+# Function to compute the five greeks over broadcast arrays, in the units calculate_greeks used
+def greeks(S, K, T, r, sigma, option_type="call"):
+    S, K, T, sigma = np.broadcast_arrays(*(np.asarray(value, dtype=float) for value in (S, K, T, sigma)))
+    d1, d2, sqrt_T = _d1_d2(S, K, T, r, sigma)
+    pdf_d1 = norm.pdf(d1)
+    discount = K * np.exp(-r * T)
+
+    # Greeks before expiry, theta per day and vega per volatility point
+    with np.errstate(divide="ignore", invalid="ignore"):
+        gamma = pdf_d1 / (S * sigma * sqrt_T)
+        decay = -S * pdf_d1 * sigma / (2 * sqrt_T)
+    vega = S * pdf_d1 * sqrt_T / 100
+    if option_type == "call":
+        delta = norm.cdf(d1)
+        theta = (decay - r * discount * norm.cdf(d2)) / 365
+        rho = T * discount * norm.cdf(d2)
+        expired_delta = (S > K).astype(float)
+    else:
+        delta = -norm.cdf(-d1)
+        theta = (decay + r * discount * norm.cdf(-d2)) / 365
+        rho = -T * discount * norm.cdf(-d2)
+        expired_delta = -(S < K).astype(float)
+
+    # At expiry only delta is left
+    live = T > 0
+    return {
+        "Delta": np.where(live, delta, expired_delta),
+        "Gamma": np.where(live, gamma, 0.0),
+        "Theta": np.where(live, theta, 0.0),
+        "Vega": np.where(live, vega, 0.0),
+        "Rho": np.where(live, rho, 0.0),
+    }
+
+
+# Function to compute the covered call P&L and greek surfaces over prices x days
+def covered_call_grid(
+    stock_price, strike_price, days_to_expiration, r, sigma, premium, price_step=0.5, steps_below=13, steps_above=13
+):
+    # Prices around the current price and the days left until expiry
+    prices = np.round(stock_price + price_step * np.arange(-steps_below, steps_above + 1), 2)
+    days = np.arange(1, days_to_expiration + 1)
+    T = (days_to_expiration - days)[np.newaxis, :] / 365
+    S = prices[:, np.newaxis]
+
+    # Value of 100 shares less the short call, plus the premium received
+    call_price = black_scholes(S, strike_price, T, r, sigma)
+    pnl = (S - stock_price) * 100 - call_price * 100 + premium * 100
+
+    # Return one prices x days table per surface
+    columns = [f"Day_{day}" for day in days]
+    index = pd.Index(prices, name="Price")
+    surfaces = {"P&L": pd.DataFrame(pnl, index=index, columns=columns)}
+    for name, values in greeks(S, strike_price, T, r, sigma).items():
+        surfaces[name] = pd.DataFrame(values, index=index, columns=columns)
+    return surfaces
+
+
+# Function to build the green and red background of a table, normalising once for the whole table
+def color_scale(table):
+    values = table.to_numpy(dtype=float)
+    top = values.max() if values.max() > 0 else 1.0
+    bottom = abs(values.min()) if values.min() < 0 else 1.0
+
+    # Positive cells fade to green and negative cells to red
+    with np.errstate(invalid="ignore"):
+        positive = (255 - (values / top) * 255).astype(int)
+        negative = (255 - (np.abs(values) / bottom) * 255).astype(int)
+    channels = [
+        pd.DataFrame(channel, index=table.index, columns=table.columns).astype(str)
+        for channel in (
+            np.where(values > 0, positive, 255),
+            np.where(values > 0, 255, negative),
+            np.where(values > 0, positive, negative),
+        )
+    ]
+
+    # Return the styles in the shape of the table
+    red, green, blue = channels
+    return "background-color: rgb(" + red + ", " + green + ", " + blue + "); color: black;"
+
+
+# Function to solve for implied volatility over arrays with a bracketed Newton iteration
+def implied_volatility(price, S, K, T, r, is_call=True, low=1e-4, high=5.0, tol=1e-8, max_iter=100):
+    price, S, K, T, is_call = np.broadcast_arrays(
+        *(np.asarray(value, dtype=float) for value in (price, S, K, T, is_call))
+    )
+    is_call = is_call.astype(bool)
+
+    # Prices outside the no-arbitrage bounds have no implied volatility
+    discount = K * np.exp(-r * T)
+    lower = np.where(is_call, np.maximum(S - discount, 0), np.maximum(discount - S, 0))
+    upper = np.where(is_call, S, discount)
+    valid = (T > 0) & (price > lower) & (price < upper) & np.isfinite(price)
+
+    # Start every option from the same guess inside its bracket
+    low = np.full(price.shape, low)
+    high = np.full(price.shape, high)
+    sigma = np.full(price.shape, 0.3)
+    for _ in range(max_iter):
+        # Price error and vega at the current guess
+        model_price = np.where(
+            is_call, black_scholes(S, K, T, r, sigma, "call"), black_scholes(S, K, T, r, sigma, "put")
+        )
+        error = model_price - price
+        if np.all(np.abs(error[valid]) < tol):
+            break
+        d1, _, sqrt_T = _d1_d2(S, K, T, r, sigma)
+        vega = S * norm.pdf(d1) * sqrt_T
+
+        # Price rises with volatility, so the error tells which side of the root the guess is on
+        high = np.where(error > 0, sigma, high)
+        low = np.where(error < 0, sigma, low)
+
+        # Take the Newton step, or bisect when it would leave the bracket
+        with np.errstate(divide="ignore", invalid="ignore"):
+            step = sigma - error / vega
+        inside = np.isfinite(step) & (step > low) & (step < high)
+        sigma = np.where(inside, step, 0.5 * (low + high))
+
+    # Return NaN where there is no solution
+    return np.where(valid, sigma, np.nan)
@@ -0,0 +1,125 @@
+# Imports
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Import numpy and pandas
+import numpy as np
+import pandas as pd
+
+# Import yfinance
+import yfinance as yf
+
+# Import the vectorized option pricing and the shared HTTP client's host limiter
+import http_client
+import option_pricing
+
+# Risk-free rate used across the options pages
+RISK_FREE_RATE = 0.01
+
+# One limit on Yahoo requests for every chain fetched in the process, however many tickers and expirations run at once
+YAHOO_LIMITER = http_client.HostLimiter(*http_client.HOST_LIMITS["query2.finance.yahoo.com"])
+
+
+# Function to download one expiration's calls and puts
+def _fetch_expiration(stock, expiration):
+    with YAHOO_LIMITER:
+        options = stock.option_chain(expiration)
+    chain = pd.concat([options.calls, options.puts], keys=["Calls", "Puts"], names=["Type"])
+    chain = chain.reset_index(level="Type").reset_index(drop=True)
+    chain["expiration"] = expiration
+    return chain
+
+
+# Function to download every expiration of a ticker concurrently
+def fetch_chain(ticker, max_workers=8):
+    # Spot price and the list of expirations
+    stock = yf.Ticker(ticker)
+    with YAHOO_LIMITER:
+        spot = float(stock.history(period="1d")["Close"].iloc[-1])
+    with YAHOO_LIMITER:
+        expirations = list(stock.options)
+
+    # All expirations side by side, the shared limiter capping the requests of every scan thread together
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        chains = list(executor.map(lambda expiration: _fetch_expiration(stock, expiration), expirations))
+    chain = pd.concat(chains, ignore_index=True) if chains else pd.DataFrame()
+
+    # Return the snapshot
+    return {"ticker": ticker, "spot": spot, "expirations": expirations, "chain": add_implied_volatility(chain, spot)}
+
+
+# Function to recompute implied volatility and greeks for every call and put at once
+def add_implied_volatility(chain, spot, r=RISK_FREE_RATE, today=None):
+    if chain.empty:
+        return chain
+    chain = chain.copy()
+
+    # Time to expiry in years
+    today = pd.Timestamp(today or pd.Timestamp.today().normalize())
+    chain["days"] = (pd.to_datetime(chain["expiration"]) - today).dt.days
+    T = chain["days"].clip(lower=0).to_numpy(dtype=float) / 365.0
+
+    # Mid price when both sides are quoted, otherwise the last trade
+    bid, ask = chain["bid"].to_numpy(dtype=float), chain["ask"].to_numpy(dtype=float)
+    price = np.where((bid > 0) & (ask > 0), (bid + ask) / 2, chain["lastPrice"].to_numpy(dtype=float))
+
+    # Solve all options in one vectorized pass, keeping Yahoo's figure where there is no solution
+    strike = chain["strike"].to_numpy(dtype=float)
+    is_call = (chain["Type"] == "Calls").to_numpy()
+    iv = option_pricing.implied_volatility(price, spot, strike, T, r, is_call)
+    chain["iv"] = np.where(np.isnan(iv), chain["impliedVolatility"].to_numpy(dtype=float), iv)
+
+    # Greeks at the solved volatility
+    call_greeks = option_pricing.greeks(spot, strike, T, r, chain["iv"].to_numpy(), "call")
+    put_greeks = option_pricing.greeks(spot, strike, T, r, chain["iv"].to_numpy(), "put")
+    for name in call_greeks:
+        chain[name] = np.where(is_call, call_greeks[name], put_greeks[name])
+
+    # Return the chain
+    return chain
+
+
+# Function to pivot a chain column into an expiry x strike surface
+def surface(chain, column="iv", option_type="Calls"):
+    rows = chain[chain["Type"] == option_type]
+    return rows.pivot_table(index="expiration", columns="strike", values=column)
+
+
+# In-memory cache of full chains with a short time to live
+class ChainCache:
+    def __init__(self, ttl=300, fetch=fetch_chain):
+        self.ttl = ttl
+        self.fetch = fetch
+        self._entries = {}
+        self._locks = {}
+        self._guard = threading.Lock()
+
+    # Return the cached snapshot for a ticker, fetching it when missing or expired
+    def get(self, ticker):
+        ticker = ticker.upper()
+        with self._guard:
+            lock = self._locks.setdefault(ticker, threading.Lock())
+
+        # One fetch per ticker at a time; later callers wait and reuse it
+        with lock:
+            entry = self._entries.get(ticker)
+            if entry is None or time.monotonic() - entry[0] > self.ttl:
+                entry = (time.monotonic(), self.fetch(ticker))
+                self._entries[ticker] = entry
+            return entry[1]
+
+
+# Shared cache used by the pages
+_default_cache = None
+
+
+# Function to fetch a ticker's full chain through the shared cache
+def get_chain(ticker):
+    # Create the cache on first use
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ChainCache()
+
+    # Return the snapshot
+    return _default_cache.get(ticker)
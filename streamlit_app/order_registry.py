@@ -0,0 +1,133 @@
+# Imports
+import datetime as dt
+import json
+import os
+from pathlib import Path
+
+# Import numpy
+import numpy as np
+
+# Import the grid order search
+import order_search
+
+# Location of the order registry, one file per ticker and series
+REGISTRY_DIR = Path.cwd() / "data" / "orders"
+
+# Number of past selections kept per series
+HISTORY_LENGTH = 20
+
+
+# Registry of past ARIMA order selections used to warm-start the next search
+class OrderRegistry:
+    def __init__(self, root=REGISTRY_DIR, degrade_threshold=0.05):
+        self.root = Path(root)
+        # Largest allowed rise in AIC per observation before a full search is run again
+        self.degrade_threshold = degrade_threshold
+
+    # Path of the file for a ticker and series
+    def path(self, ticker, series):
+        return self.root / ticker.upper() / f"{series}.json"
+
+    # Return the past selections for a ticker and series, oldest first
+    def history(self, ticker, series):
+        path = self.path(ticker, series)
+        if not path.exists():
+            return []
+        try:
+            return json.loads(path.read_text())
+        except (OSError, ValueError):
+            return []
+
+    # Record a selection
+    def record(self, ticker, series, order, aic, nobs, search_seconds, full_search):
+        # Append to the history
+        history = self.history(ticker, series)
+        history.append(
+            {
+                "order": list(order),
+                "aic": float(aic),
+                "nobs": int(nobs),
+                "search_seconds": float(search_seconds),
+                "full_search": bool(full_search),
+                "per_series": True,
+                "selected_at": dt.datetime.now().isoformat(timespec="seconds"),
+            }
+        )
+
+        # Write it atomically
+        path = self.path(ticker, series)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(history[-HISTORY_LENGTH:]))
+        os.replace(tmp_path, path)
+
+    # Average fitting time of the full searches run so far, or None when there were none.
+    # Older entries timed the whole batch rather than the series and are left out.
+    def full_search_seconds(self, ticker, series):
+        durations = [
+            entry["search_seconds"]
+            for entry in self.history(ticker, series)
+            if entry["full_search"] and entry.get("per_series")
+        ]
+        return float(np.mean(durations)) if durations else None
+
+    # Select orders for many series, searching only around each last winner while its fit stays good
+    def select_orders(self, series, ticker, max_workers=None):
+        series = {name: np.asarray(values, dtype=float) for name, values in series.items()}
+        last = {name: self.history(ticker, name)[-1:] for name in series}
+        last = {name: entries[0] for name, entries in last.items() if entries}
+
+        # Search the neighbourhood of each last winner with its differencing order
+        selected = {}
+        if last:
+            grids, d = {}, {}
+            for name, entry in last.items():
+                p, d[name], q = entry["order"]
+                grids[name] = order_search.candidate_grid(
+                    min_p=max(p - 1, 0), max_p=p + 1, min_q=max(q - 1, 0), max_q=q + 1
+                )
+            local = order_search.select_orders(
+                {name: series[name] for name in last}, grids=grids, d=d, max_workers=max_workers
+            )
+
+            # Keep each winner unless the fit got noticeably worse
+            for name, (order, stats) in local.items():
+                aic_rise = stats["aic"] / len(series[name]) - last[name]["aic"] / last[name]["nobs"]
+                if order is not None and aic_rise <= self.degrade_threshold:
+                    full_seconds = self.full_search_seconds(ticker, name)
+                    saved_seconds = max(full_seconds - stats["search_seconds"], 0.0) if full_seconds else 0.0
+                    selected[name] = (order, {**stats, "full_search": False, "saved_seconds": saved_seconds})
+
+        # Fall back to the full grid for the rest
+        remaining = {name: values for name, values in series.items() if name not in selected}
+        if remaining:
+            for name, (order, stats) in order_search.select_orders(remaining, max_workers=max_workers).items():
+                selected[name] = (order, {**stats, "full_search": True, "saved_seconds": 0.0})
+
+        # Record the selections
+        for name, (order, stats) in selected.items():
+            self.record(
+                ticker, name, order, stats["aic"], len(series[name]), stats["search_seconds"], stats["full_search"]
+            )
+
+        # Return the orders and search statistics in the order given
+        return {name: selected[name] for name in series}
+
+    # Select the order of a single series
+    def select_order(self, values, ticker, series, max_workers=None):
+        return self.select_orders({series: values}, ticker, max_workers=max_workers)[series]
+
+
+# Shared registry used by the pages
+_default_registry = None
+
+
+# Function to fetch the shared registry
+def get_registry():
+    # Create the registry on first use
+    global _default_registry
+    if _default_registry is None:
+        _default_registry = OrderRegistry()
+
+    # Return the registry
+    return _default_registry
@@ -0,0 +1,231 @@
+# Imports
+import argparse
+import time
+import warnings
+from concurrent.futures import FIRST_COMPLETED, wait
+from multiprocessing import shared_memory
+from pathlib import Path
+
+# Import numpy and pandas
+import numpy as np
+import pandas as pd
+
+# Import the required libraries
+from pmdarima.arima import ndiffs
+from statsmodels.tsa.arima.model import ARIMA
+
+# Import the shared worker pool
+import worker_pool
+
+# Largest p + q searched, matching the auto_arima default
+MAX_ORDER = 5
+
+# Models evaluated first to get a good AIC to prune against, as in the stepwise search
+SEED_ORDERS = [(2, 2), (0, 0), (1, 0), (0, 1)]
+
+# Shared memory block attached in this worker
+_attached = None
+
+
+# Function to read a series from shared memory without copying it into the worker
+def _attach(name, length):
+    global _attached
+
+    # Attach to a new block, letting go of the previous one
+    if _attached is None or _attached[0].name != name:
+        if _attached is not None:
+            _attached[0].close()
+        block = shared_memory.SharedMemory(name=name)
+        _attached = (block, np.ndarray((length,), dtype=float, buffer=block.buf))
+
+    # Return the series
+    return _attached[1]
+
+
+# Function to fit one candidate order and return its AIC and -2 log-likelihood
+def _evaluate(name, length, order, trend):
+    values = _attach(name, length)
+    started = time.perf_counter()
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            results = ARIMA(values, order=order, trend=trend).fit()
+        return results.aic, results.aic - 2 * len(results.params), time.perf_counter() - started
+    except (ValueError, np.linalg.LinAlgError):
+        return np.inf, np.inf, time.perf_counter() - started
+
+
+# Function to pick the trend term auto_arima would use for a differencing order
+def _trend(d):
+    return {0: "c", 1: "t"}.get(d, "n")
+
+
+# Function to list the candidate (p, q) pairs, seeds first and then the largest models
+def candidate_grid(max_p=MAX_ORDER, max_q=MAX_ORDER, min_p=0, min_q=0, max_order=MAX_ORDER):
+    grid = [
+        (p, q)
+        for p in range(min_p, max_p + 1)
+        for q in range(min_q, max_q + 1)
+        if p + q <= max_order
+    ]
+    seeds = [pair for pair in SEED_ORDERS if pair in grid]
+    rest = sorted((pair for pair in grid if pair not in seeds), key=lambda pair: -sum(pair))
+    return seeds + rest
+
+
+# Function to bound the best AIC a candidate could reach from the larger models already fitted
+def _aic_bound(pair, trend, fitted):
+    # A nested model never fits better than a model that contains it
+    supersets = [
+        neg2ll
+        for (p, q), neg2ll in fitted.items()
+        if p >= pair[0] and q >= pair[1] and np.isfinite(neg2ll)
+    ]
+    if not supersets:
+        return -np.inf
+    k = sum(pair) + (trend != "n") + 1
+    return 2 * k + max(supersets)
+
+
+# Function to select orders for many named series, evaluating every candidate grid concurrently
+def select_orders(series, grids=None, d=None, max_workers=None):
+    # Copy each series into shared memory once
+    pool = worker_pool.get_pool(max_workers)
+    in_flight_limit = 2 * worker_pool.pool_size()
+    blocks, searches = {}, {}
+    try:
+        for name, values in series.items():
+            values = np.asarray(values, dtype=float)
+            block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+            np.ndarray(values.shape, dtype=float, buffer=block.buf)[:] = values
+            blocks[name] = block
+
+            # Pick the differencing order with the same unit-root test as auto_arima
+            series_d = (d or {}).get(name)
+            if series_d is None:
+                series_d = int(ndiffs(values, test="kpss", max_d=2))
+            searches[name] = {
+                "length": len(values),
+                "d": series_d,
+                "trend": _trend(series_d),
+                "queue": list((grids or {}).get(name) or candidate_grid()),
+                "fitted": {},
+                "best": (np.inf, None),
+                "evaluated": 0,
+                "pruned": 0,
+                "fit_seconds": 0.0,
+            }
+
+        # Keep the pool busy, taking candidates round-robin across the series
+        started = time.perf_counter()
+        pending = {}
+        while True:
+            while len(pending) < in_flight_limit:
+                submitted = False
+                for name, search in searches.items():
+                    while search["queue"]:
+                        pair = search["queue"].pop(0)
+
+                        # Skip candidates whose AIC cannot beat the current best
+                        if _aic_bound(pair, search["trend"], search["fitted"]) >= search["best"][0]:
+                            search["pruned"] += 1
+                            continue
+                        order = (pair[0], search["d"], pair[1])
+                        future = pool.submit(
+                            _evaluate, blocks[name].name, search["length"], order, search["trend"]
+                        )
+                        pending[future] = (name, pair)
+                        submitted = True
+                        break
+                if not submitted:
+                    break
+            if not pending:
+                break
+
+            # Record finished candidates
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                name, pair = pending.pop(future)
+                search = searches[name]
+                aic, neg2ll, fit_seconds = future.result()
+                search["fitted"][pair] = neg2ll
+                search["evaluated"] += 1
+                search["fit_seconds"] += fit_seconds
+                if aic < search["best"][0]:
+                    search["best"] = (aic, (pair[0], search["d"], pair[1]))
+        seconds = time.perf_counter() - started
+
+    # Release the shared memory
+    finally:
+        for block in blocks.values():
+            block.close()
+            block.unlink()
+
+    # Return the winning order and search statistics per series
+    return {
+        name: (
+            search["best"][1] or (0, search["d"], 0),
+            {
+                "aic": float(search["best"][0]),
+                "evaluated": search["evaluated"],
+                "pruned": search["pruned"],
+                # Fitting time of this series' own candidates, which adds up across series unlike the shared wall clock
+                "search_seconds": search["fit_seconds"],
+                "batch_seconds": seconds,
+            },
+        )
+        for name, search in searches.items()
+    }
+
+
+# Function to select the order of a single series
+def select_order(values, max_workers=None):
+    return select_orders({"series": values}, max_workers=max_workers)["series"]
+
+
+# Function to compare the grid search with auto_arima on recorded series
+def benchmark(series, max_workers=None):
+    from pmdarima import auto_arima
+
+    rows = []
+    for name, values in series.items():
+        values = np.asarray(values, dtype=float)
+
+        # Time auto_arima
+        started = time.perf_counter()
+        stepwise_fit = auto_arima(values, suppress_warnings=True)
+        auto_seconds = time.perf_counter() - started
+
+        # Time the grid search
+        order, stats = select_order(values, max_workers=max_workers)
+        rows.append(
+            {
+                "Series": name,
+                "auto_arima order": stepwise_fit.order,
+                "auto_arima AIC": stepwise_fit.aic(),
+                "auto_arima seconds": auto_seconds,
+                "Grid order": order,
+                "Grid AIC": stats["aic"],
+                "Grid seconds": stats["batch_seconds"],
+                "Evaluated": stats["evaluated"],
+                "Pruned": stats["pruned"],
+            }
+        )
+
+    # Return the comparison
+    return pd.DataFrame(rows)
+
+
+# Run the benchmark over the Close series recorded with bar_store.record_fixture
+if __name__ == "__main__":
+    import bar_store
+
+    parser = argparse.ArgumentParser(description="Benchmark the grid order search against auto_arima")
+    parser.add_argument("fixture_dir", help="directory of recorded <TICKER>_1d.csv files")
+    parser.add_argument("--bars", type=int, default=252, help="number of most recent bars per series")
+    args = parser.parse_args()
+
+    provider = bar_store.FixtureBarProvider(args.fixture_dir)
+    tickers = [path.stem.rsplit("_", 1)[0] for path in sorted(Path(args.fixture_dir).glob("*_1d.csv"))]
+    recorded = {ticker: provider.fetch(ticker, "1d")["Close"].dropna().iloc[-args.bars :] for ticker in tickers}
+    print(benchmark(recorded).to_string(index=False))
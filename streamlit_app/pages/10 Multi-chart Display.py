@@ -1,77 +1,78 @@
 import streamlit as st
-import yfinance as yf
 import pandas as pd
+import bar_store
+import dividend_store
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import requests
-from lxml import html
-import math
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
 # Set Streamlit to always run in wide mode
 st.set_page_config(layout="wide")
 
-def get_stock_data(tickers, past_days):
-    data = {}
-    end_date = pd.to_datetime("today")
-    start_date = end_date - pd.Timedelta(days=past_days)
-    for ticker in tickers:
-        try:
-            stock = yf.Ticker(ticker)
-            hist = stock.history(start=start_date, end=end_date)
-            if not hist.empty:
-                data[ticker] = hist
-        except Exception as e:
-            st.error(f"Error fetching data for {ticker}: {e}")
-    return data
+def load_ticker(ticker, start_date, end_date):
+    # Bars first, as the dividend store reads its events from the bars just synced and needs no second download
+    hist = bar_store.get_bars(ticker, start=start_date, end=end_date)
+    if not hist.empty:
+        dividend_store.get_store().sync(ticker)
+    return hist
 
-def get_dividend_info(ticker):
-    urls = [
-        f"https://stockanalysis.com/etf/{ticker}/dividend/",
-        f"https://stockanalysis.com/stocks/{ticker}/dividend/"
-    ]
-    for url in urls:
-        response = requests.get(url)
-        if response.status_code == 200:
-            tree = html.fromstring(response.content)
-            dividend_xpath = '/html/body/div/div[1]/div[2]/main/div[2]/div/div[2]/div[2]/div'
-            apy_xpath = '/html/body/div/div[1]/div[2]/main/div[2]/div/div[2]/div[1]/div'
-            dividend = tree.xpath(dividend_xpath)
-            apy = tree.xpath(apy_xpath)
-            if dividend and apy:
-                return dividend[0].text_content(), apy[0].text_content()
-    return "N/A", "N/A"
+def format_dividend_info(info):
+    # Forward annual dividend and yield, or N/A when the ticker has no dividend row
+    if info is None or pd.isna(info["Price"]):
+        return "N/A", "N/A"
+    return f"${info['Forward Dividend']:.2f}", f"{info['Forward Yield %']:.2f}%"
 
-def plot_stock_data(data):
-    num_tickers = len(data)
-    num_cols = 2
-    num_rows = math.ceil(num_tickers / num_cols)
-    
-    fig = make_subplots(rows=num_rows, cols=num_cols, subplot_titles=[f"{ticker} - Annual Dividend: {get_dividend_info(ticker)[0]}, APY: {get_dividend_info(ticker)[1]}" for ticker in data.keys()])
+def plot_ticker(cell, ticker, hist, info):
+    annual_dividend, apy = format_dividend_info(info)
+    fig = go.Figure(go.Scatter(x=hist.index, y=hist['Close'], mode='lines', name=ticker))
+    fig.update_layout(title=f"{ticker} - Annual Dividend: {annual_dividend}, APY: {apy}", height=300, showlegend=False, margin=dict(t=40, b=20))
+    cell.plotly_chart(fig, use_container_width=True)
 
-    row = 1
-    col = 1
+def stream_charts(tickers, past_days, num_cols=2):
+    end_date = pd.to_datetime("today")
+    start_date = end_date - pd.Timedelta(days=past_days)
 
-    for ticker, hist in data.items():
-        fig.add_trace(go.Scatter(x=hist.index, y=hist['Close'], mode='lines', name=ticker), row=row, col=col)
-        if col == num_cols:
-            row += 1
-            col = 1
-        else:
-            col += 1
+    # One cell per ticker, laid out in order up front so charts land in place as they arrive
+    cells = {}
+    for row_start in range(0, len(tickers), num_cols):
+        for column, ticker in zip(st.columns(num_cols), tickers[row_start:row_start + num_cols]):
+            cells[ticker] = column.empty()
+            cells[ticker].info(f"Loading {ticker}...")
 
-    fig.update_layout(height=300*num_rows, width=1200, showlegend=False)
-    st.plotly_chart(fig, use_container_width=True)
+    # Every ticker loads at once and the charts are drawn as each batch of loaded tickers comes in,
+    # with the dividend metrics of the whole batch computed in one pass over the events already synced
+    drawn = 0
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        pending = {executor.submit(load_ticker, ticker, start_date, end_date): ticker for ticker in tickers}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            loaded = {}
+            for future in done:
+                ticker = pending.pop(future)
+                try:
+                    hist = future.result()
+                except Exception as e:
+                    cells[ticker].error(f"Error fetching data for {ticker}: {e}")
+                    continue
+                if hist.empty:
+                    cells[ticker].warning(f"No data available for {ticker} in the date range.")
+                    continue
+                loaded[ticker] = hist
+            if not loaded:
+                continue
+            table, _ = dividend_store.get_store().metrics(list(loaded), sync=False)
+            for ticker, hist in loaded.items():
+                plot_ticker(cells[ticker], ticker, hist, table.loc[ticker])
+                drawn += 1
+    return drawn
 
 st.title("Interactive Stock Charts with Dividend Yield (Annual Dividend and APY)")
 
 tickers_input = st.text_area("Tickers Entry Box (separated by commas)", " ")
 past_days = st.number_input("Past days from today", min_value=1, value=90)
 
-tickers = [ticker.strip() for ticker in tickers_input.split(",")]
+# Each ticker is loaded once, however often it was entered
+tickers = list(dict.fromkeys(ticker.strip().upper() for ticker in tickers_input.split(",") if ticker.strip()))
 
 if st.button("Generate Charts"):
-    data = get_stock_data(tickers, past_days)
-    if data:
-        plot_stock_data(data)
-    else:
+    if not stream_charts(tickers, past_days):
         st.error("No data available for the given tickers and date range.")
@@ -1,38 +1,34 @@
 import streamlit as st
-import requests
-from bs4 import BeautifulSoup
 import streamlit.components.v1 as components
-
-def fetch_tickers(url):
-    response = requests.get(url)
-    html = response.text
-
-    start = html.find('"symbols":[') + len('"symbols":[')
-    end = html.find(']', start)
-    symbols_str = html[start:end]
-    symbols = [symbol.strip('"') for symbol in symbols_str.split(',')]
-
-    return symbols
-
-def clean_tickers(tickers):
-    return [ticker.split(':')[1] if ':' in ticker else ticker for ticker in tickers]
-
-# URL of the HTML files
-url1 = 'https://www.tradingview.com/watchlists/139248623/'
-url2 = 'https://www.tradingview.com/watchlists/158296099/'
+import job_view
+import precompute
+import watchlists
 
 st.title("G-EnterpriseGroup Trading List")
 
-# Main page reload button
-if st.button("Reload Page"):
-    # Setting query params to force reload
-    st.experimental_set_query_params()
-
-def display_tickers(url):
+# Main page reload button, which checks the lists again right away
+reload_page = st.button("Reload Page")
+
+# Both lists are checked at once with one conditional request each, or answered from the stored membership
+# when they were checked in the last five minutes
+deltas, errors = watchlists.get_sync().sync(['Red', 'Banks'], max_age=0 if reload_page else 300)
+for name, error in errors.items():
+    st.warning(f"Could not check list {name}, showing the last known tickers: {error}")
+
+# Only tickers newly added to a list are synced and forecast, in the background
+added = watchlists.added_tickers(deltas)
+if added:
+    job_view.submit('watchlist_refresh_job', precompute.refresh_tickers, added)
+job = job_view.track('watchlist_refresh_job')
+if job is not None and job.status == 'done':
+    done, failed = job.result
+    st.caption(f"Precomputed {len(done)} newly added tickers" + (f", {len(failed)} failed: {', '.join(failed)}" if failed else ""))
+
+def display_tickers(delta):
     st.write("Fetching tickers from G-EnterpriseGroup Database:")
-
-    tickers = fetch_tickers(url)
-    cleaned_tickers = clean_tickers(tickers)
+    cleaned_tickers = delta['symbols']
+    if delta['changed'] and not delta['first']:
+        st.caption(f"Added: {', '.join(delta['added']) or 'none'}. Removed: {', '.join(delta['removed']) or 'none'}.")
 
     if cleaned_tickers:
         st.write("Tickers found:")
@@ -49,8 +45,8 @@ def display_tickers(url):
 
 # Display tickers for URL 1
 with st.expander("Tickers from List - Red"):
-    display_tickers(url1)
+    display_tickers(deltas['Red'])
 
 # Display tickers for URL 2
 with st.expander("Tickers from List - Banks"):
-    display_tickers(url2)
+    display_tickers(deltas['Banks'])
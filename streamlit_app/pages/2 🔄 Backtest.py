@@ -1,15 +1,10 @@
-import pandas as pd
-import numpy as np
 import streamlit as st
 import yfinance as yf
 import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
 from datetime import datetime, timedelta
-from statsmodels.tsa.statespace.sarimax import SARIMAX
-from pmdarima import auto_arima
 import plotly.graph_objects as go
-from pandas.tseries.holiday import USFederalHolidayCalendar
-from pandas.tseries.offsets import CustomBusinessDay
+import forecast_pipeline
+import job_view
 
 st.set_page_config(layout="wide")
 
@@ -46,59 +41,62 @@ end_date1 = st.date_input('End Date', value=default_end_date)
 
 st.write(f'Days Predicting: 30\nSeasonality: {SN}\nTicker: {Ticker}\nStart Date: {start_date1}\nEnd Date: {end_date1}')
 
+### - THE RUNS GO TO THE SHARED JOB QUEUE, SO THE PAGE STAYS RESPONSIVE AND A WIDGET CHANGE DOES NOT THROW THEM AWAY
 if st.button('Run SARIMAX Model'):
-    with st.spinner('Model is running, please wait...Estimated 4 Minutes'):
-        progress_bar = st.progress(0)
-        df = yf.Ticker(Ticker).history(period="max")
-        df = df.loc[pd.to_datetime(start_date1).tz_localize('America/New_York'):pd.to_datetime(end_date1).tz_localize('America/New_York')]
-        if df.index.tz is None:
-            df.index = pd.to_datetime(df.index).tz_localize('America/New_York')
-        else:
-            df.index = pd.to_datetime(df.index).tz_convert('America/New_York')
-        df = df[['Close']].copy()
-        progress_bar.progress(10)
-        
-        C = df["Close"].dropna()
-        progress_bar.progress(30)
-        auto_model = auto_arima(C, trace=True, suppress_warnings=True)
-        arima_order = auto_model.order
-        seasonal_order = (arima_order[0], arima_order[1], arima_order[2], SN)
-        model = SARIMAX(C, order=arima_order, seasonal_order=seasonal_order).fit()
-        progress_bar.progress(80)
-        cal = USFederalHolidayCalendar()
-        holidays = cal.holidays(start=df.index.max(), end=df.index.max() + pd.DateOffset(days=90))
-        future_dates = pd.bdate_range(start=df.index.max(), periods=30 + len(holidays), freq='B')
-        future_dates = future_dates[~future_dates.isin(holidays)][:30]
-        predictions = model.predict(start=len(C), end=len(C) + len(future_dates) - 1, dynamic=True)
-        
-        custom_business_day = CustomBusinessDay(calendar=USFederalHolidayCalendar())
-        future_dates_index = pd.date_range(start=future_dates[0], periods=len(predictions), freq=custom_business_day)
-        predictions.index = future_dates_index
-        
-        plt.figure(figsize=(10, 6))
-        plt.plot(df.index, df['Close'], label='Actual Close')
-        plt.plot(predictions.index, predictions, label='Forecast', linestyle='--')
-        plt.title(f'{Ticker} Stock Price Forecast')
-        plt.xlabel('Date')
-        plt.ylabel('Price')
-        plt.legend()
-        plt.tight_layout()
-        st.pyplot(plt)
-        
-        future_df = pd.DataFrame({'Forecasted Price': predictions.values}, index=future_dates_index)
-        st.write(future_df)
-        
-        plt.figure(figsize=(15, 7))
-        plt.plot(future_df.index, future_df['Forecasted Price'], label='Forecasted Price', linestyle='--', color='red')
-        plt.title(f'{Ticker} Historical and Forecasted Stock Price')
-        plt.xlabel('Date')
-        plt.ylabel('Price')
-        plt.legend()
-        plt.tight_layout()
-        st.pyplot(plt)
-        
-        progress_bar.progress(100)
-        st.success("Model run successfully!")
+    job_view.submit('holdout_job', forecast_pipeline.run_holdout, Ticker, start_date1, end_date1, seasonality=SN, horizon=30)
+
+job = job_view.track('holdout_job')
+if job is not None and job.status == 'done':
+    result = job.result
+    df = result['close'].to_frame('Close')
+    predictions = result['predictions']
+    fan = result.get('intervals')
+    st.write(f"Order search took {result['order_search']['batch_seconds']:.1f}s, saved {result['order_search']['saved_seconds']:.1f}s of fitting")
+
+    plt.figure(figsize=(10, 6))
+    plt.plot(df.index, df['Close'], label='Actual Close')
+    plt.plot(predictions.index, predictions, label='Forecast', linestyle='--')
+    if fan is not None:
+        plt.fill_between(fan.index, fan['5%'], fan['95%'], alpha=0.15, label='Forecast 5-95%')
+        plt.fill_between(fan.index, fan['25%'], fan['75%'], alpha=0.3, label='Forecast 25-75%')
+    plt.title(f"{result['ticker']} Stock Price Forecast")
+    plt.xlabel('Date')
+    plt.ylabel('Price')
+    plt.legend()
+    plt.tight_layout()
+    st.pyplot(plt)
+
+    future_df = predictions.to_frame('Forecasted Price')
+    if fan is not None:
+        future_df = future_df.join(fan)
+    st.write(future_df)
+
+    plt.figure(figsize=(15, 7))
+    plt.plot(future_df.index, future_df['Forecasted Price'], label='Forecasted Price', linestyle='--', color='red')
+    if fan is not None:
+        plt.fill_between(fan.index, fan['5%'], fan['95%'], color='red', alpha=0.12, label='5-95%')
+        plt.fill_between(fan.index, fan['25%'], fan['75%'], color='red', alpha=0.25, label='25-75%')
+    plt.title(f"{result['ticker']} Historical and Forecasted Stock Price")
+    plt.xlabel('Date')
+    plt.ylabel('Price')
+    plt.legend()
+    plt.tight_layout()
+    st.pyplot(plt)
+
+    st.success("Model run successfully!")
+
+st.write("## Walk-Forward Backtest")
+wf_origins = st.slider('Forecast Origins', 2, 50, 10)
+wf_window = st.radio('Training Window', ['expanding', 'sliding'])
+wf_refit = st.number_input('Refit Every N Origins (0 = never)', min_value=0, value=0)
+
+if st.button('Run Walk-Forward Backtest'):
+    job_view.submit('walk_forward_job', forecast_pipeline.run_walk_forward, Ticker, start_date1, end_date1, seasonality=SN, horizon=30, origins=wf_origins, window=wf_window, refit_every=wf_refit or None)
+
+job = job_view.track('walk_forward_job')
+if job is not None and job.status == 'done':
+    st.write("Aggregate Errors:", job.result['aggregate'].to_frame('Value'))
+    st.write("Errors per Origin:", job.result['per_origin'])
 
 #_______________________________________________________________________________________________________________________________________________________________
 # Function to fetch data
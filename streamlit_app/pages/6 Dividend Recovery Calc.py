@@ -1,6 +1,7 @@
 import streamlit as st
-import yfinance as yf
 from datetime import datetime
+import dividend_store
+import recovery
 
 
 # Title and date input
@@ -9,48 +10,92 @@ st.title("DivFinancial Dashboard")
 """
 today_date = st.date_input("Today's Date", datetime.now())
 
-# Ticker input and data fetching
-ticker_input = st.text_input("Enter Stock Ticker", value='ABR')
-
-def get_stock_data(ticker):
-    stock = yf.Ticker(ticker)
-    price = stock.history(period="1d")['Close'].iloc[-1]  # Latest stock price
-    try:
-        # Attempt to get the dividend rate from the info property
-        dividend_rate = stock.info['dividendRate']
-    except KeyError:
-        # If dividendRate is not available, set it to 0
-        dividend_rate = 0
-    return price, dividend_rate
-
-latest_price, latest_dividend = get_stock_data(ticker_input)
-st.write(f"Current Price for {ticker_input}: ${latest_price}")
-st.write(f"Annual Dividend Payment per Share for {ticker_input}: ${latest_dividend}")
-
-# Financial calculations input
-average_cost_per_share = st.number_input("Average Cost Per Share", value=13.13)
-quantity = st.number_input("Quantity", value=76)
-
-# Calculations
-if isinstance(latest_price, (int, float)) and isinstance(average_cost_per_share, (int, float)):
-    cost_value = average_cost_per_share * quantity
-    market_value = latest_price * quantity
-    profit_loss = market_value - cost_value
-
-    st.write(f"Cost Value: ${cost_value:,.2f}")
-    st.write(f"Market Value: ${market_value:,.2f}")
-    st.write(f"Profit (Loss): ${profit_loss:,.2f}")
-
-    if profit_loss < 0 and isinstance(latest_dividend, (int, float)) and latest_dividend > 0:
-        total_annual_dividend = latest_dividend * quantity
-        quarterly_dividend = total_annual_dividend / 4  # Assuming dividends are paid quarterly
-        monthly_dividend = total_annual_dividend / 12  # Assuming dividends could be divided monthly
-        quarters_to_recovery = abs(profit_loss) / quarterly_dividend
-        months_to_recovery = abs(profit_loss) / monthly_dividend
-        st.write(f"Total Annual Dividend: ${total_annual_dividend:,.2f}")
-        st.write(f"Quarters to Recovery: {round(quarters_to_recovery, 2)} quarters")
-        st.write(f"Months to Recovery: {round(months_to_recovery, 2)} months")
-    elif profit_loss >= 0:
-        st.write("Congrats, you are in profit!")
-    else:
-        st.write("Dividend data not available or dividend is zero, cannot calculate quarters or months to recovery.")
+# One position typed in, or a whole portfolio uploaded as a holdings file
+mode = st.radio("Mode", ["Single Position", "Portfolio"], horizontal=True)
+
+if mode == "Single Position":
+
+    # Ticker input and data fetching
+    ticker_input = st.text_input("Enter Stock Ticker", value='ABR')
+
+    def get_stock_data(ticker):
+        # Latest close and forward annual dividend from the local dividend store
+        table, errors = dividend_store.metrics([ticker])
+        if errors:
+            st.error(f"No data for {ticker}: {errors[ticker.strip().upper()]}")
+            st.stop()
+        row = table.iloc[0]
+        return float(row['Price']), float(row['Forward Dividend'])
+
+    latest_price, latest_dividend = get_stock_data(ticker_input)
+    st.write(f"Current Price for {ticker_input}: ${latest_price}")
+    st.write(f"Annual Dividend Payment per Share for {ticker_input}: ${latest_dividend}")
+
+    # Financial calculations input
+    average_cost_per_share = st.number_input("Average Cost Per Share", value=13.13)
+    quantity = st.number_input("Quantity", value=76)
+
+    # Calculations
+    if isinstance(latest_price, (int, float)) and isinstance(average_cost_per_share, (int, float)):
+        cost_value = average_cost_per_share * quantity
+        market_value = latest_price * quantity
+        profit_loss = market_value - cost_value
+
+        st.write(f"Cost Value: ${cost_value:,.2f}")
+        st.write(f"Market Value: ${market_value:,.2f}")
+        st.write(f"Profit (Loss): ${profit_loss:,.2f}")
+
+        if profit_loss < 0 and isinstance(latest_dividend, (int, float)) and latest_dividend > 0:
+            total_annual_dividend = latest_dividend * quantity
+            quarterly_dividend = total_annual_dividend / 4  # Assuming dividends are paid quarterly
+            monthly_dividend = total_annual_dividend / 12  # Assuming dividends could be divided monthly
+            quarters_to_recovery = abs(profit_loss) / quarterly_dividend
+            months_to_recovery = abs(profit_loss) / monthly_dividend
+            st.write(f"Total Annual Dividend: ${total_annual_dividend:,.2f}")
+            st.write(f"Quarters to Recovery: {round(quarters_to_recovery, 2)} quarters")
+            st.write(f"Months to Recovery: {round(months_to_recovery, 2)} months")
+        elif profit_loss >= 0:
+            st.write("Congrats, you are in profit!")
+        else:
+            st.write("Dividend data not available or dividend is zero, cannot calculate quarters or months to recovery.")
+
+else:
+    # Holdings file with ticker, average cost and quantity columns
+    st.write("Upload a CSV with Ticker, Average Cost and Quantity columns, one row per position.")
+    holdings_file = st.file_uploader("Holdings File", type=["csv"])
+    paths = st.slider("Simulated Paths", min_value=500, max_value=10000, value=2000, step=500)
+    horizon_years = st.slider("Horizon (Years)", min_value=1, max_value=20, value=10)
+
+    if holdings_file is not None and st.button("Run Simulation"):
+        try:
+            holdings = recovery.read_holdings(holdings_file)
+        except ValueError as exc:
+            st.error(str(exc))
+            st.stop()
+
+        # Prices and dividends of every ticker come from the local bar store, several tickers at a time
+        with st.spinner(f"Loading {holdings['Ticker'].nunique()} tickers"):
+            markets, errors = recovery.load_market(holdings["Ticker"])
+        if errors:
+            st.warning(f"Skipped {len(errors)} tickers without data: {', '.join(sorted(errors))}")
+        if not markets:
+            st.error("None of the holdings have price data, nothing to simulate.")
+            st.stop()
+
+        # Every position over every path at once
+        with st.spinner("Simulating price and dividend paths"):
+            positions, portfolio = recovery.simulate(holdings, markets, paths=paths, horizon_months=12 * horizon_years)
+
+        # Portfolio totals and the share of paths recovered by each year
+        cost_value = (positions["Average Cost"] * positions["Quantity"]).sum()
+        market_value = (positions["Price"] * positions["Quantity"]).sum()
+        st.write(f"Cost Value: ${cost_value:,.2f}")
+        st.write(f"Market Value: ${market_value:,.2f}")
+        st.write(f"Profit (Loss): ${market_value - cost_value:,.2f}")
+        st.write(f"Portfolio recovers within {horizon_years} years on {(portfolio < float('inf')).mean():.0%} of paths")
+        summary = recovery.portfolio_summary(portfolio, 12 * horizon_years)
+        st.line_chart(summary.set_index("Years"))
+
+        # Months to recovery per position, unrecovered paths shown as beyond the horizon
+        st.write("Months to Recovery per Position")
+        st.dataframe(positions.replace(float("inf"), None))
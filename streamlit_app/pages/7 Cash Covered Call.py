@@ -1,40 +1,19 @@
 import streamlit as st
-import yfinance as yf
 import pandas as pd
-import numpy as np
-from scipy.stats import norm
-import matplotlib.pyplot as plt
+import covered_call_scanner
+import option_pricing
+import options_chain
 
 st.set_page_config(layout="wide")
 
 # Define functions for the covered call calculator
+# Every expiration is fetched once, concurrently, and cached for a few minutes
 def get_expiration_dates(ticker):
-    stock = yf.Ticker(ticker)
-    return stock.options
+    return options_chain.get_chain(ticker)['expirations']
 
 def get_options_chain(ticker, expiration_date):
-    stock = yf.Ticker(ticker)
-    options = stock.option_chain(expiration_date)
-    options_df = pd.concat([options.calls, options.puts], keys=['Calls', 'Puts'], names=['Type'])
-    options_df = options_df.reset_index(level='Type').reset_index(drop=True)
-    return options_df
-
-def calculate_greeks(S, K, T, r, sigma, option_type="call"):
-    d1 = (np.log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * np.sqrt(T))
-    d2 = d1 - sigma * np.sqrt(T)
-
-    if option_type == "call":
-        delta = norm.cdf(d1)
-        theta = (-S * norm.pdf(d1) * sigma / (2 * np.sqrt(T)) - r * K * np.exp(-r * T) * norm.cdf(d2)) / 365
-    else:
-        delta = -norm.cdf(-d1)
-        theta = (-S * norm.pdf(d1) * sigma / (2 * np.sqrt(T)) + r * K * np.exp(-r * T) * norm.cdf(-d2)) / 365
-
-    gamma = norm.pdf(d1) / (S * sigma * np.sqrt(T))
-    vega = S * norm.pdf(d1) * np.sqrt(T) / 100
-    rho = K * T * np.exp(-r * T) * norm.cdf(d2) if option_type == "call" else -K * T * np.exp(-r * T) * norm.cdf(-d2)
-
-    return delta, gamma, theta, vega, rho
+    chain = options_chain.get_chain(ticker)['chain']
+    return chain[chain['expiration'] == expiration_date].reset_index(drop=True)
 
 def calculate_covered_call(price, quantity, option_price, strike_price, days_until_expiry):
     initial_premium = option_price * quantity * 100
@@ -48,6 +27,18 @@ def calculate_covered_call(price, quantity, option_price, strike_price, days_unt
 # Streamlit UI for Covered Call Calculator
 st.title("Covered Call Calculator")
 
+# Scanner over every expiration and strike of a list of tickers
+with st.expander("Covered Call Scanner"):
+    scan_tickers = st.text_area("Tickers to Scan (separated by commas)", ", ".join(st.session_state.get('cleaned_tickers', [])))
+    scan_min_delta = st.number_input("Minimum Delta", min_value=0.0, max_value=1.0, value=0.0, step=0.05)
+    scan_max_days = st.number_input("Maximum Days to Expiry", min_value=1, value=60, step=1)
+    if st.button("Scan"):
+        with st.spinner("Scanning option chains..."):
+            ranked, failed = covered_call_scanner.scan(scan_tickers.split(","), min_delta=scan_min_delta, max_days=scan_max_days)
+        if failed:
+            st.warning(f"Could not fetch option chains for: {', '.join(failed)}")
+        st.dataframe(ranked, height=600)
+
 ticker = st.text_input("Ticker Symbol", value="AAPL")
 if ticker:
     expiration_dates = get_expiration_dates(ticker)
@@ -58,7 +49,7 @@ if ticker:
         
         strike_prices = chain['strike'].unique()
         
-        stock_price = yf.Ticker(ticker).history(period='1d')['Close'][0]
+        stock_price = options_chain.get_chain(ticker)['spot']
         closest_strike_price = min(strike_prices, key=lambda x: abs(x - stock_price))
         
         selected_strike_price = st.selectbox("Select Strike Price", strike_prices, index=list(strike_prices).index(closest_strike_price))
@@ -85,10 +76,10 @@ if ticker:
                     stock_price, quantity, option_price, selected_strike_price, days_until_expiry)
 
                 r = 0.01  # Risk-free rate
-                iv = selected_option['impliedVolatility'].values[0]  # Implied Volatility
+                iv = selected_option['iv'].values[0]  # Implied Volatility
                 T = days_until_expiry / 365.0  # Time to expiration in years
 
-                delta, gamma, theta, vega, rho = calculate_greeks(stock_price, selected_strike_price, T, r, iv, 'call')
+                delta, gamma, theta, vega, rho = (float(value) for value in option_pricing.greeks(stock_price, selected_strike_price, T, r, iv, 'call').values())
 
                 st.write("### Results:")
                 st.write(f"**Initial Premium Received:** ${initial_premium:.2f}")
@@ -105,46 +96,30 @@ if ticker:
                 st.write(f"**Vega:** {vega:.2f}")
                 st.write(f"**Rho:** {rho:.2f}")
 
-# Black-Scholes formula for a call option
-def black_scholes_call(S, K, T, r, sigma):
-    if T == 0:
-        return max(0, S - K)
-    d1 = (np.log(S / K) + (r + 0.5 * sigma**2) * T) / (sigma * np.sqrt(T))
-    d2 = d1 - sigma * np.sqrt(T)
-    call_price = (S * norm.cdf(d1) - K * np.exp(-r * T) * norm.cdf(d2))
-    return call_price
+# Surfaces across every expiration and strike of the cached chain
+with st.expander("Implied Volatility and Greeks Surface"):
+    surface_type = st.radio("Option Type", ["Calls", "Puts"], horizontal=True)
+    surface_column = st.selectbox("Surface", ["iv", "Delta", "Gamma", "Theta", "Vega", "Rho"])
+    st.dataframe(options_chain.surface(options_chain.get_chain(ticker)['chain'], surface_column, surface_type))
+
+# Price step and range of the profit and loss table
+price_step = st.number_input("Price Step", min_value=0.01, value=0.50, step=0.05)
+price_steps = st.number_input("Price Steps Each Side", min_value=1, value=13, step=1)
 
-# Create price range with increments of 0.75
+# Compute the P&L and greek surfaces over every price and day at once
 initial_stock_price = stock_price
 strike_price = selected_strike_price
 days_to_expiration = days_until_expiry
 risk_free_rate = 0.01
 initial_premium_received = option_price
-price_range = np.round(np.arange(initial_stock_price - 13 * 0.50, initial_stock_price + 14 * 0.50, 0.50), 2)
-iv = selected_option['impliedVolatility'].values[0]
-
-# Create a DataFrame to store results
-columns = ['Price'] + [f'Day_{day}' for day in range(1, days_to_expiration + 1)]
-results = pd.DataFrame(columns=columns)
-
-# Calculate P&L for each stock price and each day
-for price in price_range:
-    row = [price]
-    for day in range(1, days_to_expiration + 1):
-        T = (days_to_expiration - day) / 365
-        call_price = black_scholes_call(price, strike_price, T, risk_free_rate, iv)
-        covered_call_value = (price - initial_stock_price) * 100 - (call_price * 100) + initial_premium_received * 100
-        row.append(covered_call_value)
-    results.loc[len(results)] = row
-
-# Apply conditional formatting
-def color_negative_red_positive_green(val):
-    if val > 0:
-        color = f'rgb({255 - int((val / results.max().max()) * 255)}, 255, {255 - int((val / results.max().max()) * 255)})'
-    else:
-        color = f'rgb(255, {255 - int((abs(val) / abs(results.min().min())) * 255)}, {255 - int((abs(val) / abs(results.min().min())) * 255)})'
-    return f'background-color: {color}; color: black;'
-
-formatted_results = results.style.applymap(color_negative_red_positive_green, subset=columns[1:])
-st.write("### Profit and Loss Table:")
+iv = selected_option['iv'].values[0]
+surfaces = option_pricing.covered_call_grid(
+    initial_stock_price, strike_price, days_to_expiration, risk_free_rate, iv, initial_premium_received,
+    price_step=price_step, steps_below=price_steps, steps_above=price_steps)
+
+# Apply conditional formatting, normalised once for the whole table
+surface = st.selectbox("Table", list(surfaces))
+results = surfaces[surface]
+formatted_results = results.style.apply(option_pricing.color_scale, axis=None)
+st.write(f"### {'Profit and Loss' if surface == 'P&L' else surface} Table:")
 st.dataframe(formatted_results, height=1000)
@@ -1,97 +1,84 @@
 import streamlit as st
 import pandas as pd
-import requests
-from lxml import html
+from concurrent.futures import ThreadPoolExecutor
 import yfinance as yf
+import response_cache
+from extraction import DIVIDEND_PROFILE, PERFORMANCE_PROFILE
 
-# Function to get stock data
-def get_stock_data(ticker):
-    base_url = "https://stockanalysis.com"
-    etf_url = f"{base_url}/etf/{ticker}/dividend/"
-    stock_url = f"{base_url}/stocks/{ticker}/dividend/"
+# Shared response cache: pages and their parsed rows are kept on disk and revalidated through the pooled HTTP client
+cache = response_cache.get_cache()
 
+# Function to wait for a response, returning None when the request failed
+def response_of(future):
     try:
-        response = requests.get(etf_url)
-        if response.status_code == 200:
-            tree = html.fromstring(response.content)
-            price = tree.xpath('//*[@id="main"]/div[1]/div[2]/div/div[1]/text()')[0].strip()
-            yield_percent = tree.xpath('//*[@id="main"]/div[2]/div/div[2]/div[1]/div/text()')[0].strip()
-            annual_dividend = tree.xpath('/html/body/div/div[1]/div[2]/main/div[2]/div/div[2]/div[2]/div/text()')[0].strip()
-            ex_dividend_date = tree.xpath('/html/body/div/div[1]/div[2]/main/div[2]/div/div[2]/div[3]/div/text()')[0].strip()
-            frequency = tree.xpath('//*[@id="main"]/div[2]/div/div[2]/div[4]/div/text()')[0].strip()
-            dividend_growth = tree.xpath('/html/body/div/div[1]/div[2]/main/div[2]/div/div[2]/div[6]/div/text()')[0].strip()
-            return {"Ticker": ticker, "Price": price, "Yield %": yield_percent, "Annual Dividend": annual_dividend, "Ex Dividend Date": ex_dividend_date, "Frequency": frequency, "Dividend Growth %": dividend_growth}
-        else:
-            response = requests.get(stock_url)
-            if response.status_code == 200:
-                tree = html.fromstring(response.content)
-                price = tree.xpath('//*[@id="main"]/div[1]/div[2]/div/div[1]/text()')[0].strip()
-                yield_percent = tree.xpath('//*[@id="main"]/div[2]/div/div[2]/div[1]/div/text()')[0].strip()
-                annual_dividend = tree.xpath('/html/body/div/div[1]/div[2]/main/div[2]/div/div[2]/div[2]/div/text()')[0].strip()
-                ex_dividend_date = tree.xpath('/html/body/div/div[1]/div[2]/main/div[2]/div/div[2]/div[3]/div/text()')[0].strip()
-                frequency = tree.xpath('//*[@id="main"]/div[2]/div/div[2]/div[4]/div/text()')[0].strip()
-                dividend_growth = tree.xpath('/html/body/div/div[1]/div[2]/main/div[2]/div/div[2]/div[6]/div/text()')[0].strip()
-                return {"Ticker": ticker, "Price": price, "Yield %": yield_percent, "Annual Dividend": annual_dividend, "Ex Dividend Date": ex_dividend_date, "Frequency": frequency, "Dividend Growth %": dividend_growth}
-            else:
-                return {"Ticker": ticker, "Price": "N/A", "Yield %": "N/A", "Annual Dividend": "N/A", "Ex Dividend Date": "N/A", "Frequency": "N/A", "Dividend Growth %": "N/A"}
-    except Exception as e:
-        return {"Ticker": ticker, "Price": "N/A", "Yield %": "N/A", "Annual Dividend": "N/A", "Ex Dividend Date": "N/A", "Frequency": "N/A", "Dividend Growth %": "N/A"}
-
-# Function to get additional stock or ETF data
-def get_additional_stock_data(ticker):
-    base_url = f"https://www.tradingview.com/symbols/{ticker}/"
+        return future.result()
+    except Exception:
+        return None
+
+# Function to fetch the stockanalysis.com dividend page of every ticker at once, trying the ETF page before the stock page
+def fetch_dividend_pages(tickers):
+    base_url = "https://stockanalysis.com"
+    etf = {ticker: cache.submit(f"{base_url}/etf/{ticker}/dividend/") for ticker in tickers}
+    pages = {ticker: response_of(future) for ticker, future in etf.items()}
+
+    # Tickers without an ETF page are retried as stocks, again all at once
+    misses = [ticker for ticker, response in pages.items() if response is None or response.status_code != 200]
+    stock = {ticker: cache.submit(f"{base_url}/stocks/{ticker}/dividend/") for ticker in misses}
+    pages.update({ticker: response_of(future) for ticker, future in stock.items()})
+    return pages
+
+# Function to read the dividend summary from a stockanalysis.com page, ETF and stock pages sharing one layout
+def get_stock_data(response):
+    return parsed(response, DIVIDEND_PROFILE.key, DIVIDEND_PROFILE.extract_response)
+
+# Function to read the performance buttons from a TradingView symbol page, stocks and ETFs alike
+def get_additional_stock_data(response):
+    return parsed(response, PERFORMANCE_PROFILE.key, PERFORMANCE_PROFILE.extract_response)
+
+# Function to parse a page through the cache, so an unchanged page is only ever parsed once
+def parsed(response, name, parse):
+    if response is None:
+        return parse(response)
+    return cache.parsed(response, name, parse)
+
+# Function to get the long name of a ticker from Yahoo Finance
+def get_name(ticker):
     try:
-        response = requests.get(base_url)
-        if response.status_code == 200:
-            tree = html.fromstring(response.content)
-
-            # Attempt both stock and ETF XPaths
-            try:
-                # First try stock XPath
-                day_1 = tree.xpath('//*[@id="js-category-content"]/div[2]/div/section/div[1]/div[2]/div/div[2]/div/div[2]/button[1]/span/span[2]/text()')[0].strip()
-                day_5 = tree.xpath('//*[@id="js-category-content"]/div[2]/div/section/div[1]/div[2]/div/div[2]/div/div[2]/button[2]/span/span[2]/text()')[0].strip()
-                month_1 = tree.xpath('//*[@id="js-category-content"]/div[2]/div/section/div[1]/div[2]/div/div[2]/div/div[2]/button[3]/span/span[2]/text()')[0].strip()
-                month_6 = tree.xpath('//*[@id="js-category-content"]/div[2]/div/section/div[1]/div[2]/div/div[2]/div/div[2]/button[4]/span/span[2]/text()')[0].strip()
-                ytd = tree.xpath('//*[@id="js-category-content"]/div[2]/div/section/div[1]/div[2]/div/div[2]/div/div[2]/button[5]/span/span[2]/text()')[0].strip()
-                year_1 = tree.xpath('//*[@id="js-category-content"]/div[2]/div/section/div[1]/div[2]/div/div[2]/div/div[2]/button[6]/span/span[2]/text()')[0].strip()
-                year_5 = tree.xpath('//*[@id="js-category-content"]/div[2]/div/section/div[1]/div[2]/div/div[2]/div/div[2]/button[7]/span/span[2]/text()')[0].strip()
-                all_time = tree.xpath('//*[@id="js-category-content"]/div[2]/div/section/div[1]/div[2]/div/div[2]/div/div[2]/button[8]/span/span[2]/text()')[0].strip()
-            except IndexError:
-                day_1 = tree.xpath('//button[span/span[text()="1 day"]]/span/span[@class="change-tEo1hPMj"]/text()')[0].strip()
-                day_5 = tree.xpath('//button[span/span[text()="5 days"]]/span/span[@class="change-tEo1hPMj"]/text()')[0].strip()
-                month_1 = tree.xpath('//button[span/span[text()="1 month"]]/span/span[@class="change-tEo1hPMj"]/text()')[0].strip()
-                month_6 = tree.xpath('//button[span/span[text()="6 months"]]/span/span[@class="change-tEo1hPMj"]/text()')[0].strip()
-                ytd = tree.xpath('//button[span/span[text()="Year to date"]]/span/span[@class="change-tEo1hPMj"]/text()')[0].strip()
-                year_1 = tree.xpath('//button[span/span[text()="1 year"]]/span/span[@class="change-tEo1hPMj"]/text()')[0].strip()
-                year_5 = tree.xpath('//button[span/span[text()="5 years"]]/span/span[@class="change-tEo1hPMj"]/text()')[0].strip()
-                all_time = tree.xpath('//button[span/span[text()="All time"]]/span/span[@class="change-tEo1hPMj"]/text()')[0].strip()
-
-            return {"1 Day": day_1, "5 Days": day_5, "1 Month": month_1, "6 Month": month_6, "YTD": ytd, "1 Year": year_1, "5 Year": year_5, "All Time": all_time}
-        else:
-            return {"1 Day": "N/A", "5 Days": "N/A", "1 Month": "N/A", "6 Month": "N/A", "YTD": "N/A", "1 Year": "N/A", "5 Year": "N/A", "All Time": "N/A"}
-    except Exception as e:
-        return {"1 Day": "N/A", "5 Days": "N/A", "1 Month": "N/A", "6 Month": "N/A", "YTD": "N/A", "1 Year": "N/A", "5 Year": "N/A", "All Time": "N/A"}
+        return yf.Ticker(ticker).info.get("longName", "N/A")
+    except Exception:
+        return "N/A"
 
 # Streamlit App
 st.title("Stock and ETF Dashboard")
 
 # Input tickers
-tickers = st.text_input("Enter tickers separated by commas").split(',')
+tickers = [ticker.strip() for ticker in st.text_input("Enter tickers separated by commas").split(',') if ticker.strip()]
 
-# Fetch data for each ticker
+# Fetch data for every ticker at once
 if tickers:
-    data = []
-    for ticker in tickers:
-        ticker = ticker.strip()
-        if ticker:
-            stock_info = get_stock_data(ticker)
-            stock_info["Name"] = yf.Ticker(ticker).info.get("longName", "N/A")
+    # TradingView pages and names load while the dividend pages are fetched
+    performance_pages = {ticker: cache.submit(f"https://www.tradingview.com/symbols/{ticker}/") for ticker in tickers}
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        names = {ticker: executor.submit(get_name, ticker) for ticker in tickers}
+        dividend_pages = fetch_dividend_pages(tickers)
+
+        data = []
+        extractions = []
+        for ticker in tickers:
+            dividend = get_stock_data(dividend_pages[ticker])
+            stock_info = {"Ticker": ticker, **dividend.row()}
+            stock_info["Name"] = names[ticker].result()
             data.append(stock_info)
+            extractions.append((ticker, dividend))
 
     df = pd.DataFrame(data, columns=["Name", "Ticker", "Price", "Yield %", "Annual Dividend", "Ex Dividend Date", "Frequency", "Dividend Growth %"])
 
     # Get additional data for each ticker
-    additional_data = [get_additional_stock_data(ticker) for ticker in df["Ticker"]]
+    additional_data = []
+    for ticker in df["Ticker"]:
+        performance = get_additional_stock_data(response_of(performance_pages[ticker]))
+        additional_data.append(performance.row())
+        extractions.append((ticker, performance))
     additional_df = pd.DataFrame(additional_data)
 
     # Combine main data and additional data
@@ -100,6 +87,24 @@ if tickers:
     # Display DataFrame
     st.write(df)
 
+    # Say why any cell shows N/A, so a changed page layout is not mistaken for missing data
+    problems = [
+        {"Ticker": ticker, "Source": extracted.profile, "Problem": extracted.summary()}
+        for ticker, extracted in extractions
+        if not extracted.ok
+    ]
+    if problems:
+        st.warning(f"{len(problems)} page(s) could not be read in full. Cells marked N/A are explained below.")
+        st.dataframe(pd.DataFrame(problems), hide_index=True)
+
+    # Show how much upstream traffic the cache saved
+    stats = cache.stats
+    st.caption(
+        f"Response cache: {stats['hits']} fresh hits, {stats['stale']} stale served while refreshing, "
+        f"{stats['misses']} misses, {stats['revalidated']} revalidated unchanged, "
+        f"{stats['bytes_saved'] / 1024**2:.1f} MB not downloaded"
+    )
+
 # Adjust the width and height of the page and ensure table fits the data
 st.markdown(
     """
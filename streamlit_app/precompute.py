@@ -0,0 +1,178 @@
+# Imports
+import argparse
+import datetime as dt
+import json
+import os
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Import the local stores, pipeline, watch-lists and shared worker pool
+import bar_store
+import forecast_pipeline
+import forecast_store
+import watchlists
+import worker_pool
+
+# Location of the nightly checkpoints, one per day
+CHECKPOINT_DIR = forecast_store.STORE_DIR / "checkpoints"
+
+# Forecasting page defaults the nightly run precomputes
+DEFAULT_PARAMS = {"seasonality": 22, "fast": 13, "slow": 39, "horizon": 30}
+
+
+# Function to load the checkpoint of a day, or a fresh one when the day has not started
+def load_checkpoint(day):
+    path = CHECKPOINT_DIR / f"{day.isoformat()}.json"
+    if path.exists():
+        with open(path) as file:
+            return json.load(file)
+    return {"date": day.isoformat(), "tickers": None, "done": {}, "failed": {}, "finished": False}
+
+
+# Function to save a checkpoint atomically, so a crash never leaves half a file
+def save_checkpoint(checkpoint):
+    path = CHECKPOINT_DIR / f"{checkpoint['date']}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w") as file:
+        json.dump(checkpoint, file, indent=2)
+    os.replace(tmp_path, path)
+
+
+# Function to bring one ticker's bars up to date, returning the error instead of raising it
+def _sync(ticker):
+    try:
+        bar_store.get_store().sync(ticker)
+        return None
+    except Exception as exc:
+        return f"{type(exc).__name__}: {exc}"
+
+
+# Function to run and store one ticker's forecast from the page's default start, returning the date of the bars it used
+def _forecast(ticker, params):
+    start_date = forecast_pipeline.default_start_date(ticker)
+    result = forecast_pipeline.run_forecast(ticker, start_date, **params)
+    as_of = result["history"].index[-1].strftime("%Y-%m-%d")
+    key = forecast_pipeline.forecast_key(ticker, start_date, **params)
+    forecast_store.get_store().put(key, as_of, result)
+    return as_of
+
+
+# Function to precompute the forecasting page defaults for every watch-list ticker, resuming the day's checkpoint
+def run_nightly(tickers=None, day=None, max_workers=None, params=None):
+    day = day or dt.date.today()
+    params = {**DEFAULT_PARAMS, **(params or {})}
+    checkpoint = load_checkpoint(day)
+
+    # Resolve the watch-lists once per day, so a resumed run covers the same tickers
+    if tickers is None:
+        tickers = checkpoint["tickers"] or watchlists.all_tickers()
+    checkpoint["tickers"] = list(tickers)
+    checkpoint["finished"] = False
+    save_checkpoint(checkpoint)
+    pending = [ticker for ticker in checkpoint["tickers"] if ticker not in checkpoint["done"]]
+    print(f"{day}: {len(checkpoint['tickers'])} tickers, {len(pending)} left to forecast")
+
+    # Fetch only the missing bars of every ticker, several at a time
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        errors = dict(zip(pending, executor.map(_sync, pending)))
+    for ticker, error in errors.items():
+        if error:
+            checkpoint["failed"][ticker] = error
+    ready = [ticker for ticker in pending if not errors[ticker]]
+
+    # Run the tickers side by side, their fits sharing the process pool, checkpointing each one as it lands
+    max_workers = max_workers or worker_pool.pool_size()
+    worker_pool.get_pool(max_workers)
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(_forecast, ticker, params): ticker for ticker in ready}
+        for count, future in enumerate(as_completed(futures), 1):
+            ticker = futures[future]
+            try:
+                checkpoint["done"][ticker] = future.result()
+                checkpoint["failed"].pop(ticker, None)
+            except Exception as exc:
+                traceback.print_exc()
+                checkpoint["failed"][ticker] = f"{type(exc).__name__}: {exc}"
+            save_checkpoint(checkpoint)
+            print(f"[{count}/{len(ready)}] {ticker} {'failed' if ticker in checkpoint['failed'] else 'done'}")
+
+    # Mark the day finished and drop old results
+    checkpoint["finished"] = True
+    save_checkpoint(checkpoint)
+    forecast_store.get_store().prune()
+    print(
+        f"{day}: {len(checkpoint['done'])} done, {len(checkpoint['failed'])} failed "
+        f"in {time.monotonic() - started:.0f}s"
+    )
+    return checkpoint
+
+
+# Function to sync and precompute only the given tickers, such as those just added to a watch-list,
+# returning the date each one was forecast on and the reason each failed one could not be
+def refresh_tickers(tickers, params=None, max_workers=None, job=None):
+    params = {**DEFAULT_PARAMS, **(params or {})}
+    tickers = list(dict.fromkeys(tickers))
+    done, failed = {}, {}
+
+    # Fetch the bars of every ticker, several at a time
+    if job is not None:
+        job.report("Syncing bars", 0.0)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        errors = dict(zip(tickers, executor.map(_sync, tickers)))
+    failed.update({ticker: error for ticker, error in errors.items() if error})
+    ready = [ticker for ticker in tickers if not errors[ticker]]
+
+    # Forecast them side by side, the MACD indicators being computed inside each run
+    max_workers = max_workers or worker_pool.pool_size()
+    worker_pool.get_pool(max_workers)
+    if job is not None:
+        job.report("Forecasting added tickers", 0.0)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(_forecast, ticker, params): ticker for ticker in ready}
+        for count, future in enumerate(as_completed(futures), 1):
+            ticker = futures[future]
+            try:
+                done[ticker] = future.result()
+            except Exception as exc:
+                failed[ticker] = f"{type(exc).__name__}: {exc}"
+            if job is not None:
+                job.report("Forecasting added tickers", count / len(ready))
+
+    # Return the results and the failures
+    return done, failed
+
+
+# Function to run the nightly precompute every day at a local time, catching up on a missed or crashed run
+def run_scheduler(at="18:00", retry_minutes=15, **kwargs):
+    hour, minute = (int(part) for part in at.split(":"))
+    while True:
+        # Run once the time has passed and the day is not finished
+        now = dt.datetime.now()
+        due = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if now < due or load_checkpoint(now.date())["finished"]:
+            time.sleep(60)
+            continue
+
+        # A failed run, such as the watch-lists being unreachable, is retried later
+        try:
+            run_nightly(day=now.date(), **kwargs)
+        except Exception:
+            traceback.print_exc()
+            time.sleep(retry_minutes * 60)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute the watch-list forecasts every night")
+    parser.add_argument("--at", default="18:00", help="local time of the nightly run, HH:MM")
+    parser.add_argument("--now", action="store_true", help="run once now and exit")
+    parser.add_argument("--tickers", nargs="*", help="tickers to run instead of the watch-lists")
+    parser.add_argument("--workers", type=int, help="tickers forecast side by side")
+    args = parser.parse_args()
+
+    if args.now:
+        run_nightly(tickers=args.tickers, max_workers=args.workers)
+    else:
+        run_scheduler(at=args.at, tickers=args.tickers, max_workers=args.workers)
@@ -0,0 +1,92 @@
+# Imports
+import argparse
+import time
+from pathlib import Path
+
+# Import numpy and pandas
+import numpy as np
+import pandas as pd
+
+# Smoothing weights tried for every series, all in one vectorized pass
+ALPHAS = np.linspace(0.05, 0.95, 19)
+BETAS = np.array([0.0, 0.02, 0.05, 0.1, 0.2, 0.3])
+
+
+# Function to forecast a series with damped-trend exponential smoothing, picking the weights by in-sample error
+def holt_forecast(values, horizon, phi=0.98):
+    # Every (alpha, beta) pair as one column of the grid
+    values = np.asarray(values, dtype=float)
+    alpha, beta = (grid.ravel() for grid in np.meshgrid(ALPHAS, BETAS))
+    level = np.full(alpha.shape, values[0])
+    trend = np.full(alpha.shape, values[1] - values[0] if len(values) > 1 else 0.0)
+    sse = np.zeros(alpha.shape)
+
+    # Error-correction form of the damped trend filter, one step per bar, keeping the fit of the last bar
+    fitted = level + phi * trend
+    for value in values[1:]:
+        fitted = level + phi * trend
+        error = value - fitted
+        sse += error**2
+        level = fitted + alpha * error
+        trend = phi * trend + alpha * beta * error
+
+    # Forecast with the weights that tracked the series best
+    best = np.argmin(sse)
+    damping = np.cumsum(phi ** np.arange(1, horizon + 1))
+    future = level[best] + trend[best] * damping
+
+    # Same layout as the SARIMAX forecast: the last observation's fit followed by horizon steps
+    return np.concatenate([[fitted[best]], future])
+
+
+# Function to forecast many named series, as forecast_engine.fit_many lays them out
+def preview_many(series, horizon):
+    return {name: {"forecast": holt_forecast(values, horizon)} for name, values in series.items()}
+
+
+# Function to compare the preview with the full SARIMAX fit on the last horizon bars of recorded closes
+def benchmark(histories, horizon=30, seasonality=22, fast=13, slow=39):
+    # Imported here so the preview does not pull in the model stack
+    import forecast_engine
+    import indicators
+
+    rows = []
+    for ticker, close in histories.items():
+        # Close and MACD, with the last horizon bars held out
+        close = pd.Series(close, dtype=float).dropna()
+        macd = indicators.macd_frame(close, fast, slow, 9)["MACD"]
+        train = {"C": close.iloc[:-horizon].to_numpy(), "M": macd.iloc[:-horizon].to_numpy()}
+        actual = {"C": close.iloc[-horizon:].to_numpy(), "M": macd.iloc[-horizon:].to_numpy()}
+
+        # Time both engines on the same training bars
+        started = time.perf_counter()
+        previews = preview_many(train, horizon)
+        preview_seconds = time.perf_counter() - started
+        started = time.perf_counter()
+        fits = forecast_engine.fit_many(train, seasonality=seasonality, horizon=horizon)
+        full_seconds = time.perf_counter() - started
+
+        # Mean absolute error over the held-out bars, skipping the first forecast value, which is in-sample
+        row = {"Ticker": ticker, "Preview Seconds": preview_seconds, "Full Seconds": full_seconds}
+        for name in ("C", "M"):
+            row[f"{name} Preview MAE"] = float(np.mean(np.abs(previews[name]["forecast"][1:] - actual[name])))
+            row[f"{name} Full MAE"] = float(np.mean(np.abs(np.asarray(fits[name]["forecast"])[1:] - actual[name])))
+        rows.append(row)
+
+    # Return one row per ticker
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    import bar_store
+
+    parser = argparse.ArgumentParser(description="Benchmark the preview forecast against the full SARIMAX fit")
+    parser.add_argument("fixture_dir", help="directory of recorded <TICKER>_1d.csv files")
+    parser.add_argument("--bars", type=int, default=252, help="number of most recent bars per series")
+    parser.add_argument("--horizon", type=int, default=30, help="bars held out and forecast")
+    args = parser.parse_args()
+
+    provider = bar_store.FixtureBarProvider(args.fixture_dir)
+    tickers = [path.stem.rsplit("_", 1)[0] for path in sorted(Path(args.fixture_dir).glob("*_1d.csv"))]
+    recorded = {ticker: provider.fetch(ticker, "1d")["Close"].dropna().iloc[-args.bars :] for ticker in tickers}
+    print(benchmark(recorded, horizon=args.horizon).to_string(index=False))
@@ -0,0 +1,177 @@
+# Imports
+import argparse
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Import numpy and pandas
+import numpy as np
+import pandas as pd
+
+# Import the local bar and dividend stores
+import bar_store
+import dividend_store
+
+# Accepted spellings of the holdings columns, compared without case, spaces or punctuation
+HOLDINGS_COLUMNS = {
+    "Ticker": ("ticker", "symbol"),
+    "Average Cost": ("averagecost", "avgcost", "averagecostpershare", "costpershare", "cost"),
+    "Quantity": ("quantity", "qty", "shares"),
+}
+
+
+# Function to read a holdings file with ticker, average cost and quantity columns
+def read_holdings(file):
+    holdings = pd.read_csv(file)
+
+    # Map the file's own column names onto the expected ones
+    found = {re.sub(r"[^a-z]", "", str(column).lower()): column for column in holdings.columns}
+    columns = {}
+    for name, spellings in HOLDINGS_COLUMNS.items():
+        column = next((found[spelling] for spelling in spellings if spelling in found), None)
+        if column is None:
+            raise ValueError(f"Holdings file needs a {name} column, got {list(holdings.columns)}")
+        columns[column] = name
+    holdings = holdings[list(columns)].rename(columns=columns)
+
+    # Clean the values, dropping rows that cannot be a position
+    holdings["Ticker"] = holdings["Ticker"].astype(str).str.strip().str.upper()
+    holdings["Average Cost"] = pd.to_numeric(holdings["Average Cost"], errors="coerce")
+    holdings["Quantity"] = pd.to_numeric(holdings["Quantity"], errors="coerce")
+    holdings = holdings.dropna()
+    return holdings[(holdings["Ticker"] != "") & (holdings["Quantity"] > 0)].reset_index(drop=True)
+
+
+# Function to compute the monthly log returns of one ticker from its stored bars
+def _monthly_returns(ticker, years):
+    bars = bar_store.get_store().get_period(ticker, f"{years}y", sync=False)
+    close = bars["Close"].dropna()
+    monthly = close.groupby([close.index.year, close.index.month]).last()
+    return pd.Series(np.diff(np.log(monthly.to_numpy())), index=monthly.index[1:])
+
+
+# Function to load every ticker's price, dividends and monthly returns from the local stores
+def load_market(tickers, years=5, max_workers=8):
+    # The dividend store syncs the bars of every ticker side by side, then summarises their dividends together
+    table, errors = dividend_store.get_store().metrics(tickers, max_workers=max_workers)
+    table = table[table["Price"].notna() & ~table.index.isin(list(errors))]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        returns = dict(zip(table.index, executor.map(lambda ticker: _monthly_returns(ticker, years), table.index)))
+
+    # The fields the simulation reads, by ticker
+    markets = {
+        ticker: {
+            "Price": row["Price"],
+            "Annual Dividend": row["TTM Dividend"],
+            "Frequency": row["Frequency"],
+            "Payment": row["Last Payment"],
+            "Months Since Payment": 0.0 if pd.isna(row["Months Since Payment"]) else row["Months Since Payment"],
+            "Dividend Volatility": row["Payment Volatility"],
+            "Monthly Returns": returns[ticker],
+        }
+        for ticker, row in table.iterrows()
+    }
+    return markets, errors
+
+
+# Function to turn recovery months of many paths into quantiles, keeping unrecovered paths at infinity
+def _quantiles(months, quantiles):
+    return np.quantile(months, quantiles, axis=0, method="higher")
+
+
+# Function to simulate every position over many price and dividend paths at once
+def simulate(holdings, markets, paths=2000, horizon_months=120, quantiles=(0.1, 0.5, 0.9), seed=None):
+    rng = np.random.default_rng(seed)
+    holdings = holdings[holdings["Ticker"].isin(list(markets))].reset_index(drop=True)
+    if holdings.empty:
+        raise ValueError("No holdings have market data to simulate")
+    tickers = holdings["Ticker"].tolist()
+    market = pd.DataFrame([markets[ticker] for ticker in tickers], index=holdings.index)
+    quantity = holdings["Quantity"].to_numpy(dtype=float)
+    cost = holdings["Average Cost"].to_numpy(dtype=float)
+
+    # Whole historical months are resampled for every position together, which keeps their co-movement.
+    # Each position's returns are centred, so like the single position calculator the typical price stays flat.
+    returns = pd.concat(list(market["Monthly Returns"]), axis=1, keys=range(len(tickers))).dropna(how="all")
+    # Stored as months x positions growth factors, so drawing a month per path copies whole rows
+    growth = np.exp((returns - returns.mean()).fillna(0.0).to_numpy())
+    if len(growth) == 0:
+        growth = np.ones((1, len(tickers)))
+
+    # Payments fall every 12 / frequency months, the next one a full interval after the last one paid
+    interval = np.where(market["Frequency"] > 0, 12 / market["Frequency"].clip(lower=1), np.inf)
+    next_payment = np.maximum(interval - market["Months Since Payment"].to_numpy(), 1.0)
+    volatility = market["Dividend Volatility"].to_numpy()
+
+    # Paths x positions state: price, dividend per payment, dividends received per share, and recovery month
+    price = np.tile(market["Price"].to_numpy(), (paths, 1))
+    payment = np.tile(market["Payment"].to_numpy(), (paths, 1))
+    received = np.zeros_like(price)
+    recovered = np.where(price >= cost, 0.0, np.inf)
+    portfolio_cost = float(cost @ quantity)
+    portfolio = np.where(price @ quantity >= portfolio_cost, 0.0, np.inf)
+
+    for month in range(1, horizon_months + 1):
+        # One historical month per path moves every price
+        price *= growth[rng.integers(len(growth), size=paths)]
+
+        # Positions with a payment due this month receive it, its size drifting by the historical changes
+        due = np.flatnonzero(month >= next_payment)
+        if len(due):
+            shock = volatility[due] * rng.standard_normal((paths, len(due)))
+            payment[:, due] *= np.exp(shock - volatility[due] ** 2 / 2)
+            received[:, due] += payment[:, due]
+            next_payment[due] += interval[due]
+
+        # A position recovers once its price plus the dividends received covers its cost, the portfolio once its total does
+        value = price + received
+        recovered[np.isinf(recovered) & (value >= cost)] = month
+        portfolio[np.isinf(portfolio) & (value @ quantity >= portfolio_cost)] = month
+
+    # Per-position summary, with the constant price and dividend answer of the single position calculator
+    loss = ((cost - market["Price"]) * holdings["Quantity"]).clip(lower=0)
+    annual = market["Annual Dividend"] * holdings["Quantity"]
+    positions = holdings.assign(
+        **{
+            "Price": market["Price"],
+            "Annual Dividend": market["Annual Dividend"],
+            "Loss": loss,
+            "Constant Months": np.where(loss > 0, loss / (annual / 12).where(annual > 0), 0.0),
+            "Recovered Share": np.isfinite(recovered).mean(axis=0),
+        }
+    )
+    for quantile, months in zip(quantiles, _quantiles(recovered, quantiles)):
+        positions[f"Months {quantile:.0%}"] = months
+
+    # Portfolio recovery month of every path, infinite when it does not recover within the horizon
+    return positions, portfolio
+
+
+# Function to summarise the portfolio recovery months as the share of paths recovered by each year
+def portfolio_summary(portfolio, horizon_months=120):
+    years = range(1, horizon_months // 12 + 1)
+    return pd.DataFrame(
+        {"Years": list(years), "Recovered Share": [float((portfolio <= 12 * year).mean()) for year in years]}
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate dividend recovery for a holdings file")
+    parser.add_argument("holdings", help="CSV with ticker, average cost and quantity columns")
+    parser.add_argument("--fixtures", help="replay bars from this directory of <TICKER>_1d.csv files")
+    parser.add_argument("--paths", type=int, default=2000, help="paths per position")
+    parser.add_argument("--horizon", type=int, default=120, help="months simulated")
+    args = parser.parse_args()
+
+    if args.fixtures:
+        bar_store._default_store = bar_store.BarStore(bar_store.FixtureBarProvider(args.fixtures))
+    holdings = read_holdings(args.holdings)
+    started = time.perf_counter()
+    markets, errors = load_market(holdings["Ticker"])
+    loaded = time.perf_counter()
+    positions, portfolio = simulate(holdings, markets, paths=args.paths, horizon_months=args.horizon)
+    simulated = time.perf_counter()
+
+    print(positions.drop(columns=["Average Cost"]).head(20).to_string(index=False))
+    print(portfolio_summary(portfolio, args.horizon).to_string(index=False))
+    print(f"{len(positions)} positions, {len(errors)} failed: loaded in {loaded - started:.1f}s, simulated in {simulated - loaded:.1f}s")
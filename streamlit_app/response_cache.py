@@ -0,0 +1,239 @@
+# Imports
+import hashlib
+import os
+import pickle
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from urllib.parse import urlsplit
+
+# Import the shared HTTP client
+import http_client
+
+# Location of the cached responses
+CACHE_DIR = Path.cwd() / "data" / "http"
+
+# Seconds a response stays fresh for each host, the default covering any host not listed
+SOURCE_TTLS = {
+    "default": 3600,
+    "stockanalysis.com": 24 * 3600,
+    "www.tradingview.com": 6 * 3600,
+}
+
+# Statuses worth keeping, a missing page included so the ETF-then-stock lookup does not repeat the miss
+CACHED_STATUSES = {200, 404}
+
+
+# Response served from the cache, with the attributes the pages read from a requests response
+class CachedResponse:
+    def __init__(self, url, status_code, content, headers, fetched_at):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+        self.fetched_at = fetched_at
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", errors="replace")
+
+
+# Disk cache of responses and of the records parsed from them, revalidated with ETag and Last-Modified
+class ResponseCache:
+    def __init__(
+        self, root=CACHE_DIR, ttls=None, stale_seconds=7 * 24 * 3600, max_bytes=64 * 1024**2, evict_every=50, client=None
+    ):
+        self.root = Path(root)
+        self.ttls = {**SOURCE_TTLS, **(ttls or {})}
+        # Past its time to live, a response is still served this long while a refresh runs in the background
+        self.stale_seconds = stale_seconds
+        self.max_bytes = max_bytes
+        # Listing the directory costs more than a write, so the budget is checked once every evict_every writes
+        self.evict_every = evict_every
+        self.client = client
+        self.stats = {"hits": 0, "misses": 0, "stale": 0, "revalidated": 0, "refreshed": 0, "parsed": 0, "bytes_saved": 0}
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    # Path of the file holding one URL
+    def path(self, url):
+        return self.root / f"{hashlib.sha1(url.encode()).hexdigest()[:20]}.pkl"
+
+    # Time to live of a URL's host
+    def ttl(self, url):
+        return self.ttls.get(urlsplit(url).hostname or "", self.ttls["default"])
+
+    # Count a statistic under the lock, as background refreshes update them too
+    def _count(self, name, amount=1):
+        with self._lock:
+            self.stats[name] += amount
+
+    # Read the entry of a URL, or None when it is missing or unreadable
+    def _read(self, url):
+        try:
+            with open(self.path(url), "rb") as file:
+                entry = pickle.load(file)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        return entry if entry["url"] == url else None
+
+    # Write an entry atomically and bring the cache back inside its size budget every evict_every writes
+    def _write(self, entry):
+        path = self.path(entry["url"])
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "wb") as file:
+            pickle.dump(entry, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._writes += 1
+            due = self._writes % self.evict_every == 0
+        if due:
+            self.evict()
+
+    # Conditional request headers from the validators the server sent last time
+    def _validators(self, entry):
+        headers = {}
+        if entry is not None and entry["headers"].get("ETag"):
+            headers["If-None-Match"] = entry["headers"]["ETag"]
+        if entry is not None and entry["headers"].get("Last-Modified"):
+            headers["If-Modified-Since"] = entry["headers"]["Last-Modified"]
+        return headers
+
+    # Store a fresh response, or extend the entry it confirmed unchanged, and return the entry to serve
+    def _store(self, url, entry, response):
+        # Unchanged upstream: keep the body and the records parsed from it
+        if response.status_code == 304 and entry is not None:
+            self._count("revalidated")
+            entry = {**entry, "fetched_at": time.time()}
+            self._write(entry)
+            return entry
+
+        # New body: the old parsed records no longer apply
+        headers = {name: response.headers[name] for name in ("ETag", "Last-Modified") if name in response.headers}
+        fresh = {
+            "url": url,
+            "status_code": response.status_code,
+            "content": response.content,
+            "headers": headers,
+            "fetched_at": time.time(),
+            "records": {},
+        }
+        if response.status_code in CACHED_STATUSES:
+            self._write(fresh)
+        return fresh
+
+    # Response served from an entry
+    def _response(self, entry):
+        return CachedResponse(entry["url"], entry["status_code"], entry["content"], entry["headers"], entry["fetched_at"])
+
+    # Start fetching a URL, conditionally when an old entry exists, and return a future of the response to serve
+    def _fetch(self, url, entry):
+        client = self.client or http_client.get_client()
+        upstream = client.submit(url, self._validators(entry))
+        future = Future()
+
+        def land(done):
+            try:
+                # With no stored body to keep, a 304 is a miss, so the body is asked for once more past any cache
+                response = done.result()
+                if response.status_code == 304 and entry is None and done is upstream:
+                    client.submit(url, {"Cache-Control": "no-cache"}).add_done_callback(land)
+                    return
+                future.set_result(self._response(self._store(url, entry, response)))
+            except Exception as exc:
+                # A failed refresh still serves the old entry when there is one
+                if entry is not None:
+                    future.set_result(self._response(entry))
+                else:
+                    future.set_exception(exc)
+
+        upstream.add_done_callback(land)
+        return future
+
+    # Return a future of the response for a URL: at once when cached, stale ones refreshed in the background
+    def submit(self, url):
+        entry = self._read(url)
+        age = time.time() - entry["fetched_at"] if entry is not None else None
+
+        # Fresh enough to serve
+        if entry is not None and age < self.ttl(url):
+            self._count("hits")
+            self._count("bytes_saved", len(entry["content"]))
+            future = Future()
+            future.set_result(self._response(entry))
+            return future
+
+        # Stale but usable: serve it now and refresh it behind the page
+        if entry is not None and age < self.ttl(url) + self.stale_seconds:
+            self._count("stale")
+            self._count("bytes_saved", len(entry["content"]))
+            self._fetch(url, entry).add_done_callback(lambda done: self._refreshed(entry, done.result()))
+            future = Future()
+            future.set_result(self._response(entry))
+            return future
+
+        # Missing or too old to show
+        self._count("misses")
+        return self._fetch(url, entry)
+
+    # Count a background refresh only when it stored a newer entry, not when it fell back to the old one
+    def _refreshed(self, entry, response):
+        if response.fetched_at > entry["fetched_at"] and response.status_code in CACHED_STATUSES:
+            self._count("refreshed")
+
+    # Fetch a URL through the cache and wait for the response
+    def get(self, url):
+        return self.submit(url).result()
+
+    # Return the record a parser makes from a cached response, parsing each stored body only once per parser
+    def parsed(self, response, name, parse):
+        entry = self._read(response.url)
+        if entry is not None and entry["fetched_at"] == response.fetched_at and name in entry["records"]:
+            self._count("parsed")
+            return entry["records"][name]
+
+        # Parse and keep the record next to the body it came from, unless the body changed meanwhile
+        record = parse(response)
+        if entry is not None and entry["fetched_at"] == response.fetched_at:
+            entry["records"][name] = record
+            self._write(entry)
+        return record
+
+    # Delete the least recently written entries until the cache fits its budget
+    def evict(self):
+        # List the entries from oldest to newest
+        entries = []
+        for path in self.root.glob("*.pkl"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        # Remove the oldest until the total size is under budget
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+
+# Shared cache used by the pages
+_default_cache = None
+_default_cache_guard = threading.Lock()
+
+
+# Function to fetch the shared cache
+def get_cache():
+    # Create the cache on first use
+    global _default_cache
+    with _default_cache_guard:
+        if _default_cache is None:
+            _default_cache = ResponseCache()
+
+    # Return the cache
+    return _default_cache
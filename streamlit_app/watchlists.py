@@ -0,0 +1,188 @@
+# Imports
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+# Import the shared HTTP client
+import http_client
+
+# Location of the last known membership of every list
+STATE_PATH = Path.cwd() / "data" / "watchlists" / "state.json"
+
+# TradingView watch-lists the pages follow
+WATCHLISTS = {
+    "Red": "https://www.tradingview.com/watchlists/139248623/",
+    "Banks": "https://www.tradingview.com/watchlists/158296099/",
+    "Red List 2": "https://www.tradingview.com/watchlists/158248037/",
+}
+
+
+# Function to cut the raw symbol array out of a watch-list page, or None when the page has none
+def symbols_slice(html):
+    start = html.find('"symbols":[')
+    if start == -1:
+        return None
+    start += len('"symbols":[')
+    end = html.find("]", start)
+    return html[start:end]
+
+
+# Function to read the symbols out of a watch-list page
+def parse_symbols(html):
+    symbols_str = symbols_slice(html)
+    if symbols_str is None:
+        return []
+    return [symbol.strip('"') for symbol in symbols_str.split(",") if symbol.strip('"')]
+
+
+# Function to fingerprint a list by its symbol array alone, so the rest of the page changing does not count
+def fingerprint(symbols_str):
+    return hashlib.sha1((symbols_str or "").encode()).hexdigest()
+
+
+# Function to drop the exchange prefix, so "NASDAQ:AAPL" becomes "AAPL"
+def clean_tickers(tickers):
+    return [ticker.split(":")[1] if ":" in ticker else ticker for ticker in tickers]
+
+
+# Function to download the symbols of a watch-list page
+def fetch_tickers(url):
+    response = http_client.get_client().get(url)
+    response.raise_for_status()
+    return parse_symbols(response.text)
+
+
+# Last known membership of every list, brought up to date with one conditional request per list
+class WatchlistSync:
+    def __init__(self, path=STATE_PATH, client=None):
+        self.path = Path(path)
+        self.client = client
+        self._lock = threading.Lock()
+
+    # Read the stored state, one entry per list name
+    def load(self):
+        if not self.path.exists():
+            return {}
+        with open(self.path) as file:
+            return json.load(file)
+
+    # Save the state atomically, so a crash never leaves half a file
+    def save(self, state):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w") as file:
+            json.dump(state, file, indent=2)
+        os.replace(tmp_path, self.path)
+
+    # Conditional request headers from the validators the server sent last time
+    def _validators(self, entry):
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    # Bring the named lists up to date and return what changed in each, and the reason each failed list could not be checked.
+    # Lists checked less than max_age seconds ago are answered from the stored state without a request.
+    def sync(self, names=None, max_age=0):
+        names = names or list(WATCHLISTS)
+        client = self.client or http_client.get_client()
+        with self._lock:
+            state = self.load()
+            now = time.time()
+
+            # One request per list that is due, all at once, conditional on what was seen last time
+            due = [name for name in names if now - state.get(name, {}).get("checked_at", 0) >= max_age]
+            futures = {name: client.submit(WATCHLISTS[name], self._validators(state.get(name, {}))) for name in due}
+
+            deltas, errors = {}, {}
+            for name in names:
+                entry = state.get(name)
+                previous = entry["symbols"] if entry else None
+                delta = {"symbols": previous or [], "added": [], "removed": [], "changed": False, "first": entry is None}
+                deltas[name] = delta
+                if name not in futures:
+                    continue
+
+                # A failed list keeps its stored membership
+                try:
+                    response = futures[name].result()
+                    if response.status_code != 304:
+                        response.raise_for_status()
+                except Exception as exc:
+                    errors[name] = f"{type(exc).__name__}: {exc}"
+                    continue
+                entry = {**(entry or {}), "checked_at": now}
+                state[name] = entry
+
+                # Unchanged page, or a changed page with the same symbols: nothing downstream to do
+                if response.status_code == 304:
+                    continue
+                entry["etag"] = response.headers.get("ETag")
+                entry["last_modified"] = response.headers.get("Last-Modified")
+                symbols_str = symbols_slice(response.text)
+                if previous is not None and fingerprint(symbols_str) == entry.get("fingerprint"):
+                    continue
+
+                # New membership, and the symbols that came and went
+                symbols = clean_tickers(parse_symbols(response.text))
+                entry["fingerprint"] = fingerprint(symbols_str)
+                entry["symbols"] = symbols
+                entry["changed_at"] = now
+                known = set(previous or [])
+                current = set(symbols)
+                delta.update(
+                    symbols=symbols,
+                    added=[ticker for ticker in symbols if ticker not in known],
+                    removed=[ticker for ticker in (previous or []) if ticker not in current],
+                    changed=True,
+                )
+
+            # Save the state once for every list checked
+            if due:
+                self.save(state)
+        return deltas, errors
+
+
+# Shared sync used by the pages and the nightly run
+_default_sync = None
+_default_sync_guard = threading.Lock()
+
+
+# Function to fetch the shared sync
+def get_sync():
+    # Create the sync on first use
+    global _default_sync
+    with _default_sync_guard:
+        if _default_sync is None:
+            _default_sync = WatchlistSync()
+
+    # Return the sync
+    return _default_sync
+
+
+# Function to list the tickers newly added to lists that were already known, in the order first seen.
+# A list seen for the first time is left to the nightly run rather than recomputed all at once.
+def added_tickers(deltas):
+    tickers = [ticker for delta in deltas.values() if not delta["first"] for ticker in delta["added"]]
+    return list(dict.fromkeys(tickers))
+
+
+# Function to resolve watch-lists by name into their cleaned tickers, checking every list at once.
+# A list that cannot be checked falls back to its stored membership, and only fails when it has none.
+def resolve(names=None, max_age=0):
+    deltas, errors = get_sync().sync(names, max_age=max_age)
+    unknown = {name: error for name, error in errors.items() if deltas[name]["first"]}
+    if unknown:
+        raise RuntimeError("; ".join(f"{name}: {error}" for name, error in unknown.items()))
+    return {name: delta["symbols"] for name, delta in deltas.items()}
+
+
+# Function to list every ticker on the watch-lists once, in the order first seen
+def all_tickers(names=None):
+    tickers = [ticker for listed in resolve(names).values() for ticker in listed]
+    return list(dict.fromkeys(tickers))
@@ -0,0 +1,42 @@
+# Imports
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+# Shared pool of worker processes, created on first use
+_pool = None
+_pool_size = 0
+_pool_guard = threading.Lock()
+
+
+# Function to keep each worker on a single BLAS thread so the fits do not fight over cores
+def _init_worker():
+    try:
+        from threadpoolctl import threadpool_limits
+
+        threadpool_limits(1)
+    except ImportError:
+        pass
+
+
+# Function to fetch the shared process pool
+def get_pool(max_workers=None):
+    # Size the pool to the machine unless told otherwise
+    global _pool, _pool_size
+    max_workers = max_workers or os.cpu_count() or 1
+
+    # Replace the pool when a larger one is requested, one session at a time so no pool is created twice
+    with _pool_guard:
+        if _pool is None or _pool_size < max_workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker)
+            _pool_size = max_workers
+
+        # Return the pool
+        return _pool
+
+
+# Function to fetch the number of workers in the shared pool
+def pool_size():
+    return _pool_size or os.cpu_count() or 1
@@ -0,0 +1,65 @@
+# Imports
+import sys
+from pathlib import Path
+
+# Import numpy, pandas and pytest
+import numpy as np
+import pandas as pd
+import pytest
+
+# The app modules import each other by bare name, as Streamlit runs them from streamlit_app
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "streamlit_app"))
+
+import bar_store  # noqa: E402
+
+
+# Provider that serves bars held in memory, so recordings can be made without the network
+class MemoryBarProvider:
+    def __init__(self, bars):
+        self.bars = bars
+
+    def fetch(self, ticker, interval, start=None):
+        bars = self.bars[ticker]
+        return bars if start is None else bars.loc[start:]
+
+
+# Function to build daily bars in New York time with a random walk close, and dividends on the given dates
+def make_bars(days=300, start="2024-01-02", seed=0, dividends=None):
+    index = pd.bdate_range(start, periods=days, tz="America/New_York", name="Date")
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, days)))
+    bars = pd.DataFrame(
+        {
+            "Open": close,
+            "High": close * 1.01,
+            "Low": close * 0.99,
+            "Close": close,
+            "Volume": 1_000_000.0,
+            "Dividends": 0.0,
+            "Stock Splits": 0.0,
+        },
+        index=index,
+    )
+    for date, amount in (dividends or {}).items():
+        bars.loc[bars.index[bars.index.normalize() >= pd.Timestamp(date, tz=index.tz)][0], "Dividends"] = amount
+    return bars
+
+
+# Function to record in-memory bars as CSV fixtures and return a provider replaying them
+def record(fixture_dir, bars_by_ticker):
+    provider = MemoryBarProvider(bars_by_ticker)
+    for ticker in bars_by_ticker:
+        bar_store.record_fixture(ticker, fixture_dir, provider=provider)
+    return bar_store.FixtureBarProvider(fixture_dir)
+
+
+# Bar store over an empty directory, and the shared store pointed at it for the duration of a test
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    def build(bars_by_ticker):
+        provider = record(tmp_path / "fixtures", bars_by_ticker)
+        bars = bar_store.BarStore(provider, root=tmp_path / "bars")
+        monkeypatch.setattr(bar_store, "_default_store", bars)
+        return bars
+
+    return build
@@ -0,0 +1,40 @@
+# Import numpy and pytest
+import numpy as np
+import pytest
+
+# Import the required libraries
+from statsmodels.tsa.ar_model import AutoReg
+
+# Import the module under test
+import autoreg
+
+
+def walk(length, seed):
+    return 100 + np.cumsum(np.random.default_rng(seed).normal(0, 1, length))
+
+
+def test_fit_batch_matches_statsmodels():
+    values = np.stack([walk(120, seed) for seed in range(3)])
+    const, coefs = autoreg.fit_batch(values, 5)
+    for row, c, lag_coefs in zip(values, const, coefs):
+        params = AutoReg(row, lags=5).fit().params
+        np.testing.assert_allclose([c, *lag_coefs], params, rtol=1e-8, atol=1e-8)
+
+
+def test_fit_predict_many_matches_statsmodels_dynamic_forecast():
+    # Series of two lengths, each with its own number of steps
+    trains = {"A": walk(120, 0), "B": walk(120, 1), "C": walk(90, 2)}
+    steps = {"A": 15, "B": 7, "C": 10}
+    forecasts = autoreg.fit_predict_many(trains, 5, steps, chunk_size=1)
+
+    # Forecast from the last observation on, as helper.generate_stock_prediction did with AutoReg
+    for name, train in trains.items():
+        results = AutoReg(train, lags=5).fit()
+        expected = results.predict(start=len(train) - 1, end=len(train) + steps[name] - 2, dynamic=True)
+        assert len(forecasts[name]) == steps[name]
+        np.testing.assert_allclose(forecasts[name], expected, rtol=1e-8)
+
+
+def test_fit_batch_needs_more_observations_than_unknowns():
+    with pytest.raises(ValueError, match="needs more than 11 observations"):
+        autoreg.fit_batch(walk(10, 0), 5)
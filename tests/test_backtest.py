@@ -0,0 +1,100 @@
+# Import numpy and pandas
+import numpy as np
+import pandas as pd
+import pytest
+
+# Import the modules under test
+import backtest
+import worker_pool
+
+RANDOM_WALK = (0, 1, 0)
+NO_SEASON = (0, 0, 0, 0)
+FIT = backtest._fit
+
+
+def walk(length=200, seed=0):
+    return 100 + np.cumsum(np.random.default_rng(seed).normal(0, 1, length))
+
+
+def test_origins_are_spread_between_the_smallest_window_and_the_last_full_horizon():
+    assert backtest.plan_origins(200, horizon=20, origins=5) == [100, 120, 140, 160, 180]
+    assert backtest.plan_origins(200, horizon=20, origins=5, min_train=60) == [60, 90, 120, 150, 180]
+    with pytest.raises(ValueError, match="Not enough bars"):
+        backtest.plan_origins(40, horizon=30, origins=5)
+
+
+def test_random_walk_scores_match_the_last_value_forecast():
+    values = walk()
+    per_origin, aggregate = backtest.walk_forward(values, RANDOM_WALK, NO_SEASON, horizon=10, origins=4)
+    assert list(per_origin["Origin"]) == backtest.plan_origins(200, horizon=10, origins=4)
+
+    # A driftless random walk forecasts its last value at every step
+    for row in per_origin.itertuples():
+        errors = values[row.Origin : row.Origin + 10] - values[row.Origin - 1]
+        assert row.RMSE == pytest.approx(np.sqrt(np.mean(errors**2)))
+        assert row.MAPE == pytest.approx(np.mean(np.abs(errors / values[row.Origin : row.Origin + 10])) * 100)
+    assert (per_origin["Hit Rate"] == 0.0).all()
+    assert aggregate["Origins"] == 4
+    assert aggregate["RMSE"] == pytest.approx(np.sqrt((per_origin["RMSE"] ** 2).mean()))
+
+
+def test_dated_series_label_origins_with_their_dates():
+    series = pd.Series(walk(), index=pd.bdate_range("2024-01-02", periods=200))
+    per_origin, _ = backtest.walk_forward(series, RANDOM_WALK, NO_SEASON, horizon=10, origins=3)
+    assert list(per_origin["Origin"]) == list(series.index[backtest.plan_origins(200, horizon=10, origins=3)])
+
+
+@pytest.mark.parametrize("window", ["expanding", "sliding"])
+def test_refitting_every_origin_fits_each_training_window_afresh(window):
+    values = walk(150, seed=4)
+    per_origin, _ = backtest.walk_forward(
+        values, (1, 0, 0), NO_SEASON, horizon=5, origins=[80, 100, 120], window=window, window_size=40, refit_every=1
+    )
+    for row in per_origin.itertuples():
+        start = row.Origin - 40 if window == "sliding" else 0
+        forecast = backtest._fit(values[start : row.Origin], (1, 0, 0), NO_SEASON).forecast(5)
+        assert row.RMSE == pytest.approx(np.sqrt(np.mean((values[row.Origin : row.Origin + 5] - forecast) ** 2)))
+
+
+# Function to run origins in process, recording the origin each fit was estimated on
+def run(values, origins, chunks, window, refit_every, monkeypatch):
+    fits = []
+
+    def recording(train, order, seasonal_order):
+        fits.append(len(train))
+        return FIT(train, order, seasonal_order)
+
+    monkeypatch.setattr(backtest, "_fit", recording)
+    rows = []
+    for chunk in np.array_split(np.arange(len(origins)), chunks):
+        chunk = chunk.tolist()
+        anchor = origins[chunk[0] - chunk[0] % refit_every if refit_every else 0]
+        rows += backtest._run_origins(
+            values, [origins[p] for p in chunk], chunk, anchor, (1, 0, 0), NO_SEASON, 5, window, 50, refit_every
+        )
+    return pd.DataFrame(rows), fits
+
+
+@pytest.mark.parametrize("window", ["expanding", "sliding"])
+@pytest.mark.parametrize("refit_every", [None, 2])
+def test_refits_and_scores_do_not_depend_on_how_origins_are_split(window, refit_every, monkeypatch):
+    values = walk(150, seed=1)
+    origins = list(range(60, 140, 10))
+    together, fits = run(values, origins, 1, window, refit_every, monkeypatch)
+    for chunks in (2, 3):
+        split, _ = run(values, origins, chunks, window, refit_every, monkeypatch)
+        pd.testing.assert_frame_equal(split, together, rtol=1e-5)
+
+    # Refits land on every refit_every-th origin overall, on everything before it or on the sliding window
+    refit_origins = origins[:: refit_every or len(origins)]
+    expected = [origin if window == "expanding" else 50 for origin in refit_origins]
+    assert fits == expected
+
+
+def test_walk_forward_gives_the_same_scores_for_any_number_of_workers(monkeypatch):
+    values = walk(150, seed=3)
+    results = []
+    for workers in (1, 3):
+        monkeypatch.setattr(worker_pool, "pool_size", lambda workers=workers: workers)
+        results.append(backtest.walk_forward(values, (1, 0, 0), NO_SEASON, horizon=5, origins=6, refit_every=2)[0])
+    pd.testing.assert_frame_equal(results[0], results[1], rtol=1e-5)
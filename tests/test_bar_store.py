@@ -0,0 +1,87 @@
+# Import pandas
+import pandas as pd
+
+# Import the module under test
+import bar_store
+
+from conftest import make_bars
+
+
+# Provider whose history can be changed between syncs, counting how often it is asked for everything
+class ChangingProvider:
+    def __init__(self, bars):
+        self.bars = bars
+        self.full_fetches = 0
+
+    def fetch(self, ticker, interval, start=None):
+        if start is None:
+            self.full_fetches += 1
+            return self.bars
+        return self.bars.loc[start:]
+
+
+def test_sync_appends_only_the_new_tail(tmp_path):
+    bars = make_bars(200)
+    provider = ChangingProvider(bars.iloc[:150])
+    store = bar_store.BarStore(provider, root=tmp_path)
+    store.sync("AAA")
+
+    provider.bars = bars
+    synced = store.sync("AAA", force=True)
+    assert provider.full_fetches == 1
+    pd.testing.assert_frame_equal(synced, bars, check_freq=False)
+
+
+def test_sync_replaces_the_partial_last_bar(tmp_path):
+    bars = make_bars(100)
+    partial = bars.copy()
+    partial.iloc[-1, partial.columns.get_loc("Close")] *= 0.98
+    provider = ChangingProvider(partial)
+    store = bar_store.BarStore(provider, root=tmp_path)
+    store.sync("AAA")
+
+    provider.bars = bars
+    synced = store.sync("AAA", force=True)
+    assert provider.full_fetches == 1
+    assert synced["Close"].iloc[-1] == bars["Close"].iloc[-1]
+
+
+def test_new_dividend_refetches_the_adjusted_history(tmp_path):
+    bars = make_bars(100)
+    provider = ChangingProvider(bars.iloc[:90])
+    store = bar_store.BarStore(provider, root=tmp_path)
+    store.sync("AAA")
+
+    # A dividend on a new bar re-adjusts every earlier close
+    adjusted = bars.copy()
+    adjusted.loc[adjusted.index[:95], ["Open", "High", "Low", "Close"]] *= 0.99
+    adjusted.iloc[95, adjusted.columns.get_loc("Dividends")] = 0.5
+    provider.bars = adjusted
+    synced = store.sync("AAA", force=True)
+    assert provider.full_fetches == 2
+    pd.testing.assert_frame_equal(synced, adjusted, check_freq=False)
+
+
+def test_split_refetches_the_adjusted_history(tmp_path):
+    bars = make_bars(100)
+    provider = ChangingProvider(bars.iloc[:90])
+    store = bar_store.BarStore(provider, root=tmp_path)
+    store.sync("AAA")
+
+    # A split on the last stored bar changes its event column even though the closes overlap
+    split = bars.copy()
+    split.loc[split.index[:89], ["Open", "High", "Low", "Close"]] /= 2
+    split.iloc[89, split.columns.get_loc("Stock Splits")] = 2.0
+    provider.bars = split
+    store.sync("AAA", force=True)
+    assert provider.full_fetches == 2
+
+
+def test_fixture_replay_and_period_slicing(store):
+    bars = make_bars(300)
+    local = store({"AAA": bars})
+    assert len(local.get_period("AAA", "5d")) == 5
+    year = local.get_period("AAA", "1y")
+    assert year.index[0] >= year.index[-1] - pd.DateOffset(years=1)
+    ranged = bar_store.get_bars("AAA", start=bars.index[10].date(), end=bars.index[20].date())
+    assert len(ranged) == 11
@@ -0,0 +1,69 @@
+# Imports
+import datetime as dt
+import json
+
+# Import pandas and pytest
+import pandas as pd
+import pytest
+
+# Import the modules under test
+import batch_forecast
+import bar_store
+import forecast_pipeline
+
+from conftest import MemoryBarProvider, make_bars
+
+TICKERS = ["AAA", "BBB", "CCC", "DDD", "EEE"]
+
+
+# Bars for every ticker, and a stand-in for the SARIMAX run recording the tickers and start dates it was given
+@pytest.fixture
+def calls(tmp_path, monkeypatch):
+    provider = MemoryBarProvider({ticker: make_bars(60, seed=seed) for seed, ticker in enumerate(TICKERS)})
+    monkeypatch.setattr(bar_store, "_default_store", bar_store.BarStore(provider, tmp_path / "bars"))
+    calls = []
+
+    def run_forecast(ticker, start_date, job=None, **params):
+        calls.append((ticker, start_date))
+        if ticker == "CCC":
+            raise ValueError("no fit")
+        history = bar_store.get_bars(ticker)
+        index = pd.bdate_range(history.index[-1].date(), periods=3, name="Date")
+        forecast = pd.DataFrame({column: [1.0, 2.0, 3.0] for column in batch_forecast.FORECAST_COLUMNS}, index=index)
+        return {"history": history, "forecast": forecast, "fits": {"C": {"order": (1, 1, 0)}}}
+
+    monkeypatch.setattr(forecast_pipeline, "run_forecast", run_forecast)
+    return calls
+
+
+def test_batch_writes_one_row_per_step_and_keeps_failures(tmp_path, calls):
+    table = batch_forecast.run_batch(TICKERS, tmp_path / "out", shard_size=2, max_workers=2)
+    assert sorted(ticker for ticker, _ in calls) == TICKERS
+    assert sorted((tmp_path / "out").glob("shard-*.parquet")) == [tmp_path / "out" / f"shard-{n:05d}.parquet" for n in range(3)]
+    assert table.groupby("Ticker").size().to_dict() == {"AAA": 3, "BBB": 3, "CCC": 1, "DDD": 3, "EEE": 3}
+    assert table.loc[table["Ticker"] == "CCC", "Error"].item() == "ValueError: no fit"
+    assert (table.dropna(subset=["Close"])["C Order"] == "(1, 1, 0)").all()
+
+
+def test_resume_on_a_later_day_keeps_the_start_date_and_skips_finished_shards(tmp_path, calls):
+    # A run started yesterday with the default start date, interrupted after its first shard
+    output = tmp_path / "out"
+    started = dt.date.today() - dt.timedelta(days=366)
+    batch_forecast.run_batch(TICKERS[:2], tmp_path / "first", start_date=started, shard_size=2, max_workers=2)
+    output.mkdir()
+    (tmp_path / "first" / "shard-00000.parquet").rename(output / "shard-00000.parquet")
+    params = {"seasonality": 22, "fast": 13, "slow": 39, "horizon": 30}
+    manifest = {"tickers": TICKERS, "start_date": started.isoformat(), "params": params, "shard_size": 2}
+    (output / "manifest.json").write_text(json.dumps(manifest))
+    calls.clear()
+
+    # Resuming without a start date runs only the unfinished tickers, from the manifest's start date
+    table = batch_forecast.run_batch(TICKERS, output, shard_size=2, max_workers=2)
+    assert sorted(calls) == [(ticker, started) for ticker in TICKERS[2:]]
+    assert sorted(table["Ticker"].unique()) == TICKERS
+
+
+def test_resume_with_different_settings_is_refused(tmp_path, calls):
+    batch_forecast.run_batch(TICKERS[:2], tmp_path, shard_size=2, max_workers=2)
+    with pytest.raises(ValueError, match="different batch"):
+        batch_forecast.run_batch(TICKERS[:2], tmp_path, start_date="2020-01-01", shard_size=2, max_workers=2)
@@ -0,0 +1,86 @@
+# Imports
+import datetime as dt
+import threading
+import time
+
+# Import numpy
+import numpy as np
+
+# Import the modules under test
+import coalesce
+import jobs
+
+
+def run(ticker, start_date, seasonality=22, horizon=30, job=None):
+    return ticker
+
+
+def test_equal_runs_written_differently_share_a_key():
+    key = coalesce.canonical_key(run, ("spy", "2025-01-02"), {"seasonality": 22})
+    assert key == coalesce.canonical_key(run, (" SPY ", dt.date(2025, 1, 2)))
+    assert key == coalesce.canonical_key(run, ("SPY", np.datetime64("2025-01-02")), {"horizon": 30.0, "job": object()})
+    assert key == coalesce.canonical_key(run, (), {"ticker": "Spy", "start_date": dt.datetime(2025, 1, 2), "seasonality": np.int64(22)})
+
+
+def test_different_runs_get_different_keys():
+    key = coalesce.canonical_key(run, ("SPY", "2025-01-02"))
+    assert key != coalesce.canonical_key(run, ("QQQ", "2025-01-02"))
+    assert key != coalesce.canonical_key(run, ("SPY", "2025-01-03"))
+    assert key != coalesce.canonical_key(run, ("SPY", "2025-01-02"), {"seasonality": 7})
+
+
+# Stand-in for a job, with the attributes SingleFlight reads
+class Flight:
+    def __init__(self, status="running", finished_at=None):
+        self.status = status
+        self.finished_at = finished_at
+
+    @property
+    def done(self):
+        return self.status in ("done", "failed", "cancelled")
+
+
+def test_single_flight_shares_running_and_fresh_runs_only():
+    flights = coalesce.SingleFlight(ttl=60)
+    first, joined = flights.join("a", Flight)
+    assert not joined
+    assert flights.join("a", Flight) == (first, True)
+
+    # A fresh success is reused, a failure or an expired result starts again
+    first.status, first.finished_at = "done", time.time()
+    assert flights.join("a", Flight) == (first, True)
+    first.finished_at = time.time() - 120
+    assert flights.join("a", Flight)[1] is False
+    failed, _ = flights.join("b", Flight)
+    failed.status, failed.finished_at = "failed", time.time()
+    assert flights.join("b", Flight)[1] is False
+    assert (flights.started, flights.joined) == (4, 2)
+
+    # A forgotten key starts afresh even while its run is still going
+    running, _ = flights.join("c", Flight)
+    flights.forget("c")
+    assert flights.join("c", Flight)[0] is not running
+
+
+def test_job_manager_runs_identical_submissions_once():
+    calls = []
+    release = threading.Event()
+
+    def slow(ticker, start_date, job=None):
+        calls.append(ticker)
+        release.wait(5)
+        return ticker.upper()
+
+    manager = jobs.JobManager(max_workers=2)
+    first = manager.submit("alice", slow, "spy", "2025-01-02")
+    second = manager.submit("bob", slow, "SPY", dt.date(2025, 1, 2))
+    other = manager.submit("bob", slow, "QQQ", "2025-01-02")
+    release.set()
+
+    assert first == second != other
+    job = manager.get(first)
+    job.wait(5)
+    manager.get(other).wait(5)
+    assert job.result == "SPY"
+    assert job.owners == {"alice", "bob"}
+    assert sorted(calls) == ["QQQ", "spy"]
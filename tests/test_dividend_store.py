@@ -0,0 +1,79 @@
+# Imports
+import datetime as dt
+
+# Import numpy and pytest
+import numpy as np
+import pytest
+
+# Import the modules under test
+import bar_store
+import dividend_store
+
+from conftest import MemoryBarProvider, make_bars
+
+
+# Bar store over in-memory bars that always asks the provider, and a dividend store over it
+@pytest.fixture
+def stores(tmp_path, monkeypatch):
+    provider = MemoryBarProvider({})
+    bars = bar_store.BarStore(provider, root=tmp_path / "bars", max_age=dt.timedelta(0))
+    monkeypatch.setattr(bar_store, "_default_store", bars)
+    return provider, dividend_store.DividendStore(root=tmp_path / "dividends")
+
+
+def quarterly(*dates, amount=0.25):
+    return {date: amount for date in dates}
+
+
+def test_quarterly_payer_with_three_payments_in_the_window_stays_quarterly(stores):
+    provider, store = stores
+    provider.bars["NEW"] = make_bars(300, dividends=quarterly("2024-04-10", "2024-07-10", "2024-10-10"))
+    provider.bars["EDGE"] = make_bars(
+        300, dividends=quarterly("2024-02-20", "2024-05-20", "2024-08-20", "2024-11-20")
+    )
+
+    # A first-year payer, and a payer whose oldest payment of the window falls just outside it
+    table, errors = store.metrics(["NEW"])
+    edge, _ = store.metrics(["EDGE"], as_of="2025-02-19")
+    assert errors == {}
+    for row in (table.loc["NEW"], edge.loc["EDGE"]):
+        assert row["TTM Dividend"] == pytest.approx(0.75)
+        assert row["Frequency"] == 4
+        assert row["Forward Dividend"] == pytest.approx(1.0)
+
+
+def test_frequency_follows_the_spacing_of_the_ex_dates(stores):
+    provider, store = stores
+    provider.bars["SEMI"] = make_bars(300, dividends=quarterly("2024-03-01", "2024-09-03"))
+    provider.bars["MONTH"] = make_bars(300, dividends=quarterly(*(f"2024-{month:02d}-15" for month in range(3, 13))))
+    provider.bars["ONCE"] = make_bars(300, dividends=quarterly("2024-12-02"))
+    provider.bars["NONE"] = make_bars(300)
+
+    table, errors = store.metrics(["semi", "MONTH", "ONCE", "NONE"])
+    assert errors == {}
+    assert table["Frequency"].to_dict() == {"SEMI": 2, "MONTH": 12, "ONCE": 1, "NONE": 0}
+    assert table.loc["NONE", "Forward Dividend"] == 0
+
+
+def test_yields_are_taken_on_the_last_close(stores):
+    provider, store = stores
+    provider.bars["AAA"] = make_bars(
+        300, dividends=quarterly("2024-03-01", "2024-06-03", "2024-09-03", "2024-12-02", amount=0.5)
+    )
+
+    row = store.metrics(["AAA"])[0].loc["AAA"]
+    price = provider.bars["AAA"]["Close"].iloc[-1]
+    assert row["Price"] == pytest.approx(price)
+    assert row["TTM Yield %"] == pytest.approx(2.0 / price * 100)
+    assert row["Forward Yield %"] == pytest.approx(2.0 / price * 100)
+    assert np.isnan(row["Dividend Growth %"])
+
+
+def test_metrics_pick_up_new_bars_while_the_events_are_unchanged(stores):
+    provider, store = stores
+    bars = make_bars(300, dividends=quarterly("2024-06-03"))
+    provider.bars["AAA"] = bars.iloc[:290]
+    assert store.metrics(["AAA"])[0].loc["AAA", "Price"] == pytest.approx(bars["Close"].iloc[289])
+
+    provider.bars["AAA"] = bars
+    assert store.metrics(["AAA"])[0].loc["AAA", "Price"] == pytest.approx(bars["Close"].iloc[-1])
@@ -0,0 +1,81 @@
+# Import the module under test
+import extraction
+
+# Labels of the dividend summary, in the order of its positional selectors
+LABELS = ["Dividend Yield", "Annual Dividend", "Ex-Dividend Date", "Payout Frequency", "Payout Ratio", "Dividend Growth"]
+VALUES = ["2.10%", "$1.00", "Mar 3, 2025", "Quarterly", "40%", "5.00%"]
+
+
+# Function to lay out a dividend page the way the positional selectors expect, or redesigned with labelled divs
+def dividend_page(count=6, price="$47.62", redesigned=False):
+    if redesigned:
+        blocks = "".join(f"<div><div>{label}</div><div>{value}</div></div>" for label, value in zip(LABELS, VALUES))
+        main = f'<section><div class="text-4xl">{price}</div></section><section>{blocks}</section>'
+    else:
+        blocks = "".join(f"<div><span>{label}</span><div>{value}</div></div>" for label, value in zip(LABELS[:count], VALUES))
+        main = (
+            f'<div><div></div><div><div><div class="text-4xl">{price}</div></div></div></div>'
+            f"<div><div><div></div><div>{blocks}</div></div></div>"
+        )
+    return f'<html><body><nav>menu</nav><main id="main">{main}</main><footer>end</footer></body></html>'
+
+
+def test_every_field_is_found_by_its_first_selector():
+    result = extraction.DIVIDEND_PROFILE.extract(dividend_page())
+    assert result.ok and result.summary() is None
+    assert result.fallbacks == {}
+    assert result.row() == {
+        "Price": "$47.62",
+        "Yield %": "2.10%",
+        "Annual Dividend": "$1.00",
+        "Ex Dividend Date": "Mar 3, 2025",
+        "Frequency": "Quarterly",
+        "Dividend Growth %": "5.00%",
+    }
+
+
+def test_redesigned_page_is_read_by_label_and_reported_as_fallbacks():
+    result = extraction.DIVIDEND_PROFILE.extract(dividend_page(redesigned=True))
+    assert result.ok
+    assert result.values["Yield %"] == "2.10%" and result.values["Dividend Growth %"] == "5.00%"
+    assert result.fallbacks == {name: 1 for name in result.fields}
+
+
+def test_missing_fields_are_named_with_the_reason():
+    result = extraction.DIVIDEND_PROFILE.extract(dividend_page(count=3, price=" "))
+    assert not result.ok
+    assert set(result.problems) == {"Price", "Frequency", "Dividend Growth %"}
+    assert result.summary() == (
+        "no selector matched, the stockanalysis dividend page layout may have changed: Price, Frequency, Dividend Growth %"
+    )
+    assert result.row("-")["Frequency"] == "-"
+
+
+def test_failed_requests_are_recorded_for_every_field():
+    class Response:
+        status_code = 429
+        content = b""
+
+    for response, reason in [(None, "request failed"), (Response(), "HTTP 429")]:
+        result = extraction.DIVIDEND_PROFILE.extract_response(response)
+        assert result.values == {}
+        assert result.summary() == f"{reason}: " + ", ".join(result.fields)
+
+
+def test_unparseable_page_is_reported():
+    result = extraction.PERFORMANCE_PROFILE.extract(b"")
+    assert result.summary().startswith("page could not be parsed (ParserError")
+
+
+def test_window_parses_only_the_marked_part_of_the_page():
+    page = dividend_page().encode()
+    window = extraction.DIVIDEND_PROFILE._window(page)
+    assert window.startswith(b'<main id="main">') and window.endswith(b"</main>")
+    assert extraction.DIVIDEND_PROFILE._window(b"<html><body>moved</body></html>") == b"<html><body>moved</body></html>"
+
+
+def test_profile_key_changes_with_its_selectors():
+    fields = [extraction.Field("Price", "//span/text()")]
+    same = extraction.Profile("p", [extraction.Field("Price", "//span/text()")])
+    changed = extraction.Profile("p", [extraction.Field("Price", "//div/text()")])
+    assert extraction.Profile("p", fields).key == same.key != changed.key
@@ -0,0 +1,101 @@
+# Import numpy, pandas and pytest
+import numpy as np
+import pandas as pd
+import pytest
+
+# Import the modules under test
+import backtest
+import bar_store
+import forecast_engine
+import forecast_pipeline
+import forecast_store
+import intervals
+import order_registry
+
+# Import the test helpers
+from conftest import make_bars
+
+
+def stores(store, tmp_path, monkeypatch):
+    bars = store({"AAA": make_bars(30)})
+    forecasts = forecast_store.ForecastStore(root=tmp_path / "forecasts")
+    monkeypatch.setattr(forecast_store, "_default_store", forecasts)
+    return bars.sync("AAA"), forecasts
+
+
+def test_stored_forecast_serves_the_run_on_the_latest_bars(store, tmp_path, monkeypatch):
+    bars, forecasts = stores(store, tmp_path, monkeypatch)
+    key = forecast_pipeline.forecast_key("AAA", "2024-01-02")
+    forecasts.put(key, bars.index[-1].strftime("%Y-%m-%d"), "latest")
+
+    assert forecast_pipeline.stored_forecast("AAA", "2024-01-02") == ("latest", False)
+    assert forecast_pipeline.stored_forecast("AAA", "2024-01-02", horizon=10) == (None, False)
+
+
+def test_stored_forecast_falls_back_to_the_last_completed_session(store, tmp_path, monkeypatch):
+    bars, forecasts = stores(store, tmp_path, monkeypatch)
+    key = forecast_pipeline.forecast_key("AAA", "2024-01-02")
+    forecasts.put(key, bars.index[-2].strftime("%Y-%m-%d"), "nightly")
+
+    # The last bar is today's partial bar, so the nightly run on the session before it is served
+    monkeypatch.setattr(bar_store, "session_closed", lambda date, now=None: date != bars.index[-1])
+    assert forecast_pipeline.stored_forecast("AAA", "2024-01-02") == ("nightly", True)
+
+    # Once the session has closed the nightly run is out of date
+    monkeypatch.setattr(bar_store, "session_closed", lambda date, now=None: True)
+    assert forecast_pipeline.stored_forecast("AAA", "2024-01-02") == (None, False)
+
+
+def test_walk_forward_order_is_searched_before_the_first_origin(store, monkeypatch):
+    store({"AAA": make_bars(200)})
+    searched, backtested = [], []
+
+    class Registry:
+        def select_order(self, values, ticker, series):
+            searched.append(len(values))
+            return (0, 1, 0), {}
+
+    def walk_forward(close, order, seasonal_order, origins, **options):
+        backtested.append((len(close), origins))
+        return None, None
+
+    monkeypatch.setattr(order_registry, "get_registry", Registry)
+    monkeypatch.setattr(backtest, "walk_forward", walk_forward)
+    forecast_pipeline.run_walk_forward("AAA", "2024-01-02", "2025-06-01", seasonality=5, horizon=10, origins=4)
+    assert backtested == [(200, [100, 130, 160, 190])]
+    assert searched == [100]
+
+
+def test_preview_lays_out_the_forecast_the_full_run_replaces(store, monkeypatch):
+    store({"AAA": make_bars(120)})
+
+    # The preview answers without the SARIMAX engine
+    def no_fits(*args, **options):
+        raise AssertionError("the preview fitted SARIMAX models")
+
+    monkeypatch.setattr(forecast_engine, "fit_many", no_fits)
+    quick = forecast_pipeline.run_preview("AAA", "2024-01-02", horizon=10)
+
+    def fit_many(series, seasonality, horizon, **options):
+        fit = {"forecast": np.zeros(horizon + 1), "distribution": None, "order_search": {"saved_seconds": 0.5}}
+        return {name: dict(fit) for name in series}
+
+    monkeypatch.setattr(forecast_engine, "fit_many", fit_many)
+    monkeypatch.setattr(intervals, "fan", lambda distributions, index, start=None: {})
+    full = forecast_pipeline.run_forecast("AAA", "2024-01-02", horizon=10)
+
+    # The page draws either result the same way, the full run replacing the preview's table in place
+    assert quick["preview"] and not full["preview"]
+    assert set(full) - set(quick) == {"intervals"}
+    assert quick["ticker"] == full["ticker"] and quick["start_date"] == full["start_date"]
+    pd.testing.assert_frame_equal(quick["history"], full["history"])
+    pd.testing.assert_index_equal(quick["forecast"].index, full["forecast"].index)
+    assert list(quick["forecast"].columns) == list(full["forecast"].columns)
+    assert quick["forecast"].index[0] > quick["history"].index[-2] and len(quick["forecast"]) == 11
+    assert np.isfinite(quick["forecast"].to_numpy()).all()
+
+
+def test_preview_needs_stored_bars(store):
+    store({"AAA": make_bars(120)})
+    with pytest.raises(ValueError, match="No bars stored for AAA"):
+        forecast_pipeline.run_preview("AAA", "2030-01-02")
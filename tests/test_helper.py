@@ -0,0 +1,22 @@
+# Imports
+import logging
+
+# Import the module under test
+import helper
+
+from conftest import make_bars
+
+
+def test_failed_prediction_is_logged_with_its_reason(store, caplog):
+    store({"AAA": make_bars(120)})
+    with caplog.at_level(logging.WARNING, logger="helper"):
+        assert helper.generate_stock_prediction("AAA") == (None, None, None, None)
+    assert "Could not predict AAA: ValueError: not enough history for 250 lags" in caplog.text
+
+
+def test_prediction_covers_the_testing_area_and_ninety_days_past_it(store):
+    store({"AAA": make_bars(600)})
+    train_df, test_df, forecast, predictions = helper.generate_stock_prediction("AAA")
+    assert len(forecast) == len(test_df) + 90
+    assert predictions.index.equals(test_df.index)
+    assert forecast.index[0] == test_df.index[0] == train_df.index[-1]
@@ -0,0 +1,82 @@
+# Imports
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Import pytest
+import pytest
+
+# Import the module under test
+import http_client
+
+
+# Local stand-in answering the first request of every path with 503 and the Retry-After it was asked for
+@pytest.fixture
+def server():
+    seen = set()
+
+    class StandIn(BaseHTTPRequestHandler):
+        def do_GET(self):
+            first = self.path not in seen
+            seen.add(self.path)
+            body = self.path.encode()
+            self.send_response(503 if first else 200)
+            if first:
+                self.send_header("Retry-After", self.path.strip("/"))
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    stand_in = ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+    threading.Thread(target=stand_in.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{stand_in.server_port}"
+    stand_in.shutdown()
+
+
+def test_retry_after_is_capped_at_the_longest_backoff(server):
+    client = http_client.HttpClient(retries=2, backoff=0.05)
+    started = time.monotonic()
+    response = client.get(f"{server}/3600")
+    assert response.status_code == 200
+    assert time.monotonic() - started < 2
+    assert client.stats["retries"] == 1
+
+
+def test_short_retry_after_is_honoured():
+    client = http_client.HttpClient(retries=3, backoff=1.0)
+
+    class Response:
+        headers = {"Retry-After": "2"}
+
+    assert client._delay(0, Response()) == 2.0
+    Response.headers = {"Retry-After": "600"}
+    assert client._delay(0, Response()) == 8.0
+
+
+def test_host_limiter_caps_concurrency_and_spaces_starts():
+    limiter = http_client.HostLimiter(max_in_flight=2, per_second=20.0)
+    guard = threading.Lock()
+    state = {"running": 0, "peak": 0, "starts": []}
+
+    def work():
+        with limiter:
+            with guard:
+                state["running"] += 1
+                state["peak"] = max(state["peak"], state["running"])
+                state["starts"].append(time.monotonic())
+            time.sleep(0.05)
+            with guard:
+                state["running"] -= 1
+
+    threads = [threading.Thread(target=work) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    starts = sorted(state["starts"])
+    assert state["peak"] == 2
+    assert min(later - earlier for earlier, later in zip(starts, starts[1:])) >= 0.045
@@ -0,0 +1,56 @@
+# Import numpy and pandas
+import numpy as np
+import pandas as pd
+
+# Import the module under test
+import indicators
+
+
+def prices(columns=3, length=250, seed=0):
+    rng = np.random.default_rng(seed)
+    values = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (length, columns)), axis=0))
+    return pd.DataFrame(values, index=pd.bdate_range("2025-01-01", periods=length), columns=[f"T{i}" for i in range(columns)])
+
+
+def test_ema_matches_pandas():
+    frame = prices()
+    averages = indicators.ema(frame.to_numpy(), [5, 13, 39])
+    for i, span in enumerate([5, 13, 39]):
+        expected = frame.ewm(span=span, adjust=False).mean().to_numpy()
+        np.testing.assert_allclose(averages[i], expected, rtol=1e-12)
+
+
+def test_macd_frame_matches_pandas():
+    close = prices(columns=1)["T0"]
+    fast = close.ewm(span=13, adjust=False).mean()
+    slow = close.ewm(span=39, adjust=False).mean()
+    macd = fast - slow
+    signal = macd.ewm(span=9, adjust=False).mean()
+
+    frame = indicators.macd_frame(close, 13, 39, 9)
+    np.testing.assert_allclose(frame["MACD"], macd, rtol=1e-10, atol=1e-12)
+    np.testing.assert_allclose(frame["Signal"], signal, rtol=1e-10, atol=1e-12)
+    np.testing.assert_allclose(frame["Histogram"], macd - signal, rtol=1e-10, atol=1e-12)
+
+
+def test_macd_leaves_dates_before_a_late_listing_empty():
+    frame = prices()
+    frame.iloc[:30, 1] = np.nan
+    tensors = indicators.macd(frame, [(12, 26, 9), (13, 39, 9)])
+    assert tensors["MACD"].shape == (2, len(frame), 3)
+    assert np.isnan(tensors["MACD"][:, :30, 1]).all()
+    assert not np.isnan(tensors["MACD"][:, 30:, 1]).any()
+
+    # The late column matches pandas run on its listed dates alone
+    listed = frame["T1"].iloc[30:]
+    expected = listed.ewm(span=12, adjust=False).mean() - listed.ewm(span=26, adjust=False).mean()
+    np.testing.assert_allclose(tensors["MACD"][0, 30:, 1], expected, rtol=1e-10, atol=1e-12)
+
+
+def test_screen_flags_crossovers_per_parameter_set():
+    frame = prices()
+    table = indicators.screen(frame, [(12, 26, 9), (5, 35, 5)])
+    assert len(table) == 6
+    histogram = indicators.macd(frame, [(12, 26, 9)])["Histogram"][0]
+    expected = np.sign(histogram[-1]) != np.sign(histogram[-2])
+    np.testing.assert_array_equal(table.loc[(12, 26, 9)]["Crossover"].to_numpy(), expected)
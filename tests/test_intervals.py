@@ -0,0 +1,52 @@
+# Import numpy and pandas
+import numpy as np
+import pandas as pd
+
+# Import the required libraries
+from scipy.stats import norm
+from statsmodels.tsa.statespace.sarimax import SARIMAX
+
+# Import the module under test
+import intervals
+
+
+def test_forecast_distribution_matches_statsmodels_forecast():
+    values = 100 + np.cumsum(np.random.default_rng(0).normal(0, 1, 200))
+    results = SARIMAX(values, order=(1, 1, 1), seasonal_order=(1, 0, 0, 5)).fit(disp=False)
+    distribution = intervals.forecast_distribution(results, 12)
+
+    forecast = results.get_forecast(12)
+    np.testing.assert_allclose(distribution["mean"], forecast.predicted_mean, rtol=1e-8)
+    np.testing.assert_allclose(np.diag(distribution["cov"]), forecast.var_pred_mean, rtol=1e-8)
+    np.testing.assert_allclose(distribution["cov"], distribution["cov"].T)
+
+
+def test_simulated_quantiles_match_the_exact_gaussian_quantiles():
+    # Random walk covariances min(i, j), scaled differently per series
+    steps = np.arange(1, 21)
+    covs = np.stack([np.minimum.outer(steps, steps) * scale for scale in (1.0, 4.0)])
+    means = np.stack([np.full(20, 10.0), np.linspace(0, 5, 20)])
+    bands = intervals.simulate_quantiles(means, covs, paths=40000, seed=0)
+
+    exact = means[:, np.newaxis, :] + norm.ppf(intervals.QUANTILES)[:, np.newaxis] * np.sqrt(
+        np.diagonal(covs, axis1=1, axis2=2)
+    )[:, np.newaxis, :]
+    spread = np.sqrt(np.diagonal(covs, axis1=1, axis2=2))[:, np.newaxis, :]
+    assert bands.shape == (2, len(intervals.QUANTILES), 20)
+    assert np.all(np.abs(bands - exact) < 0.05 * spread)
+
+
+def test_deterministic_steps_collapse_to_the_mean():
+    cov = np.zeros((3, 3))
+    cov[2, 2] = 1.0
+    bands = intervals.simulate_quantiles([[1.0, 2.0, 3.0]], [cov], paths=1000, seed=0)[0]
+    np.testing.assert_allclose(bands[:, :2], [[1.0, 2.0]] * len(intervals.QUANTILES), atol=1e-9)
+
+
+def test_fan_is_anchored_at_the_known_first_value():
+    index = pd.bdate_range("2025-01-02", periods=4)
+    distribution = {"mean": np.zeros(3), "cov": np.eye(3)}
+    table = intervals.fan({"C": distribution}, index, seed=0, start={"C": 7.0})["C"]
+    assert list(table.columns) == ["5%", "25%", "50%", "75%", "95%"]
+    assert (table.iloc[0] == 7.0).all()
+    assert (table["5%"].iloc[1:] < table["95%"].iloc[1:]).all()
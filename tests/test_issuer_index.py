@@ -0,0 +1,76 @@
+# Import pytest
+import pytest
+
+# Import the module under test
+import issuer_index
+
+# Issuer rows as the exchange file has them, padded values and a trailing comma included
+HEADER = (
+    "Security Code,Issuer Name,Security Id,Security Name,Status,Group,Face Value,ISIN No,Industry,Instrument,"
+    "Sector Name,Industry New Name,Igroup Name,ISubgroup Name"
+)
+ROWS = [
+    "500002,ABB India Limited,ABB,ABB India Limited,Active,A ,2.00,INE117A01022,Electrical,Equity,Industrials,Capital Goods,Electrical Equipment,Heavy Electrical,",
+    "500003,Aegis Logistics Ltd.,AEGISLOG,AEGIS LOGISTICS LTD.,Active,A ,1.00,INE208C01025,Gas,Equity,Energy,Oil & Gas,Gas,Trading - Gas,",
+    "500008,Amara Raja Energy & Mobility Ltd,ARE&M,AMARA RAJA,Active,A ,1.00,INE885A01032,Batteries,Equity,Consumer Discretionary,Automobiles,Auto Components,Batteries,",
+    "500010,Housing Development Finance Corp, HDFC ,HDFC,Delisted,A ,2.00,INE001A01036,Housing Finance,Equity,Financial Services,Finance,Finance,Housing Finance,",
+    "500020,Bombay Dyeing & Mfg Co Ltd,BOMDYEING,BOMBAY DYEING,Active,A ,2.00,INE032A01023,Textiles,Equity,Consumer Discretionary,Textiles,Textiles,Other Textile,",
+]
+
+
+def build(tmp_path):
+    path = tmp_path / "equity_issuers.csv"
+    path.write_text("\n".join([HEADER] + ROWS) + "\n")
+    return issuer_index.IssuerIndex.from_csv(path)
+
+
+def codes(records):
+    return [record["Security Code"] for record in records]
+
+
+def test_trailing_comma_does_not_shift_the_columns(tmp_path):
+    index = build(tmp_path)
+    assert index.by_code(500010)["Security Id"] == "HDFC"
+    assert index.stock_names()["ABB India Limited"] == "ABB"
+    assert len(index.stock_names()) == len(ROWS)
+
+
+def test_prefix_matches_names_and_security_ids(tmp_path):
+    index = build(tmp_path)
+    assert codes(index.prefix("a")) == [500002, 500003, 500008]
+    assert codes(index.prefix("aegis log")) == [500003]
+    assert codes(index.prefix("hdf")) == [500010]
+    assert codes(index.prefix("a", limit=2)) == [500002, 500003]
+    assert index.prefix("zz") == []
+
+
+def test_search_ranks_prefix_matches_first_then_close_spellings(tmp_path):
+    index = build(tmp_path)
+    assert codes(index.search("bombay dying", limit=1)) == [500020]
+    assert codes(index.search("logistcs aegis", limit=1)) == [500003]
+    assert codes(index.search("amara", limit=3))[0] == 500008
+    assert index.search("  ") == []
+
+
+def test_facets_filter_lookups_and_count_issuers(tmp_path):
+    index = build(tmp_path)
+    assert codes(index.prefix("a", sector="Energy")) == [500003]
+    assert codes(index.search("dyeing bombay", sector="Consumer Discretionary"))[0] == 500020
+    assert 500002 not in codes(index.search("abb india", sector="Energy"))
+    assert index.prefix("a", sector="Unknown") == []
+    assert index.facet_counts("sector")["Consumer Discretionary"] == 2
+    assert list(index.filter(group="Finance")["Security Code"]) == [500010]
+
+
+def test_unknown_facet_is_refused(tmp_path):
+    index = build(tmp_path)
+    with pytest.raises(ValueError, match="Unknown facet 'country'"):
+        index.prefix("a", country="IN")
+
+
+def test_isin_and_code_lookups(tmp_path):
+    index = build(tmp_path)
+    assert index.by_isin(" ine208c01025 ")["Issuer Name"] == "Aegis Logistics Ltd."
+    assert index.by_isin("INE000000000") is None
+    assert index.by_code(500002)["Security Id"] == "ABB"
+    assert index.by_code(1) is None
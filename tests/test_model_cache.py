@@ -0,0 +1,81 @@
+# Import numpy and pandas
+import numpy as np
+import pandas as pd
+
+# Import the required libraries
+from statsmodels.tsa.statespace.sarimax import SARIMAX
+
+# Import the modules under test
+import bar_store
+import model_cache
+
+
+# Function to fit a small seasonal model quickly
+def fit(values):
+    return SARIMAX(values, order=(1, 0, 0), seasonal_order=(0, 0, 0, 5)).fit(disp=False)
+
+
+def series(length, seed=0):
+    return 100 + np.cumsum(np.random.default_rng(seed).normal(0, 1, length))
+
+
+def test_find_extends_a_cached_fit_with_new_bars(tmp_path):
+    cache = model_cache.ModelCache(root=tmp_path)
+    values = series(210)
+    fitted = fit(values[:200])
+    cache.put("AAA", "C", values[:200], fitted)
+
+    results = cache.find("AAA", "C", values, 5)
+    assert results is not None
+    assert results.nobs == 210
+    np.testing.assert_allclose(results.params, fitted.params)
+
+
+def test_find_misses_when_history_changed(tmp_path):
+    cache = model_cache.ModelCache(root=tmp_path)
+    values = series(210)
+    cache.put("AAA", "C", values[:200], fit(values[:200]))
+
+    changed = values.copy()
+    changed[50] += 1
+    assert cache.find("AAA", "C", changed, 5) is None
+    assert cache.find("AAA", "C", values, 22) is None
+    assert cache.find("BBB", "C", values, 5) is None
+
+
+def test_find_misses_once_too_many_bars_were_appended(tmp_path):
+    cache = model_cache.ModelCache(root=tmp_path, max_extension=0.25)
+    values = series(260)
+    cache.put("AAA", "C", values[:200], fit(values[:200]))
+    assert cache.find("AAA", "C", values, 5) is None
+
+
+def test_partial_last_bar_replaced_by_the_final_close_still_reuses_the_fit(tmp_path):
+    cache = model_cache.ModelCache(root=tmp_path)
+    values = series(205)
+
+    # Fitted during the session, with the last bar still moving
+    intraday = values[:200].copy()
+    intraday[-1] -= 0.7
+    cache.put("AAA", "C", intraday, fit(intraday), partial=True)
+
+    # The next morning the final close replaced it and more bars arrived
+    results = cache.find("AAA", "C", values, 5)
+    assert results is not None
+    assert results.nobs == 205
+
+
+def test_closed_last_bar_is_part_of_the_hash(tmp_path):
+    cache = model_cache.ModelCache(root=tmp_path)
+    values = series(205)
+    closed = values[:200].copy()
+    closed[-1] -= 0.7
+    cache.put("AAA", "C", closed, fit(closed))
+    assert cache.find("AAA", "C", values, 5) is None
+
+
+def test_session_closed_follows_new_york_time():
+    now = pd.Timestamp("2026-10-16 11:00", tz="America/New_York")
+    assert not bar_store.session_closed("2026-10-16", now=now)
+    assert bar_store.session_closed("2026-10-15", now=now)
+    assert bar_store.session_closed("2026-10-16", now=now.replace(hour=16, minute=5))
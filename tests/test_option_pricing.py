@@ -0,0 +1,47 @@
+# Import numpy
+import numpy as np
+
+# Import the module under test
+import option_pricing
+
+
+def test_black_scholes_put_call_parity():
+    S, K, T, r, sigma = 100.0, np.array([80.0, 100.0, 120.0]), 0.5, 0.04, 0.3
+    call = option_pricing.black_scholes(S, K, T, r, sigma, "call")
+    put = option_pricing.black_scholes(S, K, T, r, sigma, "put")
+    np.testing.assert_allclose(call - put, S - K * np.exp(-r * T), rtol=1e-12)
+
+
+def test_implied_volatility_recovers_the_pricing_volatility():
+    rng = np.random.default_rng(0)
+    S = 100.0
+    K = rng.uniform(60, 140, 500)
+    T = rng.uniform(0.02, 2.0, 500)
+    sigma = rng.uniform(0.05, 1.5, 500)
+    is_call = rng.random(500) < 0.5
+    price = np.where(
+        is_call,
+        option_pricing.black_scholes(S, K, T, 0.03, sigma, "call"),
+        option_pricing.black_scholes(S, K, T, 0.03, sigma, "put"),
+    )
+
+    # Deep options carry almost no vega, so compare where the price actually depends on volatility
+    solved = option_pricing.implied_volatility(price, S, K, T, 0.03, is_call)
+    d1, _, sqrt_T = option_pricing._d1_d2(S, K, T, 0.03, sigma)
+    sensitive = S * np.exp(-0.5 * d1**2) * sqrt_T > 1e-3
+    np.testing.assert_allclose(solved[sensitive], sigma[sensitive], rtol=1e-5)
+
+
+def test_implied_volatility_is_nan_outside_the_arbitrage_bounds():
+    solved = option_pricing.implied_volatility([0.0, 150.0, 5.0, 5.0], 100.0, 100.0, [0.5, 0.5, 0.0, 0.5], 0.0)
+    assert np.isnan(solved[:3]).all()
+    assert np.isfinite(solved[3])
+
+
+def test_covered_call_grid_at_expiry_is_the_payoff():
+    surfaces = option_pricing.covered_call_grid(100.0, 105.0, 30, 0.04, 0.25, premium=2.0)
+    pnl = surfaces["P&L"]
+    prices = pnl.index.to_numpy()
+    expected = (prices - 100.0) * 100 - np.maximum(prices - 105.0, 0) * 100 + 200.0
+    np.testing.assert_allclose(pnl["Day_30"], expected, atol=1e-9)
+    assert set(surfaces) == {"P&L", "Delta", "Gamma", "Theta", "Vega", "Rho"}
@@ -0,0 +1,57 @@
+# Imports
+import threading
+import time
+
+# Import pandas
+import pandas as pd
+
+# Import the modules under test
+import covered_call_scanner
+import http_client
+import options_chain
+
+
+# Ticker that answers like yfinance after a short delay, recording how many requests are in flight
+class SlowTicker:
+    in_flight = 0
+    peak = 0
+    guard = threading.Lock()
+
+    def __init__(self, ticker):
+        self.ticker = ticker
+
+    @classmethod
+    def _request(cls):
+        with cls.guard:
+            cls.in_flight += 1
+            cls.peak = max(cls.peak, cls.in_flight)
+        time.sleep(0.01)
+        with cls.guard:
+            cls.in_flight -= 1
+
+    def history(self, period):
+        self._request()
+        return pd.DataFrame({"Close": [100.0]})
+
+    @property
+    def options(self):
+        self._request()
+        return ["2030-01-18", "2030-02-15", "2030-03-15", "2030-06-21"]
+
+    def option_chain(self, expiration):
+        self._request()
+        calls = pd.DataFrame(
+            {"strike": [95.0, 105.0], "bid": [7.0, 2.0], "ask": [7.4, 2.2], "lastPrice": [7.2, 2.1], "impliedVolatility": [0.3, 0.3]}
+        )
+        return type("Chain", (), {"calls": calls, "puts": calls.copy()})
+
+
+def test_scan_keeps_yahoo_requests_under_the_host_limit(monkeypatch):
+    monkeypatch.setattr(options_chain.yf, "Ticker", SlowTicker)
+    monkeypatch.setattr(options_chain, "YAHOO_LIMITER", http_client.HostLimiter(4, None))
+    monkeypatch.setattr(options_chain, "_default_cache", None)
+
+    table, failed = covered_call_scanner.scan([f"T{i}" for i in range(30)], max_workers=8)
+    assert failed == []
+    assert set(table["Ticker"]) == {f"T{i}" for i in range(30)}
+    assert SlowTicker.peak <= 4
@@ -0,0 +1,53 @@
+# Imports
+import json
+
+# Import numpy
+import numpy as np
+
+# Import the modules under test
+import order_registry
+import order_search
+
+
+def series(seed):
+    rng = np.random.default_rng(seed)
+    noise = rng.normal(0, 1, 200)
+    values = np.zeros(200)
+    for t in range(1, 200):
+        values[t] = 0.6 * values[t - 1] + noise[t]
+    return values
+
+
+def test_each_series_reports_its_own_search_time():
+    selected = order_search.select_orders({"A": series(0), "B": series(1)}, max_workers=2)
+    batch = selected["A"][1]["batch_seconds"]
+    assert selected["B"][1]["batch_seconds"] == batch
+    for _, stats in selected.values():
+        assert 0 < stats["search_seconds"]
+    assert selected["A"][1]["search_seconds"] != selected["B"][1]["search_seconds"]
+
+
+def test_saving_is_counted_once_per_series(tmp_path):
+    registry = order_registry.OrderRegistry(root=tmp_path)
+    values = {"A": series(0), "B": series(1)}
+    first = registry.select_orders(values, "AAA", max_workers=2)
+    assert all(stats["full_search"] for _, stats in first.values())
+
+    # The warm-started run saves each series' own full search time minus its own local search
+    second = registry.select_orders(values, "AAA", max_workers=2)
+    for name, (_, stats) in second.items():
+        assert not stats["full_search"]
+        expected = max(first[name][1]["search_seconds"] - stats["search_seconds"], 0.0)
+        assert np.isclose(stats["saved_seconds"], expected)
+
+
+def test_entries_timed_by_batch_are_ignored(tmp_path):
+    registry = order_registry.OrderRegistry(root=tmp_path)
+    registry.record("AAA", "C", (1, 0, 0), 500.0, 200, 40.0, True)
+    history = registry.history("AAA", "C")
+    del history[0]["per_series"]
+    registry.path("AAA", "C").write_text(json.dumps(history))
+    assert registry.full_search_seconds("AAA", "C") is None
+
+    registry.record("AAA", "C", (1, 0, 0), 500.0, 200, 3.0, True)
+    assert registry.full_search_seconds("AAA", "C") == 3.0
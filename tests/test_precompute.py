@@ -0,0 +1,59 @@
+# Imports
+import datetime as dt
+
+# Import pandas
+import pandas as pd
+
+# Import the modules under test
+import bar_store
+import forecast_pipeline
+import forecast_store
+import precompute
+
+from conftest import MemoryBarProvider, make_bars
+
+
+def test_nightly_run_on_day_d_is_served_on_day_d_plus_1(tmp_path, monkeypatch):
+    # Bars up to day D, a store that always asks the provider, and an empty forecast store
+    bars = make_bars(300)
+    provider = MemoryBarProvider({"AAA": bars.iloc[:-1]})
+    monkeypatch.setattr(bar_store, "_default_store", bar_store.BarStore(provider, tmp_path / "bars", dt.timedelta(0)))
+    monkeypatch.setattr(forecast_store, "_default_store", forecast_store.ForecastStore(tmp_path / "forecasts"))
+    monkeypatch.setattr(precompute, "CHECKPOINT_DIR", tmp_path / "checkpoints")
+
+    # A stand-in for the SARIMAX run that only reports the bars and start it was given
+    def run_forecast(ticker, start_date, **params):
+        history = bar_store.get_bars(ticker, start=pd.Timestamp(start_date))
+        return {"history": history, "start_date": start_date}
+
+    monkeypatch.setattr(forecast_pipeline, "run_forecast", run_forecast)
+
+    # Clock of the test, which decides which sessions have closed
+    clock = {}
+    monkeypatch.setattr(
+        bar_store,
+        "session_closed",
+        lambda date, now=None: pd.Timestamp(date).date() < clock["now"].date() or clock["now"].hour >= 16,
+    )
+
+    # Nightly run at 18:00 on day D
+    day = bars.index[-2].date()
+    clock["now"] = dt.datetime.combine(day, dt.time(18))
+    checkpoint = precompute.run_nightly(["AAA"], day=day, max_workers=1)
+    assert checkpoint["done"] == {"AAA": day.isoformat()}
+
+    # Next morning, before the open, the page's default start finds the nightly run
+    clock["now"] = dt.datetime.combine(day + dt.timedelta(days=1), dt.time(9))
+    start = forecast_pipeline.default_start_date("AAA")
+    assert start == day - dt.timedelta(days=365)
+    result, earlier_session = forecast_pipeline.stored_forecast("AAA", start, **precompute.DEFAULT_PARAMS)
+    assert result["start_date"] == start and not earlier_session
+
+    # During the session, with its partial bar stored, the same run is served as the last completed session's
+    provider.bars["AAA"] = bars
+    clock["now"] = dt.datetime.combine(bars.index[-1].date(), dt.time(11))
+    bar_store.get_store().sync("AAA")
+    start = forecast_pipeline.default_start_date("AAA")
+    assert start == day - dt.timedelta(days=365)
+    result, earlier_session = forecast_pipeline.stored_forecast("AAA", start, **precompute.DEFAULT_PARAMS)
+    assert result["history"].index[-1].date() == day and earlier_session
@@ -0,0 +1,30 @@
+# Import numpy
+import numpy as np
+
+# Import the module under test
+import preview
+
+
+def test_constant_series_forecasts_its_level():
+    forecast = preview.holt_forecast(np.full(60, 7.0), horizon=5)
+    assert len(forecast) == 6
+    np.testing.assert_allclose(forecast, 7.0)
+
+
+def test_trending_series_keeps_a_damped_trend():
+    values = 5.0 + 2.0 * np.arange(100)
+    forecast = preview.holt_forecast(values, horizon=20)
+
+    # The first value is the fit of the last bar, then every step climbs by a little less than the last
+    assert abs(forecast[0] - values[-1]) < 0.5
+    steps = np.diff(forecast[1:])
+    assert (steps > 0).all() and (np.diff(steps) < 0).all()
+    assert values[-1] < forecast[-1] < values[-1] + 2.0 * 20
+
+
+def test_preview_many_forecasts_every_named_series():
+    rng = np.random.default_rng(0)
+    series = {"C": 100 + rng.standard_normal(80).cumsum(), "M": rng.standard_normal(80), "S": [1.0, 2.0]}
+    fits = preview.preview_many(series, horizon=12)
+    assert list(fits) == ["C", "M", "S"]
+    assert all(len(fit["forecast"]) == 13 and np.isfinite(fit["forecast"]).all() for fit in fits.values())
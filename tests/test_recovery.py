@@ -0,0 +1,100 @@
+# Import io, numpy, pandas and pytest
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Import the module under test
+import recovery
+
+
+def market(price, payment=0.0, frequency=0, returns=None, volatility=0.0):
+    returns = [0.0] * 12 if returns is None else returns
+    return {
+        "Price": price,
+        "Annual Dividend": payment * frequency,
+        "Frequency": frequency,
+        "Payment": payment,
+        "Months Since Payment": 0.0,
+        "Dividend Volatility": volatility,
+        "Monthly Returns": pd.Series(returns, dtype=float),
+    }
+
+
+def holdings(*rows):
+    return pd.DataFrame(rows, columns=["Ticker", "Average Cost", "Quantity"])
+
+
+def test_read_holdings_maps_column_spellings_and_drops_bad_rows():
+    file = io.StringIO("Symbol,Avg Cost,Shares\n abr ,13.13,76\nO,50,x\nT,20,0\nMAIN,40,10\n")
+    table = recovery.read_holdings(file)
+    assert list(table.columns) == ["Ticker", "Average Cost", "Quantity"]
+    assert table["Ticker"].tolist() == ["ABR", "MAIN"]
+    assert table["Quantity"].tolist() == [76, 10]
+
+
+def test_read_holdings_names_the_missing_column():
+    with pytest.raises(ValueError, match="needs a Quantity column"):
+        recovery.read_holdings(io.StringIO("Ticker,Cost\nABR,13\n"))
+
+
+def test_simulate_recovers_a_dividend_position_when_the_payments_cover_the_loss():
+    # A flat price and a fixed monthly payment of 0.25 cover a loss of 1 per share in the fourth month
+    positions, portfolio = recovery.simulate(
+        holdings(("ABR", 10.0, 100)), {"ABR": market(9.0, payment=0.25, frequency=12)}, paths=50, horizon_months=24, seed=0
+    )
+    row = positions.iloc[0]
+    assert row["Loss"] == pytest.approx(100.0)
+    assert row["Constant Months"] == pytest.approx(4.0)
+    assert row["Recovered Share"] == 1.0
+    assert row["Months 50%"] == 4
+    assert (portfolio == 4).all()
+
+
+def test_simulate_marks_recovered_and_non_dividend_positions():
+    positions, portfolio = recovery.simulate(
+        holdings(("UP", 5.0, 10), ("FLAT", 10.0, 10)),
+        {"UP": market(8.0), "FLAT": market(9.0)},
+        paths=50,
+        horizon_months=24,
+        seed=0,
+    )
+    up, flat = positions.iloc[0], positions.iloc[1]
+
+    # Already above its cost: recovered on every path from the start
+    assert up["Loss"] == 0 and up["Constant Months"] == 0
+    assert up["Recovered Share"] == 1.0 and up["Months 90%"] == 0
+
+    # No dividend and a flat price: never recovers and has no constant price answer
+    assert np.isnan(flat["Constant Months"])
+    assert flat["Recovered Share"] == 0.0 and np.isinf(flat["Months 10%"])
+
+    # Together the positions cover their cost of 150 with a value of 170
+    assert (portfolio == 0).all()
+
+
+def test_simulate_is_repeatable_with_a_seed():
+    returns = [0.05, -0.04, 0.02, -0.03, 0.06, -0.05, 0.01, 0.0, -0.02, 0.03, -0.01, 0.04]
+    book = holdings(("ABR", 12.0, 50), ("O", 60.0, 5))
+    markets = {
+        "ABR": market(10.0, payment=0.4, frequency=4, returns=returns, volatility=0.1),
+        "O": market(55.0, payment=0.25, frequency=12, returns=returns[::-1], volatility=0.05),
+    }
+    first = recovery.simulate(book, markets, paths=200, horizon_months=60, seed=7)
+    second = recovery.simulate(book, markets, paths=200, horizon_months=60, seed=7)
+    pd.testing.assert_frame_equal(first[0], second[0])
+    np.testing.assert_array_equal(first[1], second[1])
+
+
+def test_simulate_skips_tickers_without_data_and_refuses_an_empty_portfolio():
+    positions, _ = recovery.simulate(holdings(("ABR", 10.0, 1), ("GONE", 5.0, 1)), {"ABR": market(9.0)}, paths=10, seed=0)
+    assert positions["Ticker"].tolist() == ["ABR"]
+    with pytest.raises(ValueError, match="No holdings have market data"):
+        recovery.simulate(holdings(("GONE", 5.0, 1)), {}, paths=10, seed=0)
+
+
+def test_portfolio_summary_counts_paths_recovered_by_each_year():
+    summary = recovery.portfolio_summary(np.array([0.0, 12.0, 30.0, np.inf]), horizon_months=36)
+    assert summary["Years"].tolist() == [1, 2, 3]
+    assert summary["Recovered Share"].tolist() == [0.5, 0.5, 0.75]
@@ -0,0 +1,107 @@
+# Imports
+import time
+from concurrent.futures import Future
+
+# Import pytest and requests
+import pytest
+import requests
+
+# Import the module under test
+import response_cache
+
+URL = "https://stockanalysis.com/stocks/aaa/dividend/"
+
+
+# Upstream response with the attributes the cache reads
+class Response:
+    def __init__(self, status_code, content=b"", headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+
+# Client answering from a script of responses or exceptions, recording the headers of every request
+class ScriptedClient:
+    def __init__(self, *answers):
+        self.answers = list(answers)
+        self.requests = []
+
+    def submit(self, url, headers=None):
+        self.requests.append(headers or {})
+        answer = self.answers.pop(0)
+        future = Future()
+        if isinstance(answer, Exception):
+            future.set_exception(answer)
+        else:
+            future.set_result(answer)
+        return future
+
+
+def cache_with(tmp_path, *answers, **options):
+    client = ScriptedClient(*answers)
+    return response_cache.ResponseCache(root=tmp_path, client=client, **options), client
+
+
+# Function to age the stored entry of a URL past its time to live
+def expire(cache, url=URL):
+    entry = cache._read(url)
+    entry["fetched_at"] -= cache.ttl(url) + 1
+    cache._write(entry)
+    return entry
+
+
+def test_miss_is_stored_and_then_served_from_disk(tmp_path):
+    cache, client = cache_with(tmp_path, Response(200, b"body", {"ETag": '"v1"'}))
+    assert cache.get(URL).text == "body"
+    assert cache.get(URL).content == b"body"
+    assert len(client.requests) == 1
+    assert (cache.stats["misses"], cache.stats["hits"]) == (1, 1)
+
+
+def test_stale_entry_is_revalidated_keeping_body_and_records(tmp_path):
+    cache, client = cache_with(
+        tmp_path, Response(200, b"body", {"ETag": '"v1"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"}), Response(304)
+    )
+    assert cache.parsed(cache.get(URL), "length", lambda response: len(response.content)) == 4
+    stale = expire(cache)
+
+    # The stale body is served at once while the conditional request confirms it
+    assert cache.get(URL).fetched_at == stale["fetched_at"]
+    assert client.requests[1] == {"If-None-Match": '"v1"', "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"}
+    entry = cache._read(URL)
+    assert entry["fetched_at"] > stale["fetched_at"]
+    assert entry["content"] == b"body" and entry["records"] == {"length": 4}
+    assert (cache.stats["revalidated"], cache.stats["refreshed"]) == (1, 1)
+
+
+@pytest.mark.parametrize("failure", [requests.ConnectionError("down"), Response(503)])
+def test_failed_refresh_keeps_the_entry_and_is_not_counted(tmp_path, failure):
+    cache, _ = cache_with(tmp_path, Response(200, b"body"), failure)
+    cache.get(URL)
+    stale = expire(cache)
+
+    assert cache.get(URL).content == b"body"
+    assert cache._read(URL)["fetched_at"] == stale["fetched_at"]
+    assert cache.stats["refreshed"] == 0
+
+
+def test_not_modified_without_a_stored_body_asks_again(tmp_path):
+    cache, client = cache_with(tmp_path, Response(304), Response(200, b"body"))
+    response = cache.get(URL)
+    assert (response.status_code, response.content) == (200, b"body")
+    assert client.requests == [{}, {"Cache-Control": "no-cache"}]
+    assert cache._read(URL)["content"] == b"body"
+
+
+def test_eviction_runs_every_few_writes_and_keeps_the_newest(tmp_path):
+    urls = [f"https://example.com/{number}" for number in range(6)]
+    cache, _ = cache_with(
+        tmp_path, *(Response(200, bytes(1000)) for _ in urls), max_bytes=3500, evict_every=3
+    )
+    for url in urls:
+        cache.get(url)
+        time.sleep(0.01)
+
+    # The sixth write evicted down to the budget, oldest first
+    kept = {entry.name for entry in tmp_path.glob("*.pkl")}
+    assert kept == {cache.path(url).name for url in urls[3:]}
@@ -0,0 +1,110 @@
+# Imports
+from concurrent.futures import Future
+
+# Import requests
+import requests
+
+# Import the module under test
+import watchlists
+
+RED = watchlists.WATCHLISTS["Red"]
+BANKS = watchlists.WATCHLISTS["Banks"]
+
+
+def page(symbols, footer=""):
+    return '<script>{"symbols":[' + ",".join(f'"{symbol}"' for symbol in symbols) + "]}</script>" + footer
+
+
+def response(status, text="", etag=None):
+    answer = requests.Response()
+    answer.status_code = status
+    answer._content = text.encode()
+    answer.url = RED
+    if etag:
+        answer.headers["ETag"] = etag
+    return answer
+
+
+# Client stand-in answering each URL from a queue of responses, or exceptions, and recording the headers sent
+class StubClient:
+    def __init__(self, answers):
+        self.answers = {url: list(queue) for url, queue in answers.items()}
+        self.sent = []
+
+    def submit(self, url, headers=None):
+        self.sent.append((url, headers))
+        future = Future()
+        answer = self.answers[url].pop(0)
+        if isinstance(answer, Exception):
+            future.set_exception(answer)
+        else:
+            future.set_result(answer)
+        return future
+
+
+def test_a_list_seen_for_the_first_time_reports_no_additions(tmp_path):
+    client = StubClient({RED: [response(200, page(["NYSE:ABR", "NASDAQ:AAPL"]), etag='"v1"')]})
+    deltas, errors = watchlists.WatchlistSync(tmp_path / "state.json", client).sync(["Red"])
+    assert errors == {}
+    assert deltas["Red"]["first"] and deltas["Red"]["symbols"] == ["ABR", "AAPL"]
+    assert watchlists.added_tickers(deltas) == []
+
+
+def test_added_and_removed_symbols_of_a_known_list(tmp_path):
+    client = StubClient(
+        {RED: [response(200, page(["NYSE:ABR", "NASDAQ:AAPL"])), response(200, page(["NASDAQ:AAPL", "NYSE:O", "NYSE:ABR2"]))]}
+    )
+    sync = watchlists.WatchlistSync(tmp_path / "state.json", client)
+    sync.sync(["Red"])
+    deltas, _ = sync.sync(["Red"])
+    assert deltas["Red"]["changed"] and not deltas["Red"]["first"]
+    assert deltas["Red"]["removed"] == ["ABR"]
+    assert watchlists.added_tickers(deltas) == ["O", "ABR2"]
+
+
+def test_not_modified_sends_the_validators_and_keeps_the_membership(tmp_path):
+    client = StubClient({RED: [response(200, page(["NYSE:ABR"]), etag='"v1"'), response(304)]})
+    sync = watchlists.WatchlistSync(tmp_path / "state.json", client)
+    sync.sync(["Red"])
+    deltas, errors = sync.sync(["Red"])
+    assert client.sent[1] == (RED, {"If-None-Match": '"v1"'})
+    assert errors == {}
+    assert deltas["Red"]["symbols"] == ["ABR"] and not deltas["Red"]["changed"]
+
+
+def test_a_changed_page_with_the_same_symbols_is_not_a_change(tmp_path):
+    client = StubClient(
+        {RED: [response(200, page(["NYSE:ABR"], "<p>1 view</p>")), response(200, page(["NYSE:ABR"], "<p>2 views</p>"), etag='"v2"')]}
+    )
+    sync = watchlists.WatchlistSync(tmp_path / "state.json", client)
+    sync.sync(["Red"])
+    deltas, _ = sync.sync(["Red"])
+    assert not deltas["Red"]["changed"] and deltas["Red"]["added"] == []
+    assert sync.load()["Red"]["etag"] == '"v2"'
+
+
+def test_a_failed_fetch_falls_back_to_the_stored_membership(tmp_path):
+    client = StubClient(
+        {
+            RED: [response(200, page(["NYSE:ABR"])), requests.ConnectionError("refused")],
+            BANKS: [response(200, page(["NYSE:JPM"])), response(503)],
+        }
+    )
+    sync = watchlists.WatchlistSync(tmp_path / "state.json", client)
+    sync.sync(["Red", "Banks"])
+    checked_at = sync.load()["Red"]["checked_at"]
+    deltas, errors = sync.sync(["Red", "Banks"])
+    assert errors["Red"] == "ConnectionError: refused"
+    assert errors["Banks"].startswith("HTTPError: 503")
+    assert deltas["Red"]["symbols"] == ["ABR"] and deltas["Banks"]["symbols"] == ["JPM"]
+    assert watchlists.added_tickers(deltas) == []
+    assert sync.load()["Red"]["checked_at"] == checked_at
+
+
+def test_recently_checked_lists_are_answered_without_a_request(tmp_path):
+    client = StubClient({RED: [response(200, page(["NYSE:ABR"]))]})
+    sync = watchlists.WatchlistSync(tmp_path / "state.json", client)
+    sync.sync(["Red"])
+    deltas, errors = sync.sync(["Red"], max_age=300)
+    assert len(client.sent) == 1
+    assert errors == {} and deltas["Red"]["symbols"] == ["ABR"]
@@ -0,0 +1,31 @@
+# Imports
+import threading
+
+# Import the module under test
+import worker_pool
+
+
+def test_concurrent_sessions_share_one_pool(monkeypatch):
+    created = []
+
+    # Pool stand-in that is slow to create, so unguarded callers would each build one
+    class Pool:
+        def __init__(self, max_workers, initializer):
+            created.append(self)
+            threading.Event().wait(0.05)
+
+        def shutdown(self, wait=True):
+            pass
+
+    monkeypatch.setattr(worker_pool, "ProcessPoolExecutor", Pool)
+    monkeypatch.setattr(worker_pool, "_pool", None)
+    monkeypatch.setattr(worker_pool, "_pool_size", 0)
+    pools = []
+    threads = [threading.Thread(target=lambda: pools.append(worker_pool.get_pool(2))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(created) == 1
+    assert all(pool is created[0] for pool in pools)